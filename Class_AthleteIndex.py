@@ -0,0 +1,180 @@
+import re
+import math
+import unicodedata
+
+# German umlauts are written differently (e.g. Müller or Mueller), so they are replaced before the comparison
+_UMLAUTS: dict = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+
+class AthleteIndex:
+    """
+    Represents an index over athletes to find them by name. The names are normalised (case, umlauts, accents, order of
+    first and last name), so "Anna Müller" finds "Müller, Anna". In case the name is not found exactly, a trigram
+    index is used to find similar names (typos) or names by their beginning.
+
+    Attributes:
+    -----------
+    size : int
+        Number of indexed athletes
+
+    Methods:
+    --------
+    normalise(name) : str
+        Returns the normalised name
+    add(athlete)
+        Adds an athlete to the index
+    extend(athletes)
+        Adds several athletes to the index
+    exact(name) : list
+        Returns the athletes with the same normalised name
+    prefix(text, limit) : list
+        Returns the athletes where every word of the text is the beginning of a word of the name
+    similar(name, limit, min_score) : list
+        Returns the athletes with a similar name and the score of the similarity
+    find(name, limit) : list
+        Returns the athletes with the same name or, if there is none, the most similar one
+    """
+
+    def __init__(self, athletes: [list, None] = None):
+        """ Initializes a new AthleteIndex
+        :param athletes: Athletes to add [default = None]
+        """
+        # Normalised name -> athletes
+        self._names: dict = {}
+        # Normalised names and their trigrams (index of the name is the id)
+        self._keys: list = []
+        self._key_grams: list = []
+        # Trigram -> ids of the names
+        self._grams: dict = {}
+        self._size: int = 0
+        if athletes:
+            self.extend(athletes)
+
+    @property
+    def size(self) -> int:
+        """ Returns the number of indexed athletes
+        :return: Number of athletes
+        """
+        return self._size
+
+    @staticmethod
+    def normalise(name: str) -> str:
+        """ Returns the normalised name (lower case, without umlauts, accents and punctuation, sorted words)
+        :param name: Name of the athlete
+        :return: The normalised name
+        """
+        name = unicodedata.normalize('NFKD', name.casefold().translate(_UMLAUTS))
+        name = ''.join(char for char in name if not unicodedata.combining(char))
+        return ' '.join(sorted(re.findall(r'\w+', name)))
+
+    @staticmethod
+    def _trigrams(key: str, prefix: bool = False) -> set:
+        """ Returns the trigrams of a normalised name (every word on its own)
+        :param key: Normalised name
+        :param prefix: Only the trigrams of the beginning of the words (no end marker)
+        :return: A set of trigrams
+        """
+        grams: set = set()
+        for word in key.split():
+            word = '  ' + word if prefix else '  ' + word + ' '
+            grams.update(word[i:i + 3] for i in range(len(word) - 2))
+        return grams
+
+    def add(self, athlete):
+        """ Adds an athlete to the index
+        :param athlete: The athlete
+        """
+        key = self.normalise(athlete.name)
+        if key not in self._names:
+            self._names[key] = []
+            key_id = len(self._keys)
+            self._keys.append(key)
+            grams = frozenset(self._trigrams(key))
+            self._key_grams.append(grams)
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key_id)
+        self._names[key].append(athlete)
+        self._size += 1
+
+    def extend(self, athletes: list):
+        """ Adds several athletes to the index
+        :param athletes: List of athletes
+        """
+        for athlete in athletes:
+            self.add(athlete)
+
+    def exact(self, name: str) -> list:
+        """ Returns the athletes with the same normalised name
+        :param name: Name of the athlete
+        :return: A list of athletes
+        """
+        return list(self._names.get(self.normalise(name), []))
+
+    def prefix(self, text: str, limit: int = 20) -> list:
+        """ Returns the athletes where every word of the text is the beginning of a word of the name
+        :param text: Beginning of the name (e.g. "mu an" finds "Muster, Anna")
+        :param limit: Max number of athletes
+        :return: A list of athletes
+        """
+        words = self.normalise(text).split()
+        if not words:
+            return []
+        # Names which have all trigrams of the beginnings
+        ids = None
+        for gram in self._trigrams(' '.join(words), True):
+            found = set(self._grams.get(gram, []))
+            ids = found if ids is None else ids & found
+            if not ids:
+                return []
+        result: list = []
+        for key_id in sorted(ids, key=lambda i: self._keys[i]):
+            key_words = self._keys[key_id].split()
+            if all(any(key_word.startswith(word) for key_word in key_words) for word in words):
+                result.extend(self._names[self._keys[key_id]])
+                if len(result) >= limit:
+                    break
+        return result[:limit]
+
+    def similar(self, name: str, limit: int = 10, min_score: float = 0.5) -> list:
+        """ Returns the athletes with a similar name (dice coefficient of the trigrams)
+        :param name: Name of the athlete
+        :param limit: Max number of names
+        :param min_score: Min similarity (0 to 1)
+        :return: A list of tuples with score and athlete (best first)
+        """
+        grams = self._trigrams(self.normalise(name))
+        if not grams:
+            return []
+        # A name needs at least this number of common trigrams to reach the min score, so it must contain one of the
+        # (len - need + 1) rarest trigrams. The common trigrams (e.g. first letters) are not used to find candidates.
+        need = max(1, math.ceil(min_score * len(grams) / (2.0 - min_score)))
+        rare = sorted(grams, key=lambda gram: len(self._grams.get(gram, [])))
+        candidates: set = set()
+        for gram in rare[:len(grams) - need + 1]:
+            candidates.update(self._grams.get(gram, []))
+        scores: list = []
+        for key_id in candidates:
+            key_grams = self._key_grams[key_id]
+            score = 2.0 * len(grams & key_grams) / (len(grams) + len(key_grams))
+            if score >= min_score:
+                scores.append((score, key_id))
+        scores.sort(key=lambda entry: (-entry[0], self._keys[entry[1]]))
+        result: list = []
+        for score, key_id in scores[:limit]:
+            result.extend((score, athlete) for athlete in self._names[self._keys[key_id]])
+        return result
+
+    def find(self, name: str, limit: int = 10) -> list:
+        """ Returns the athletes with the same name or, if there is none, the athletes with the most similar name
+        :param name: Name of the athlete
+        :param limit: Max number of athletes
+        :return: A list of athletes
+        """
+        athletes = self.exact(name)
+        if athletes:
+            return athletes[:limit]
+        similar = self.similar(name, limit)
+        if not similar:
+            return []
+        # Only the athletes with the best score
+        return [athlete for score, athlete in similar if score == similar[0][0]][:limit]
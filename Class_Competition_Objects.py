@@ -1,7 +1,26 @@
 import re
+import weakref
 import datetime
 
 from Class_Config import Config
+from Class_AthleteIndex import AthleteIndex
+
+
+def _ref(value):
+    """ Returns a weak reference to an object. Objects only reference the object they belong to (e.g. the club of an
+    athlete) weakly, so there are no reference cycles and the objects of a closed collection are released at once.
+    :param value: The object or None
+    :return: The weak reference or None
+    """
+    return weakref.ref(value) if value is not None else None
+
+
+def _deref(ref):
+    """ Returns the object of a weak reference
+    :param ref: The weak reference or None
+    :return: The object or None (also in case the collection of the object is closed)
+    """
+    return ref() if ref is not None else None
 
 
 class _Entry:
@@ -22,6 +41,14 @@ class _Entry:
         Returns if the actual value it the active one
     exist(value) : bool
         Returns if the value exist in collection
+    get(value) : dict
+        Returns the instance with the name value
+    delete(value) : bool
+        Deletes an instance from the collection
+    changed(value, obj_type)
+        Counts a change of the objects of a type
+    generation(value, obj_type) : int
+        Returns the number of changes of the objects of a type
     """
     
     def __init__(self, entry_name: [str, None] = None):
@@ -31,6 +58,8 @@ class _Entry:
         """
         self._name = ''
         self._instance: dict = {}
+        # Number of added and removed objects per instance and type (e.g. to know if an index is outdated)
+        self._generations: dict = {}
         if entry_name:
             self.create(entry_name)
         else:
@@ -78,6 +107,7 @@ class _Entry:
             return False
         else:
             self._instance[value] = {}
+            self._generations[value] = {}
             self.name = value
             return True
     
@@ -96,6 +126,51 @@ class _Entry:
         :return: Is the name in collection
         """
         return value in list(self._instance.keys())
+    
+    def get(self, value: str) -> dict:
+        """ Returns the instance with the name value
+        :type value: str
+        :param value: Name of the instance
+        :return: The instance or an empty dictionary
+        """
+        return self._instance.get(value, {})
+    
+    def delete(self, value: str) -> bool:
+        """ Deletes an instance, in case it was the active one the first available instance will be active
+        :type value: str
+        :param value: Name of the instance to delete
+        :return: True in case the instance was deleted
+        """
+        if not self.exist(value):
+            return False
+        del self._instance[value]
+        del self._generations[value]
+        # Set new active instance
+        if self._name == value:
+            if self._instance:
+                self._name = list(self._instance.keys())[0]
+            else:
+                self.create('default')
+        return True
+    
+    def changed(self, value: str, obj_type):
+        """ Counts a change (added or removed object) of the objects of a type
+        :type value: str
+        :param value: Name of the instance
+        :param obj_type: Type of the object
+        """
+        if value in self._generations:
+            generations = self._generations[value]
+            generations[obj_type] = generations.get(obj_type, 0) + 1
+    
+    def generation(self, value: str, obj_type) -> int:
+        """ Returns the number of changes of the objects of a type, it is increased with every added or removed object
+        :type value: str
+        :param value: Name of the instance
+        :param obj_type: Type of the objects
+        :return: The number of changes
+        """
+        return self._generations.get(value, {}).get(obj_type, 0)
 
 
 class _Registry:
@@ -110,6 +185,8 @@ class _Registry:
         Removes the object from the instance and delete it
     get_all(obj_type = None) : dict
         Return a collection with the specific object type
+    generation(obj_type, name = None) : int
+        Returns the number of changes of the objects of a type
     """
     
     def __init__(self, name: [str, None] = None):
@@ -124,17 +201,26 @@ class _Registry:
         :param obj: Object to add to the registry
         """
         self.entry.instance.setdefault(type(obj), []).append(obj)
+        self.entry.changed(self.entry.name, type(obj))
     
     def remove(self, obj):
         """ Removes an object from the registry (if it in)
         :param obj: Object to be removed from registry
         """
-        obj_list = self.entry.instance.get(type(obj), [])
-        if obj in obj_list:
-            obj_list.remove(obj)
-            # In case list is empty, remove type from dict
-            if not obj_list:
-                del self.entry.instance[type(obj)]
+        # Use the instance the object was created in (it could be deleted or not active anymore)
+        name = getattr(obj, '_name', self.entry.name)
+        instance = self.entry.get(name)
+        obj_list = instance.get(type(obj), [])
+        # Compare by identity, objects like clubs are equal by name (search from the end, mostly the last created
+        # objects are removed)
+        for i in range(len(obj_list) - 1, -1, -1):
+            if obj_list[i] is obj:
+                del obj_list[i]
+                # In case list is empty, remove type from dict
+                if not obj_list:
+                    del instance[type(obj)]
+                self.entry.changed(name, type(obj))
+                break
     
     def get_all(self, obj_type=None) -> [dict, list]:
         """ Returns a list of all the objects from a type or the hole instance
@@ -145,23 +231,34 @@ class _Registry:
             return self.entry.instance.get(obj_type, [])
         return self.entry.instance
     
+    def generation(self, obj_type, name: [str, None] = None) -> int:
+        """ Returns the number of changes (added or removed objects) of the objects of a type
+        :param obj_type: Type of the objects
+        :param name: Name of the instance [default = None (the active one)]
+        :return: The number of changes
+        """
+        return self.entry.generation(name if name is not None else self.entry.name, obj_type)
+    
     def __repr__(self):
         return f"Registry[{self.entry.name}]({self.entry.instance})"
 
 
 class _Base:
     """
-    Represents the base class of all club objects
+    Represents the base class of all club objects. The objects belong to the collection (registry entry) they are
+    created in and are released with it (Collection.close), there are no finalizers.
     
     Methods:
     --------
     remove:
-        delete this object
+        Removes this object from the collection and the objects it belongs to
     """
     # Class to store all the created object in
     _registry: [None, _Registry] = None
     # Config class needed for some functions
     _config: [None, Config] = None
+    # Functions which read the rest of a lazily read collection (collection name -> function)
+    _pending: dict = {}
     
     def __init__(self, name: str = '', config: [Config, None] = None):
         """ Base class of all club objects
@@ -184,7 +281,7 @@ class _Base:
             # Check if no config is stored
             if not _Base._config:
                 # Create config
-                config = Config()
+                config = Config.load()
             # config stored
             else:
                 # use stored config
@@ -196,15 +293,19 @@ class _Base:
         # Set name
         self._name = _Base._registry.entry.name
     
-    def __del__(self):
-        _Base._registry.remove(self)
-    
     def __repr__(self):
         return f"{self.__class__.__name__}()"
     
     def remove(self):
         """ Removes value from registry """
-        self.__del__()
+        _Base._registry.remove(self)
+    
+    def _complete(self):
+        """ Reads the rest of the collection of this object in case it is read lazily """
+        if _Base._pending:
+            func = _Base._pending.get(self._name)
+            if func is not None:
+                func()
 
 class Collection(_Base):
     """
@@ -230,6 +331,16 @@ class Collection(_Base):
         Returns a list of all created lane objects
     config : Config
         Returns the configuration
+    pending : bool
+        Returns if the collection is not read completely
+    defer(func)
+        Sets a function which reads the rest of the collection on first access
+    close
+        Releases all objects of the collection
+    object_counts() : dict
+        Returns the number of objects per type
+    unique_name(name) : str
+        Returns a collection name which is not in use
     """
     
     def __init__(self, name: str, config: [Config, None] = None):
@@ -333,11 +444,58 @@ class Collection(_Base):
         if value:
             _Base._config = value
     
+    @property
+    def pending(self) -> bool:
+        """ Returns if the collection is not read completely (see defer)
+        :return: True in case the rest is read on first access
+        """
+        return self._name in _Base._pending
+    
+    def defer(self, func):
+        """ Sets a function which reads the rest of the collection. It is called on the first access to the judges,
+        athletes, years, competitions, heats or lanes of the collection or the athletes, judges or occurrences of a
+        club. The function must remove itself (defer(None)) when it is finished.
+        :param func: Function without parameters or None to remove it
+        """
+        if func is None:
+            _Base._pending.pop(self._name, None)
+        else:
+            _Base._pending[self._name] = func
+    
+    def close(self):
+        """ Releases all objects of the collection (removes the collection from the registry). The objects only
+        reference the objects they belong to weakly, so they are released at once and not by the garbage collector. """
+        _Base._pending.pop(self._name, None)
+        self._registry.entry.delete(self._name)
+    
+    def object_counts(self) -> dict:
+        """ Returns the number of objects per type (the rest of a lazily read collection is not read)
+        :return: Dictionary with the name of the type and the number of objects
+        """
+        return {obj_type.__name__: len(objects) for obj_type, objects in self._registry.entry.get(self._name).items()}
+    
+    @staticmethod
+    def unique_name(name: str) -> str:
+        """ Returns a collection name which is not in use (a number is added in case the name exists)
+        :type name: str
+        :param name: Wanted name of the collection
+        :return: The name or the name with a number
+        """
+        if not _Base._registry or not _Base._registry.entry.exist(name):
+            return name
+        no = 2
+        while _Base._registry.entry.exist(fr'{name} ({no})'):
+            no += 1
+        return fr'{name} ({no})'
+    
     def _get_list(self, obj_type) -> list:
         """ Returns a specific object type list
         :param obj_type: Type of object
         :return: A list of objects with the obj_type
         """
+        # Objects of the second stage of a lazy reading
+        if obj_type in (Judge, Athlete, Year, Competition, Heat, Lane):
+            self._complete()
         # Set collection to the default one
         self._set_active()
         # Get the list
@@ -387,10 +545,26 @@ class SpecialCollection(Collection):
         Returns a list athletes by club
     athletes_dict : dict
         Returns a dictionary of athletes objects with the represent str as key
+    athlete_index : AthleteIndex
+        Returns the name index of all athletes
+    find_athletes(value, limit) : list
+        Returns the athletes with the name or the most similar name
     get_year : [Year, None]
         Returns the year object by its number
     """
     
+    def __init__(self, name: str, config: [Config, None] = None):
+        """ Initializes a new collection of classes
+        :type name: str
+        :param name: Name of the collection
+        :type config: [Config, None]
+        :param config: Set the configuration for this collection [default = None]
+        """
+        Collection.__init__(self, name, config)
+        # Name index of the athletes (created on first use) and the generation of the athletes it was created for
+        self._athlete_index: [AthleteIndex, None] = None
+        self._athlete_generation: int = -1
+    
     def competition_by_no(self, value: int):
         """ Return a competition class by its number
         :type value: int
@@ -470,6 +644,27 @@ class SpecialCollection(Collection):
         """
         return dict(map(lambda x: (str(x), x), self.athletes))
     
+    def athlete_index(self) -> AthleteIndex:
+        """ Returns the name index of all athletes (created again in case athletes were added or removed)
+        :return: The AthleteIndex of the collection
+        """
+        athletes = self.athletes
+        # Every added or removed athlete changes the generation (also in case the number of athletes is the same)
+        generation = self._registry.generation(Athlete, self._name)
+        if self._athlete_index is None or self._athlete_generation != generation:
+            self._athlete_index = AthleteIndex(athletes)
+            self._athlete_generation = generation
+        return self._athlete_index
+    
+    def find_athletes(self, value: str, limit: int = 10) -> list:
+        """ Returns the athletes with the name or, in case there is none, the athletes with the most similar name
+        :type value: str
+        :param value: Name of the athlete (e.g. "Anna Müller" or "Mueller, Anna")
+        :param limit: Max number of athletes
+        :return: A list of athletes
+        """
+        return self.athlete_index().find(value, limit)
+    
     def get_year(self, year: int):
         """
         Returns the year object by its number
@@ -1159,9 +1354,10 @@ class Club(_Base, HasAthletes, HasOccurrence, HasJudges):
             result += fr' [ {self.participants} ]'
         return result
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the club from the registry and its association """
         self.association = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     def __repr__(self):
         tmp = fr'{self.__class__.__name__}('
@@ -1183,12 +1379,36 @@ class Club(_Base, HasAthletes, HasOccurrence, HasJudges):
         """ The association the club belongs to
         :return: The Association if available
         """
-        return self.__association
+        return _deref(self.__association)
     
     @association.setter
     def association(self, value: [Association, None]):
         """ Sets the association the club belongs to """
-        self.__association = self.__setter(value, self.__association)
+        self.__association = _ref(self.__setter(value, self.association))
+    
+    @property
+    def athletes(self) -> list:
+        """ Returns the athlete list (a lazily read collection is read completely before)
+        :return: The athlete list
+        """
+        self._complete()
+        return self._athletes
+    
+    @property
+    def occurrence(self) -> list:
+        """ Returns the occurrence list (a lazily read collection is read completely before)
+        :return: The occurrence list
+        """
+        self._complete()
+        return self._occurrence
+    
+    @property
+    def judges(self) -> list:
+        """ Returns the judge list (a lazily read collection is read completely before)
+        :return: The judge list
+        """
+        self._complete()
+        return self._judges
     
     @property
     def starts(self) -> Starts:
@@ -1286,8 +1506,8 @@ class Judge(_Base):
     def __str__(self):
         no = 0
         club = ''
-        if self._section:
-            no = self._section.no
+        if self.section:
+            no = self.section.no
         if self.club:
             club = fr' {self.club.name}'
         
@@ -1303,34 +1523,35 @@ class Judge(_Base):
             tmp += fr', section={self.section}'
         return tmp + ')'
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the judge from the registry, its section and its club """
         self.section = None
         self.club = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     @property
     def section(self) -> [Section, None]:
         """ Return the section the judge works in
         :return The section the judge works in
         """
-        return self._section
+        return _deref(self._section)
     
     @section.setter
     def section(self, value: [Section, None]):
         """ Set the section the judge works in """
-        self._section = self.__setter(value, self._club)
+        self._section = _ref(self.__setter(value, self.section))
     
     @property
     def club(self) -> [Club, None]:
         """ Return the club the judge belongs to
         :return The club the judge belongs to
         """
-        return self._club
+        return _deref(self._club)
     
     @club.setter
     def club(self, value: [Club, None]):
         """ Sets the club the judge belongs to """
-        self._club = self.__setter(value, self._club)
+        self._club = _ref(self.__setter(value, self.club))
     
     def __setter(self, value, obj):
         """ Function sets or removes the club an object which belongs to the club
@@ -1439,34 +1660,35 @@ class Athlete(_Base, HasLanes, HasOccurrence):
             tmp += fr', club={self.club}'
         return tmp + ')'
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the athlete from the registry, its year and its club """
         self.year = None
         self.club = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     @property
     def year(self) -> [Year, None]:
         """ Return the year the athlete belongs to
         :return The year the athlete belongs to
         """
-        return self._year
+        return _deref(self._year)
     
     @year.setter
     def year(self, value: [Year, None]):
         """ Sets the year the athlete belongs to """
-        self._year = self.__setter(value, self._year)
+        self._year = _ref(self.__setter(value, self.year))
     
     @property
     def club(self) -> [Club, None]:
         """ Return the club the athlete belongs to
         :return The club the athlete belongs to
         """
-        return self._club
+        return _deref(self._club)
     
     @club.setter
     def club(self, value: [Club, None]):
         """ Sets the club the athlete belongs to """
-        self._club = self.__setter(value, self._club)
+        self._club = _ref(self.__setter(value, self.club))
     
     def __setter(self, value, obj):
         """ Function sets or removes an object which belongs to the club
@@ -1575,9 +1797,10 @@ class Competition(_Base, HasHeats):
             tmp += fr'discipline={self.discipline}'
         return tmp + ')'
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the competition from the registry and its section """
         self.section = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     def name(self, with_heat: bool = False) -> str:
         """ Returns the name of the Competition
@@ -1632,12 +1855,12 @@ class Competition(_Base, HasHeats):
         """ Return the section the competition belongs to
         :return The section the competition belongs to
         """
-        return self._section
+        return _deref(self._section)
     
     @section.setter
     def section(self, value: [None, Section]):
         """ Sets the section the competition belongs to """
-        self._section = self.__setter(value, self._section)
+        self._section = _ref(self.__setter(value, self.section))
     
     def __setter(self, value, obj):
         """ Function sets or removes an object which belongs to the competition
@@ -1762,21 +1985,22 @@ class Heat(_Base, HasLanes):
             tmp += fr', {self.competition}'
         return tmp + ')'
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the heat from the registry and its competition """
         self.competition = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     @property
     def competition(self) -> [Competition, None]:
         """ Return the competition the heat belongs to
         :return The competition the heat belongs to
         """
-        return self._competition
+        return _deref(self._competition)
     
     @competition.setter
     def competition(self, value: [Competition, None]):
         """ Sets the competition the heat belongs to """
-        self._competition = self.__setter(value, self._competition)
+        self._competition = _ref(self.__setter(value, self.competition))
     
     def __setter(self, value, obj):
         """ Function sets or removes an object which belongs to the heat
@@ -1882,10 +2106,11 @@ class Lane(_Base):
             tmp += fr', {self.heat.no}'
         return tmp + ')'
     
-    def __del__(self):
+    def remove(self):
+        """ Removes the lane from the registry, its heat and its athlete """
         self.heat = None
         self.athlete = None
-        _Base.__del__(self)
+        _Base.remove(self)
     
     def is_lane(self) -> bool:
         """ Returns if it is a lane
@@ -1911,24 +2136,24 @@ class Lane(_Base):
         """ Return the heat the lane belongs to
         :return The heat the lane belongs to
         """
-        return self._heat
+        return _deref(self._heat)
     
     @heat.setter
     def heat(self, value: [Heat, None]):
         """ Sets the heat the lane belongs to """
-        self._heat = self.__setter(value, self._heat)
+        self._heat = _ref(self.__setter(value, self.heat))
     
     @property
     def athlete(self) -> Athlete:
         """ Return the athlete the lane belongs to
         :return The athlete the lane belongs to
         """
-        return self._athlete
+        return _deref(self._athlete)
     
     @athlete.setter
     def athlete(self, value: [Athlete, None]):
         """ Sets the athlete the lane belongs to """
-        self._athlete = self.__setter(value, self._athlete)
+        self._athlete = _ref(self.__setter(value, self.athlete))
     
     def __setter(self, value, obj):
         """ Function sets or removes an object which belongs to the heat
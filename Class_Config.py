@@ -1,4 +1,5 @@
 import os
+from types import MappingProxyType
 from configparser import ConfigParser, SectionProxy
 
 # Global dictionary for default values could be found in pdf
@@ -49,7 +50,8 @@ class _ParseValues:
     """
     Represents _ParseValues object
     
-    Here are all values stored which are parsed in a PDF file
+    Here are all values stored which are parsed in a PDF file. The object is an immutable snapshot of the config
+    section, all values are plain attributes (missing values are '').
 
     Attributes:
     -----------
@@ -87,142 +89,49 @@ class _ParseValues:
         Value for finding the continue value
     no_of_entries : str
         Value for finding the no of entries
+    no : str
+        Value for finding a number string
+    parsed_values : MappingProxyType
+        The values of the config section (read only)
     """
+    # Attribute -> key in the config section
+    _KEYS: dict = {
+        'competition': 'competition',
+        'competition_sequenz': 'competition_sequenz',
+        'club': 'club',
+        'heat': 'heat',
+        'heats': 'heats',
+        'oclock': 'oclock',
+        'lane': 'lane',
+        'segment': 'segment',
+        'male': 'male',
+        'female': 'female',
+        'mixed': 'mixed',
+        'final': 'finale',
+        'entry_cnt': 'entry_cnt',
+        'judging_panel': 'judging_panel',
+        'continue_value': 'continue_value',
+        'no_of_entries': 'no_of_entries',
+        'no': 'no',
+    }
+    __slots__ = tuple(_KEYS.keys()) + ('parsed_values',)
 
     def __init__(self, parsed_values: dict):
         """ Initializes a new _ParseValues class
         :param parsed_values: The values to be parsed
         """
-        self.parsed_values: dict = parsed_values
+        object.__setattr__(self, 'parsed_values', MappingProxyType(dict(parsed_values)))
+        for attr, key in self._KEYS.items():
+            object.__setattr__(self, attr, parsed_values.get(key, ''))
 
-    @property
-    def competition(self) -> str:
-        """ Returns a competition string
-        :return: Value to identify the competition
-        """
-        return self._chk_key('competition')
-
-    @property
-    def competition_sequenz(self) -> str:
-        """ Returns a competition sequenz string
-        :return: Value to identify the competition sequenz
-        """
-        return self._chk_key('competition_sequenz')
-
-    @property
-    def club(self) -> str:
-        """ Returns a club string
-        :return: Value to identify the club(s)
-        """
-        return self._chk_key('club')
-
-    @property
-    def heat(self) -> str:
-        """ Returns a heat string
-        :return: Value to identify a heat
-        """
-        return self._chk_key('heat')
-
-    @property
-    def heats(self) -> str:
-        """ Returns a heats string
-        :return: Value to identify the value for heats
-        """
-        return self._chk_key('heats')
-
-    @property
-    def oclock(self) -> str:
-        """ Returns a time name string
-        :return: Value to identify the value for a time
-        """
-        return self._chk_key('oclock')
-
-    @property
-    def lane(self) -> str:
-        """ Returns a lane string
-        :return: Value to identify a lane
-        """
-        return self._chk_key('lane')
-
-    @property
-    def segment(self) -> str:
-        """ Returns a segment string
-        :return: Value to identify a segment
-        """
-        return self._chk_key('segment')
-
-    @property
-    def male(self) -> str:
-        """ Returns the male string
-        :return: The male value
-        """
-        return self._chk_key('male')
+    def __setattr__(self, key, value):
+        raise AttributeError(fr'{self.__class__.__name__} is read only')
 
-    @property
-    def female(self) -> str:
-        """ Returns the female string
-        :return: The female value
-        """
-        return self._chk_key('female')
+    def __delattr__(self, key):
+        raise AttributeError(fr'{self.__class__.__name__} is read only')
 
-    @property
-    def mixed(self) -> str:
-        """ Returns the mixed string
-        :return: The mixed value
-        """
-        return self._chk_key('mixed')
-
-    @property
-    def final(self) -> str:
-        """ Returns a final string
-        :return: Value to identify a final
-        """
-        return self._chk_key('finale')
-
-    @property
-    def entry_cnt(self) -> str:
-        """ Returns a entry count string
-        :return: Value to identify an entry count
-        """
-        return self._chk_key('entry_cnt')
-
-    @property
-    def judging_panel(self) -> str:
-        """ Returns a judging panel string
-        :return: Value to identify a judging panel
-        """
-        return self._chk_key('judging_panel')
-
-    @property
-    def continue_value(self) -> str:
-        """ Returns the continue value
-        :return: A string to identify the continue value
-        """
-        return self._chk_key('continue_value')
-
-    @property
-    def no_of_entries(self) -> str:
-        """ Returns a no of entries string
-        :return: Value to identify the number of entries
-        """
-        return self._chk_key('no_of_entries')
-    
-    @property
-    def no(self) -> str:
-        """ Returns a no string
-        :return: Value to identify a number string
-        """
-        return self._chk_key('no')
-
-    def _chk_key(self, key: str) -> str:
-        """ Function checks if key in dictionary
-        :param key: Key to check
-        :return: The value from the dictionary
-        """
-        if key in list(self.parsed_values.keys()):
-            return self.parsed_values[key]
-        else:
-            return ''
+    def __reduce__(self):
+        return self.__class__, (dict(self.parsed_values),)
 
 
 class _Colors:
@@ -235,6 +144,15 @@ class _Colors:
         A dictionary with the colors a kex in hex
     rgb : dict
         A dictionary with the colors a kex in rgb
+        
+    Methods:
+    --------
+    add(name, value)
+        Adds a color to the color collection
+    valid_color(value) : str
+        Checks if a color is valid
+    get_rgb(value) : [tuple, None]
+        Returns the rgb value of a color name or a color value
     """
 
     def __init__(self, colors: SectionProxy):
@@ -331,6 +249,20 @@ class _Colors:
             return ''
 
         return '#' + value.upper()
+    
+    def get_rgb(self, value: str) -> [tuple, None]:
+        """ Returns the rgb value of a color by its name or its value
+        :param value: Name of a color or color as string (e.g. 255,255,0 or #FFFF00)
+        :return: The rgb value or None in case the color is not valid
+        """
+        # Check for color name
+        if value in self.rgb.keys():
+            return self.rgb[value]
+        # Check for valid color
+        value = self.valid_color(value)
+        if value:
+            return self._hex_to_dec(value[1:])
+        return None
 
 
 class Config:
@@ -345,7 +277,18 @@ class Config:
         A object with the values to be parsed
     colors : _Colors
         A object with the available colors
+    file_name : str
+        Name of the config file
+
+    Methods:
+    --------
+    load(config_file) : Config
+        Returns the config of a file (only read again in case the file was modified)
+    save()
+        Save the config
     """
+    # Loaded configs (absolute file name -> modification time and config)
+    _cache: dict = {}
 
     def __init__(self, config_file: str = ''):
         """ Initializes a new config class
@@ -375,6 +318,25 @@ class Config:
 
         self._colors = _Colors(self._config['Colors'])
 
+    @classmethod
+    def load(cls, config_file: str = ''):
+        """ Returns the config of a file, the same object is returned until the file is modified
+        :param config_file: Name of the config file [default = '' (.result_config.ini)]
+        :return: The config
+        """
+        file_name = config_file if config_file else '.result_config.ini'
+        path = os.path.abspath(file_name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = cls._cache.get(path)
+        if cached is not None and mtime is not None and cached[0] == mtime:
+            return cached[1]
+        config = cls(file_name)
+        cls._cache[path] = (os.stat(path).st_mtime_ns, config)
+        return config
+
     def _create_config(self, config_file):
         """ Creates config file
         :param config_file:  Name of config file
@@ -394,6 +356,11 @@ class Config:
         """ Save the config """
         with open(self._config_file, 'w') as fp:
             self._config.write(fp)
+        # The saved values are the actual ones, so the cached config is still valid
+        path = os.path.abspath(self._config_file)
+        cached = Config._cache.get(path)
+        if cached is not None and cached[1] is self:
+            Config._cache[path] = (os.stat(path).st_mtime_ns, self)
 
     @property
     def default(self) -> SectionProxy:
@@ -402,6 +369,13 @@ class Config:
         """
         return self._config['Default']
 
+    @property
+    def file_name(self) -> str:
+        """ Returns the name of the config file
+        :return: Name of the config file
+        """
+        return self._config_file
+
     @property
     def colors(self) -> _Colors:
         """ Return a color values
@@ -0,0 +1,137 @@
+import sys
+
+# tracemalloc and json are imported by the profile, so the modules using memory_step are loaded without them
+# Profile which is measured at the moment (the steps of the other modules are ignored in case it is None)
+_active = None
+
+
+def memory_step(name: str, collection=None):
+    """ Ends a phase of the memory profile in case it is measured (see MemoryProfile.step)
+    :param name: Name of the phase
+    :param collection: Collection whose objects are counted [default = None]
+    """
+    if _active is not None:
+        _active.step(name, collection)
+
+
+class MemoryProfile:
+    """
+    Represents a measurement of the memory used by the phases of the program (highlightClub.py --memprofile). The
+    allocations are traced by tracemalloc, a phase ends with a step. For every phase the peak, the memory retained
+    at its end and the lines which allocated most of the retained memory are stored.
+
+    Attributes:
+    -----------
+    phases : list
+        The measured phases as dictionaries
+
+    Methods:
+    --------
+    start()
+        Starts tracing the allocations
+    stop()
+        Stops tracing the allocations
+    step(name, collection)
+        Ends the current phase
+    to_dict() : dict
+        Returns the phases for the json report
+    report(file, json_file)
+        Prints the phases and writes the json report
+    """
+
+    def __init__(self, top: int = 5, frames: int = 1):
+        """ Initializes a new MemoryProfile
+        :param top: Number of allocation sites per phase
+        :param frames: Number of frames stored per allocation (the site is the innermost frame)
+        """
+        self._top: int = top
+        self._frames: int = frames
+        self._snapshot = None
+        # Traced memory at the end of the last phase
+        self._current: int = 0
+        self.phases: list = []
+
+    def start(self):
+        """ Starts tracing the allocations """
+        global _active
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+        self._snapshot = self._take_snapshot()
+        self._current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _active = self
+
+    def stop(self):
+        """ Stops tracing the allocations """
+        global _active
+        if _active is self:
+            import tracemalloc
+            _active = None
+            self._snapshot = None
+            tracemalloc.stop()
+
+    def step(self, name: str, collection=None):
+        """ Ends the current phase and starts the next one
+        :param name: Name of the phase
+        :param collection: Collection whose objects are counted [default = None]
+        """
+        if _active is not self:
+            return
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._take_snapshot()
+        sites: list = []
+        for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self._top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            sites.append({'site': fr'{frame.filename}:{frame.lineno}', 'size': stat.size_diff,
+                          'count': stat.count_diff})
+        self.phases.append({'name': name, 'peak': peak, 'retained': current - self._current, 'current': current,
+                            'sites': sites, 'objects': collection.object_counts() if collection is not None else {}})
+        self._snapshot = snapshot
+        self._current = current
+        tracemalloc.reset_peak()
+
+    def to_dict(self) -> dict:
+        """ Returns the phases for the json report (sizes in bytes)
+        :return: Dictionary with the peak of all phases and the phases
+        """
+        return {'peak': max((phase['peak'] for phase in self.phases), default=0), 'phases': self.phases}
+
+    def report(self, file=None, json_file: str = ''):
+        """ Prints the phases (by default to stderr, so the outputs of the program are unchanged) and writes the json
+        report
+        :param file: Stream for the report [default = None (stderr)]
+        :param json_file: Name of the json report [default = '' (no json report)]
+        """
+        file = file if file else sys.stderr
+        self.stop()
+        values = self.to_dict()
+        print(fr'Memory (peak {values["peak"] / 2**20:.1f} MB)', file=file)
+        print(fr'  {"phase":<35} {"peak":>10} {"retained":>10} {"total":>10}', file=file)
+        for phase in self.phases:
+            print(fr'  {phase["name"]:<35} {phase["peak"] / 2**20:7.1f} MB {phase["retained"] / 2**20:7.1f} MB '
+                  fr'{phase["current"] / 2**20:7.1f} MB', file=file)
+            for site in phase['sites']:
+                print(fr'      {site["size"] / 2**10:9.1f} KB {site["count"]:8d}x {site["site"]}', file=file)
+            if phase['objects']:
+                print('      objects: ' + ', '.join(fr'{key} {value}' for key, value in phase['objects'].items()),
+                      file=file)
+        if json_file:
+            import json
+            with open(json_file, 'w', encoding='utf-8') as fp:
+                json.dump(values, fp, indent=2)
+
+    @staticmethod
+    def _take_snapshot():
+        """ Takes a snapshot of the traced allocations without the allocations of the import system and tracemalloc
+        :return: The snapshot
+        """
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
@@ -0,0 +1,142 @@
+import sys
+
+# Counters with a label and the name of the label in the prometheus format
+LABELS: dict = {
+    'regex_matches': 'pattern',
+    'collection_objects': 'type',
+    'index_lookups': 'index',
+    'cache_hits': 'cache',
+    'cache_misses': 'cache',
+    'output_bytes': 'output',
+    'requests': 'path',
+    'metrics_errors': 'worker',
+}
+
+# Descriptions of the counters (help text of the prometheus format)
+DESCRIPTIONS: dict = {
+    'pages_extracted': 'Pages whose words were extracted by MuPDF',
+    'words_extracted': 'Words extracted from the pages',
+    'lines_built': 'Lines built from the extracted words',
+    'find_next_calls': 'Searches for the next occurrence of a text',
+    'regex_matches': 'Lines matched by a pattern (e.g. competition headings)',
+    'collection_objects': 'Objects in the collections after the reading (per type, removed objects are not counted)',
+    'index_lookups': 'Lookups of clubs, athletes and years by name or number',
+    'cache_hits': 'Results taken from a cache',
+    'cache_misses': 'Results not found in a cache',
+    'output_bytes': 'Bytes written to the outputs',
+    'requests': 'Handled requests',
+    'metrics_errors': 'Workers whose counters were missing in a scrape (busy or crashed)',
+    'files_processed': 'Processed files',
+    'files_failed': 'Files which could not be processed',
+}
+
+
+class Metrics:
+    """
+    Represents counters of the work done by the program (e.g. pages extracted, lines built or bytes written).
+    A counter is a number or, in case it has a label, a dictionary with a number per label value. The counters of
+    several objects (e.g. of worker processes) are summed by update.
+
+    Attributes:
+    -----------
+    values : dict
+        The counters
+
+    Methods:
+    --------
+    add(name, value, label)
+        Adds a value to a counter
+    update(values)
+        Adds the counters of another metrics object or dictionary
+    to_dict() : dict
+        Returns a sorted copy of the counters
+    to_prometheus(prefix) : str
+        Returns the counters in the prometheus text format
+    report(file)
+        Prints the counters
+    reset()
+        Sets all counters to zero
+    """
+
+    def __init__(self, values: [dict, None] = None):
+        """ Initializes new Metrics
+        :param values: Counters to start with [default = None]
+        """
+        self.values: dict = {}
+        if values:
+            self.update(values)
+
+    def add(self, name: str, value: int = 1, label: str = ''):
+        """ Adds a value to a counter
+        :param name: Name of the counter
+        :param value: Value to add [default = 1]
+        :param label: Value of the label of the counter [default = '' (counter without label)]
+        """
+        if label:
+            counter = self.values.setdefault(name, {})
+            counter[label] = counter.get(label, 0) + value
+        else:
+            self.values[name] = self.values.get(name, 0) + value
+
+    def update(self, values):
+        """ Adds the counters of another metrics object or dictionary
+        :type values: [Metrics, dict]
+        :param values: The counters to add
+        """
+        if isinstance(values, Metrics):
+            values = values.values
+        for name, value in values.items():
+            if isinstance(value, dict):
+                for label, label_value in value.items():
+                    self.add(name, label_value, label)
+            else:
+                self.add(name, value)
+
+    def to_dict(self) -> dict:
+        """ Returns a sorted copy of the counters
+        :return: Dictionary with the counters
+        """
+        return {name: dict(sorted(value.items())) if isinstance(value, dict) else value
+                for name, value in sorted(self.values.items())}
+
+    def to_prometheus(self, prefix: str = 'highlightclub') -> str:
+        """ Returns the counters in the prometheus text format
+        :param prefix: Prefix of the names of the counters
+        :return: The text
+        """
+        lines: list = []
+        for name, value in self.to_dict().items():
+            metric = fr'{prefix}_{name}_total'
+            if name in DESCRIPTIONS:
+                lines.append(fr'# HELP {metric} {DESCRIPTIONS[name]}')
+            lines.append(fr'# TYPE {metric} counter')
+            if isinstance(value, dict):
+                label_name = LABELS.get(name, 'label')
+                for label, label_value in value.items():
+                    label = str(label).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+                    lines.append(fr'{metric}{{{label_name}="{label}"}} {label_value}')
+            else:
+                lines.append(fr'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def report(self, file=None):
+        """ Prints the counters (by default to stderr, so the outputs of the program are unchanged)
+        :param file: Stream for the report [default = None (stderr)]
+        """
+        file = file if file else sys.stderr
+        print('Stats', file=file)
+        for name, value in self.to_dict().items():
+            if isinstance(value, dict):
+                print(fr'  {name:<35} {sum(value.values()):10d}', file=file)
+                for label, label_value in value.items():
+                    print(fr'    {label:<33} {label_value:10d}', file=file)
+            else:
+                print(fr'  {name:<35} {value:10d}', file=file)
+
+    def reset(self):
+        """ Sets all counters to zero """
+        self.values = {}
+
+
+# Counters of the process which are not bound to the reading of a pdf (e.g. outputs, requests)
+metrics = Metrics()
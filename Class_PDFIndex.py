@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import pymupdf
+import datetime
+import threading
+
+# Date in the text of a pdf (e.g. 12.10.2025)
+_DATE_RE = re.compile(r'\b(\d{1,2})\.(\d{1,2})\.((?:19|20)\d{2})\b')
+
+
+def date_from_text(text: str) -> [datetime.date, None]:
+    """ Returns the first date in a text (e.g. the date of the meet on the first page of a "Meldeergebnis")
+    :param text: The text
+    :return: The date or None in case the text contains no valid date
+    """
+    for match in _DATE_RE.finditer(text):
+        day, month, year = (int(value) for value in match.groups())
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            # e.g. 31.02.2025, the next date is taken
+            continue
+    return None
+
+
+def _print(text: str):
+    """ Prints a text with time stamp
+    :param text: Text to print
+    """
+    print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {text}')
+
+
+class PDFInfo:
+    """
+    Represents the metadata of a pdf file, which is shown in the file picker
+
+    Attributes:
+    -----------
+    file : str
+        Absolute name of the file
+    size : int
+        Size of the file (the info is only valid as long as size and mtime do not change)
+    mtime : float
+        Modification time of the file
+    pages : int
+        Number of pages
+    title : str
+        Title of the pdf (metadata or first line of the first page)
+    date : str
+        First date found on the first page as yyyy-mm-dd ('' in case there is none)
+    is_result : bool
+        If the pdf looks like a "Meldeergebnis" (the first page contains the entry count header)
+
+    Methods:
+    --------
+    from_dict(values) : PDFInfo
+        Creates the info from the values of the index file
+    to_dict() : dict
+        Returns the values for the index file
+    date_str() : str
+        Returns the date as dd.mm.yyyy
+    """
+
+    def __init__(self, file: str, size: int, mtime: float, pages: int = 0, title: str = '', date: str = '',
+                 is_result: bool = False):
+        """ Initializes a new PDFInfo
+        :param file: Absolute name of the file
+        :param size: Size of the file
+        :param mtime: Modification time of the file
+        :param pages: Number of pages
+        :param title: Title of the pdf
+        :param date: Date as yyyy-mm-dd
+        :param is_result: If the pdf looks like a "Meldeergebnis"
+        """
+        self.file: str = file
+        self.size: int = size
+        self.mtime: float = mtime
+        self.pages: int = pages
+        self.title: str = title
+        self.date: str = date
+        self.is_result: bool = is_result
+
+    def __str__(self) -> str:
+        if not self.is_result:
+            return fr'{self.pages} p., no result'
+        if self.date:
+            return fr'{self.pages} p., {self.date_str()}'
+        return fr'{self.pages} p.'
+
+    def __repr__(self):
+        return fr'{self.__class__.__name__}({os.path.basename(self.file)}, {self.pages}, {self.date}, {self.is_result})'
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        """ Creates the info from the values of the index file
+        :param values: Dictionary with the attributes
+        :return: The info
+        """
+        return cls(values['file'], values['size'], values['mtime'], values.get('pages', 0), values.get('title', ''),
+                   values.get('date', ''), values.get('is_result', False))
+
+    def to_dict(self) -> dict:
+        """ Returns the values for the index file
+        :return: Dictionary with the attributes
+        """
+        return {'file': self.file, 'size': self.size, 'mtime': self.mtime, 'pages': self.pages, 'title': self.title,
+                'date': self.date, 'is_result': self.is_result}
+
+    def date_str(self) -> str:
+        """ Returns the date as dd.mm.yyyy
+        :return: The date or ''
+        """
+        if not self.date:
+            return ''
+        year, month, day = self.date.split('-')
+        return fr'{day}.{month}.{year}'
+
+
+class PDFIndex:
+    """
+    Represents an index file with the metadata of pdf files. The metadata is read in a background thread and stored
+    per file (name, size and modification time), so it is only read once for every version of a file.
+
+    Attributes:
+    -----------
+    file_name : str
+        Name of the index file
+    scanning : bool
+        If the background thread is running
+
+    Methods:
+    --------
+    get(file) : [PDFInfo, None]
+        Returns the metadata of a file in case it is known and valid
+    scan(files)
+        Reads the metadata of the unknown files in a background thread
+    wait()
+        Waits until the background thread is finished
+    stop()
+        Stops the background thread after the actual file
+    save()
+        Saves the index file
+    read_info(file, entry_cnt) : PDFInfo
+        Reads the metadata of a pdf file
+    read_date(file) : [datetime.date, None]
+        Reads the date of the meet from a pdf file
+    """
+
+    def __init__(self, file_name: str, entry_cnt: str):
+        """ Initializes a new PDFIndex and reads the index file (if it exists)
+        :param file_name: Name of the index file
+        :param entry_cnt: Text of the entry count header (first page of a "Meldeergebnis")
+        """
+        self._file_name: str = file_name
+        self._entry_cnt: str = entry_cnt
+        self._infos: dict = {}
+        self._lock = threading.Lock()
+        self._thread: [threading.Thread, None] = None
+        # Set to stop the background thread (MuPDF must not be used by two threads at the same time)
+        self._stop = threading.Event()
+        self._changed: bool = False
+        try:
+            with open(file_name, 'r', encoding='utf-8') as fp:
+                for values in json.load(fp):
+                    info = PDFInfo.from_dict(values)
+                    self._infos[info.file] = info
+        except (OSError, ValueError, KeyError, TypeError):
+            # No or invalid index file, everything is read again
+            self._infos = {}
+
+    @property
+    def file_name(self) -> str:
+        """ Returns the name of the index file
+        :return: Name of the index file
+        """
+        return self._file_name
+
+    @property
+    def scanning(self) -> bool:
+        """ Returns if the background thread is running
+        :return: True in case files are read
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def get(self, file: str) -> [PDFInfo, None]:
+        """ Returns the metadata of a file in case it is known and the file did not change
+        :param file: Name of the file
+        :return: The info or None
+        """
+        file = os.path.abspath(file)
+        with self._lock:
+            info = self._infos.get(file)
+        if info is None:
+            return None
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        if stat.st_size != info.size or stat.st_mtime != info.mtime:
+            return None
+        return info
+
+    def scan(self, files: list):
+        """ Reads the metadata of the unknown or changed files in a background thread (the index file is saved
+        afterward)
+        :param files: List of file names
+        """
+        missing = [os.path.abspath(file) for file in files if self.get(file) is None]
+        if not missing or self.scanning:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._scan, args=(missing,), daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        """ Waits until the background thread is finished """
+        if self._thread is not None:
+            self._thread.join()
+
+    def stop(self):
+        """ Stops the background thread after the actual file and waits until it is stopped (the files read so far
+        are saved, the rest is read with the next scan) """
+        self._stop.set()
+        self.wait()
+
+    def save(self):
+        """ Saves the index file (files which do not exist anymore are removed) """
+        with self._lock:
+            infos = [info.to_dict() for info in self._infos.values() if os.path.isfile(info.file)]
+            self._changed = False
+        temp_file = self._file_name + '.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as fp:
+                json.dump(infos, fp)
+            os.replace(temp_file, self._file_name)
+        except OSError as e:
+            _print(fr'Index file {self._file_name} not saved ({e})')
+
+    def _scan(self, files: list):
+        """ Reads the metadata of files (runs in the background thread)
+        :param files: List of absolute file names
+        """
+        for file in files:
+            if self._stop.is_set():
+                break
+            try:
+                info = self.read_info(file, self._entry_cnt)
+            except Exception:
+                # Not readable (e.g. incomplete download), stored as no result until the file changes
+                try:
+                    stat = os.stat(file)
+                except OSError:
+                    continue
+                info = PDFInfo(file, stat.st_size, stat.st_mtime)
+            with self._lock:
+                self._infos[file] = info
+                self._changed = True
+        if self._changed:
+            self.save()
+
+    @staticmethod
+    def read_info(file: str, entry_cnt: str) -> PDFInfo:
+        """ Reads the metadata of a pdf file (only the first page is analysed)
+        :param file: Name of the file
+        :param entry_cnt: Text of the entry count header (first page of a "Meldeergebnis")
+        :return: The info
+        """
+        file = os.path.abspath(file)
+        stat = os.stat(file)
+        info = PDFInfo(file, stat.st_size, stat.st_mtime)
+        with pymupdf.open(file) as doc:
+            info.pages = doc.page_count
+            info.title = (doc.metadata or {}).get('title', '') or ''
+            text = doc[0].get_text() if doc.page_count else ''
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if not info.title and lines:
+            info.title = lines[0]
+        info.is_result = bool(entry_cnt) and entry_cnt in text
+        date = date_from_text(text)
+        if date:
+            info.date = date.isoformat()
+        return info
+
+    @staticmethod
+    def read_date(file: str) -> [datetime.date, None]:
+        """ Reads the date of the meet from the first page of a pdf file
+        :param file: Name of the file
+        :return: The date or None in case there is no date on the first page
+        """
+        with pymupdf.open(file) as doc:
+            return date_from_text(doc[0].get_text()) if doc.page_count else None
@@ -1,11 +1,39 @@
+import gc
 import os
+import shutil
 import pymupdf
+import hashlib
 import datetime
+import threading
+import contextlib
+from Class_Config import Config
 from Class_PDFText import PDFText, PDFTextCombined
-from Class_Competition_Objects import SpecialCollection, Association, Section, Judge, Competition, Club, Year, Athlete, \
+from Class_ParseCache import ParseCache, RevisionDiff
+from Class_MemoryProfile import memory_step
+from Class_Metrics import Metrics, metrics
+from Class_Competition_Objects import Collection, SpecialCollection, Association, Section, Judge, Competition, Club, Year, Athlete, \
     Heat, Lane, Participants, Starts
 
 
+class _ReadCancelled(Exception):
+    """ Is raised inside of read_pdf in case the reading is cancelled """
+    pass
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """ Pauses the cyclic garbage collector while the objects of a pdf are created. The objects do not build reference
+    cycles (they are released by the collection), so the collector would only scan the growing number of objects again
+    and again. """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class PDFOperations:
     """
     Does the changes at the pdf.
@@ -16,15 +44,30 @@ class PDFOperations:
         Return the x_min and x_max of the pdf (left and right border)
     collection: SpecialCollection
         Returns the collected Data from the PDF
+    progress: tuple
+        Returns the read pages and the analysed competitions of read_pdf
+    report_read: bool
+        Returns if the result report (list of the clubs) is analysed
+    metrics: dict
+        Returns the counters of the last read_pdf (pages, words, lines, searches, objects, lookups, cache)
 
     Methods:
     --------
     read_pdf
         Reads the pdf file and collect data
+    finish
+        Reads the rest of the pdf after a lazy read_pdf
+    cancel
+        Cancels a running read_pdf or finish (from another thread)
     highlight_pdf
         Add rects behind the Text to PDF by occurrences list
     highlight_pdf_clubs
         Add rects behind the text to PDF by club occurrence
+    add_product_info
+        Add a footer with a link to the project to the PDF
+        
+    All methods accept a file name, bytes, a memoryview or a file-like object as pdf input. In case no output file
+    is given the resulting PDF is returned as bytes.
     """
     class _ReadPDF:
         """
@@ -49,17 +92,33 @@ class PDFOperations:
             Returns the actual page as text object
         find_next:
             Find the next occurrence of a string from the actual page
+        contains:
+            Returns if a string could be found on any page (word search only)
+        page_contains:
+            Returns if a string could be found on a page
+        add_words:
+            Adds already extracted words of pages
+        state:
+            Returns the position of the reader
+        restore:
+            Sets the position of the reader
         """
         
-        def __init__(self, doc):
+        def __init__(self, doc, word_search: bool = False, counters: [Metrics, None] = None):
             """
             Initializes a new _ReadPDF instance.
             
             :param doc: The pdf object as pymupdf object
+            :param word_search: Search within the extracted words instead of using the MuPDF text search
+            :param counters: Counters of the reading [default = None]
             """
             self.pages: list = list(doc.pages())
             self.index: int = -1
             self._last_data = {}
+            self._word_search: bool = word_search
+            # Extracted words per page index (only filled in word search mode)
+            self._words: dict = {}
+            self._counters: Metrics = counters if counters is not None else Metrics()
         
         def next_page(self):
             """
@@ -128,9 +187,15 @@ class PDFOperations:
                 if y_key != pdf_obj.y + ((self.index + 1) * 1000):
                     y_key = pdf_obj.y + ((self.index + 1) * 1000)
                     data[y_key] = []
+                    self._counters.add('lines_built')
                 data[y_key].append(pdf_obj)
                 return y_key
-            
+
+            self._counters.add('find_next_calls')
+            # Search within the extracted words
+            if self._word_search:
+                return self._find_next_words(text, header)
+
             page_data: dict = {}
             # Get starting point
             page = self.get_textpage()
@@ -168,7 +233,10 @@ class PDFOperations:
                     y_old: float = -1.0
                     key: float = y_old
                     # Get words
-                    for entry in page.extractWORDS():
+                    words = page.extractWORDS()
+                    self._counters.add('pages_extracted')
+                    self._counters.add('words_extracted', len(words))
+                    for entry in words:
                         pdf_text = PDFText(entry, self.index + 1)
                         # Add only if not in header
                         if pdf_text.y > header:
@@ -196,17 +264,191 @@ class PDFOperations:
             else:
                 # found nothing
                 return [], {}, self.index
-    
-    def __init__(self):
+
+        def contains(self, text: str) -> bool:
+            """
+            Returns if the text could be found in one of the pages (uses the extracted words)
+
+            :param text: String to be found
+            :return: True in case the text is found
+            """
+            for index in range(len(self.pages)):
+                if self.page_contains(index, text):
+                    return True
+            return False
+        
+        def page_contains(self, index: int, text: str) -> bool:
+            """
+            Returns if the text could be found on a page
+
+            :param index: Index of the page
+            :param text: String to be found
+            :return: True in case the text is found
+            """
+            if not self._word_search:
+                return bool(self.pages[index].get_textpage().search(text))
+            tokens = text.casefold().split()
+            for line in self._page_lines(index).values():
+                if self._match_tokens([obj.text.casefold() for obj in line], tokens):
+                    return True
+            return False
+        
+        def add_words(self, words: dict):
+            """
+            Adds already extracted words of pages (e.g. extracted by other processes)
+
+            :param words: Dictionary with page index and list of pymupdf word tuples
+            """
+            self._words.update(words)
+            self._counters.add('pages_extracted', len(words))
+            self._counters.add('words_extracted', sum(len(values) for values in words.values()))
+        
+        def state(self) -> tuple:
+            """
+            Returns the position of the reader
+
+            :return: Index of the actual page and the data left over by the last search
+            """
+            return self.index, dict(self._last_data)
+        
+        def restore(self, state: tuple):
+            """
+            Sets the position of the reader
+
+            :param state: Index of the actual page and the data left over by the last search (see state)
+            """
+            self.index = state[0]
+            self._last_data = dict(state[1])
+
+        def _page_words(self, index: int) -> list:
+            """
+            Returns the words of a page, every page is only extracted once
+
+            :param index: Index of the page
+            :return: List of pymupdf word tuples
+            """
+            if index not in self._words:
+                self._words[index] = self.pages[index].get_textpage().extractWORDS()
+                self._counters.add('pages_extracted')
+                self._counters.add('words_extracted', len(self._words[index]))
+            return self._words[index]
+
+        def _page_lines(self, index: int, header: float = -1000000.0) -> dict:
+            """
+            Creates the line index of a page (same keys as used by find_next)
+
+            :param index: Index of the page
+            :param header: Y-Pos, everything greater this value will not be returned
+            :return: Dictionary with y-key and a list of PDFText objects
+            """
+            lines: dict = {}
+            y_key: float = -1.0
+            for entry in self._page_words(index):
+                pdf_text = PDFText(entry, index + 1)
+                # Add only if not in header
+                if pdf_text.y > header:
+                    # New line in case y position changes
+                    if y_key != pdf_text.y + ((index + 1) * 1000):
+                        y_key = pdf_text.y + ((index + 1) * 1000)
+                        lines[y_key] = []
+                    lines[y_key].append(pdf_text)
+            self._counters.add('lines_built', len(lines))
+            return dict(sorted(lines.items()))
+
+        @staticmethod
+        def _match_tokens(words: list, tokens: list) -> bool:
+            """
+            Checks if a token sequence is part of a line (like a text search over the joined words)
+
+            :param words: Words of the line (casefolded)
+            :param tokens: Words of the search string (casefolded)
+            :return: True in case of a match
+            """
+            cnt = len(tokens)
+            if cnt == 0:
+                return False
+            for start in range(len(words) - cnt + 1):
+                if cnt == 1:
+                    # Single word could be part of a word
+                    if tokens[0] in words[start]:
+                        return True
+                # First word must end, last word must start with the token and all others must match
+                elif words[start].endswith(tokens[0]) and words[start + cnt - 1].startswith(tokens[-1]) \
+                        and words[start + 1:start + cnt - 1] == tokens[1:-1]:
+                    return True
+            return False
+
+        def _find_next_words(self, text: str, header: float) -> tuple:
+            """
+            Find the next occurrence of the text by searching the line index of the extracted words
+
+            :param text: String to be found
+            :param header: Y-Pos, everything greater this value will not be searched and returned pe page
+            :return: Match, Values to the Match, actual (page-) index
+            """
+            tokens = text.casefold().split()
+            page_data: dict = {}
+            # Get starting point
+            page = self.get_page()
+            while page:
+                # Use old data or the lines of a new page
+                if self._last_data:
+                    lines = dict(sorted(self._last_data.items()))
+                    self._last_data = {}
+                else:
+                    lines = self._page_lines(self.index, header)
+                # Search line by line
+                keys = list(lines.keys())
+                for i, key in enumerate(keys):
+                    if self._match_tokens([obj.text.casefold() for obj in lines[key]], tokens):
+                        # Everything up to the match is returned, the rest is stored for the next run
+                        for j in keys[:i + 1]:
+                            page_data[j] = lines[j]
+                        for j in keys[i + 1:]:
+                            self._last_data[j] = lines[j]
+                        # return values
+                        return page_data[key].copy(), page_data, self.index
+                # No match store everything
+                page_data.update(lines)
+                # Next step
+                page = self.next_page()
+            if text == '':
+                # go to end of document
+                return [], page_data, self.index
+            else:
+                # found nothing
+                return [], {}, self.index
+
+    def __init__(self, word_search: bool = False, config: [Config, None] = None, incremental: bool = False):
         """
         Initializes a new PDFOperations instance.
+        
+        :param word_search: Search within the extracted words, so every page is analysed only once by MuPDF
+        :param config: Configuration used for the collection [default = None]
+        :param incremental: Keep the parse cache, so a revised version can be read incrementally [default = False]
         """
         # self._rd_index : int = 0
+        self._word_search: bool = word_search
+        self._config: [Config, None] = config
+        self._incremental: bool = incremental
         self._header_pos = 0.0
         self._text_x_min: int = -1
         self._text_x_max: int = -1
         self._collection = None
         self._pdf_values = None
+        self._parse_cache: [ParseCache, None] = None
+        self._diff: [RevisionDiff, None] = None
+        # Progress of read_pdf (read pages, pages, analysed competitions, known competitions)
+        self._progress: tuple = (0, 0, 0, 0)
+        self._report_read: bool = False
+        self._cancel = threading.Event()
+        # Names of the clubs whose starts and judges are read (None = all clubs)
+        self._target_clubs: [set, None] = None
+        # Second stage of the reading (judges, competitions and lanes) in case read_pdf was lazy
+        self._stages = None
+        self._stage_lock = threading.RLock()
+        # Counters of the last read_pdf
+        self._metrics: Metrics = Metrics()
         pass
     
     @property
@@ -216,6 +458,9 @@ class PDFOperations:
         
         :return: x_min, x_max
         """
+        # Found while the competitions are read
+        if self._stages is not None:
+            self.finish()
         return self._text_x_min, self._text_x_max
     
     @property
@@ -227,88 +472,329 @@ class PDFOperations:
         """
         return self._collection
     
-    def read_pdf(self, pdf_file: str) -> bool:
+    @property
+    def metrics(self) -> dict:
         """
-        Read the pdf file and analyse it
+        Returns the counters of the last read_pdf (the counters of the outputs are in Class_Metrics.metrics)
         
-        :param pdf_file: File to be read
-        :return: Successfully (True) or not
+        :return: Dictionary with the counters
+        """
+        return self._metrics.to_dict()
+    
+    @property
+    def parse_cache(self) -> [ParseCache, None]:
+        """
+        Returns the data needed to read a revised version of the pdf incrementally
+        
+        :return: The cache of the last read pdf (only if incremental is set or a previous version was given)
+        """
+        if self._stages is not None:
+            self.finish()
+        return self._parse_cache
+    
+    @property
+    def diff(self) -> [RevisionDiff, None]:
+        """
+        Returns the differences to the previous version (only if read_pdf was called with a previous version)
+        
+        :return: The differences of the starts
+        """
+        if self._stages is not None:
+            self.finish()
+        return self._diff
+    
+    @property
+    def progress(self) -> tuple:
+        """
+        Returns the progress of read_pdf, can be called from another thread while the pdf is read. The number of
+        competitions grows while the sections are read.
+        
+        :return: Read pages, number of pages, analysed competitions, known competitions
+        """
+        return self._progress
+    
+    @property
+    def report_read(self) -> bool:
+        """
+        Returns if the result report is analysed, so all clubs of the collection are known (the athletes, judges and
+        starts are still missing while read_pdf is running)
+        
+        :return: True in case the clubs are known
+        """
+        return self._report_read
+    
+    def cancel(self):
+        """
+        Cancels a running read_pdf or finish (from another thread), the reading stops at the next competition and
+        returns False
+        """
+        self._cancel.set()
+    
+    def read_pdf(self, pdf_file, previous=None, workers: int = 0, lazy: bool = False, clubs=None) -> bool:
+        """
+        Read the pdf file and analyse it. In case a previous version of the pdf is given, only the sections with
+        changed pages are read from the pdf, all other sections are taken from the cache of the previous version.
+        
+        With more than one worker the text of the pages is extracted in parallel processes first (this is the
+        expensive part done by MuPDF). Afterward the sections are analysed in order, so clubs, athletes and years
+        found in several sections are only created once.
+        
+        In lazy mode only the result report is read, so the clubs and sections are known. The judges, competitions
+        and lanes are read by finish, which is called on the first access to them (e.g. club.occurrence,
+        club.athletes or collection.lanes) or can be called in a background thread.
+        
+        In case club names are given, only the starts and judges of these clubs are created. The rows of the other
+        clubs are only used to count the heats, so the heat numbers are the same as for a complete reading. All clubs
+        of the result report are created.
+        
+        :type pdf_file: [str, bytes, memoryview, BinaryIO]
+        :param pdf_file: File to be read or the pdf data in memory
+        :type previous: [PDFOperations, ParseCache, None]
+        :param previous: The previous version of the pdf or its cache [default = None]
+        :param workers: Number of processes to extract the text of the pages [default = 0 (no extra process)]
+        :param lazy: Read only the result report, the rest is read by finish [default = False]
+        :type clubs: [list, set, None]
+        :param clubs: Names of the clubs whose starts and judges are read [default = None (all clubs)]
+        :return: Successfully (True) or not (also in case it was cancelled)
+        """
+        self._target_clubs = set(clubs) if clubs else None
+        self._metrics = Metrics()
+        self._progress = (0, 0, 0, 0)
+        self._report_read = False
+        try:
+            stages = self._read_pdf(pdf_file, previous, workers)
+            # First stage: result report
+            with _gc_paused():
+                if not next(stages, False):
+                    return False
+            self._stages = stages
+        except _ReadCancelled:
+            self._cancelled()
+            return False
+        finally:
+            self._cancel.clear()
+        if lazy:
+            # Second stage on first access to the data
+            self._collection.defer(self.finish)
+            return True
+        return self.finish()
+    
+    def finish(self) -> bool:
+        """
+        Reads the judges, competitions and lanes after a lazy read_pdf (nothing is done in case everything is read).
+        Another thread accessing the data waits until the reading is finished.
+        
+        :return: Successfully (True) or not (also in case it was cancelled)
+        """
+        with self._stage_lock:
+            # Already finished (or called again while reading, e.g. the parser accesses the collection)
+            if self._stages is None:
+                return self._collection is not None
+            stages, self._stages = self._stages, None
+            try:
+                with _gc_paused():
+                    for _ in stages:
+                        pass
+                return True
+            except _ReadCancelled:
+                self._cancelled()
+                return False
+            finally:
+                self._cancel.clear()
+                if self._collection is not None:
+                    self._collection.defer(None)
+    
+    def _cancelled(self):
+        """ Releases the objects read so far after the reading was cancelled """
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Reading cancelled')
+        if self._collection is not None:
+            self._collection.close()
+        self._collection = None
+        self._parse_cache = None
+        self._diff = None
+        self._report_read = False
+    
+    def _step(self, read_obj, competitions: int = 0, known: int = 0):
+        """
+        Updates the progress of read_pdf and stops the reading in case it is cancelled
+        
+        :param read_obj: The reading object
+        :param competitions: Number of analysed competitions
+        :param known: Number of known competitions
+        """
+        if self._cancel.is_set():
+            raise _ReadCancelled()
+        self._progress = (max(read_obj.index + 1, 0), len(read_obj.pages), competitions, known)
+    
+    def _read_pdf(self, pdf_file, previous, workers: int):
+        """
+        Reads the pdf file and analyse it (see read_pdf). The reading is done in two stages, it stops after the
+        result report (yields True) and reads the rest with the next iteration.
+        
+        :param pdf_file: File to be read or the pdf data in memory
+        :param previous: The previous version of the pdf or its cache
+        :param workers: Number of processes to extract the text of the pages
+        :return: Generator, nothing is yielded in case the file could not be opened
         """
         
         # ---- File checks -----
-        # use full path
-        pdf_file = os.path.abspath(pdf_file)
+        name, doc = self._open_pdf(pdf_file)
         # Check if file exist
-        if not os.path.exists(pdf_file):
-            return False
+        if doc is None:
+            return
         # print information
         print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Analyse file:')
-        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {pdf_file}')
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {name}')
         
         # ---- Start reading -----
         # Generate local variables
-        self._collection: SpecialCollection = SpecialCollection(os.path.abspath(pdf_file))
+        self._collection: SpecialCollection = SpecialCollection(Collection.unique_name(name), self._config)
         # shortcut for pdf values
         self._pdf_values = self._collection.config.pdf_values
         
-        doc = pymupdf.open(pdf_file)
+        # ----- Work with reading object -----
+        # More workers than processors make no sense
+        workers = min(workers, os.cpu_count() or 1)
+        # The extracted words of the workers could only be used by the word search
+        read_obj = self._ReadPDF(doc, self._word_search or workers > 1, self._metrics)
+        self._step(read_obj)
+        
+        # ----- Compare with previous version -----
+        if isinstance(previous, PDFOperations):
+            previous = previous.parse_cache
+        # Hashing the pages costs time, so it is only done if needed
+        incremental = self._incremental or previous is not None
+        cache = ParseCache([ParseCache.page_hash(page) for page in read_obj.pages] if incremental else [])
+        cache.collection = self._collection
+        if previous:
+            # Known results of the judging panel search
+            cache.panel.update(previous.panel)
+            changed_pages = [i + 1 for i in cache.changed_pages(previous)]
+            print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Changed pages: {changed_pages}')
+        reparsed_sections: list = []
+        
+        # ----- Extract pages in parallel -----
+        if workers > 1:
+            # Only the changed pages in case of a previous version (missing pages are extracted when needed)
+            indexes = [no - 1 for no in changed_pages] if previous else list(range(len(read_obj.pages)))
+            read_obj.add_words(self._extract_parallel(doc, indexes, workers))
+            self._step(read_obj)
 
         # ----- Check for Judging panel -----
         judging_panel: bool = False
-        for page in doc.pages():
-            if page.get_textpage().search(self._pdf_values.judging_panel):
+        for index in range(len(read_obj.pages)):
+            self._step(read_obj)
+            page_hash = cache.page_hashes[index] if incremental else index
+            if page_hash not in cache.panel:
+                cache.panel[page_hash] = read_obj.page_contains(index, self._pdf_values.judging_panel)
+                if incremental:
+                    self._metrics.add('cache_misses', 1, 'panel')
+            else:
+                self._metrics.add('cache_hits', 1, 'panel')
+            if cache.panel[page_hash]:
                 judging_panel = True
                 break
+        cache.judging_panel = judging_panel
                 
         if not judging_panel:
             print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Debug: No judging panel found')
-        
-        # ----- Work with reading object -----
-        read_obj = self._ReadPDF(doc)
-        
-        # get header
-        findings, page_dict, _ = read_obj.find_next(self._pdf_values.entry_cnt)
-        if findings:
-            self._header_pos = findings[0].y - 1.0
+        memory_step('extract pages', self._collection)
+        
+        # Segment 0 is the result report
+        segment = cache.new_segment(read_obj.state())
+        old_segment = previous.segments[0] if previous and previous.segments else None
+        if old_segment and previous.judging_panel == judging_panel and \
+                all(i < len(cache.page_hashes) and previous.page_hashes[i] == cache.page_hashes[i]
+                    for i in range(old_segment['end'][0] + 1)):
+            # Result report did not change
+            self._metrics.add('cache_hits', 1, 'section')
+            cache.header_pos = self._header_pos = previous.header_pos
+            page_dict = old_segment['lines'][0]
+            segment['lines'] = old_segment['lines']
+            read_obj.restore(old_segment['end'])
+        else:
+            if previous:
+                self._metrics.add('cache_misses', 1, 'section')
+            # get header
+            findings, page_dict, _ = read_obj.find_next(self._pdf_values.entry_cnt)
+            if findings:
+                self._header_pos = findings[0].y - 1.0
+            cache.header_pos = self._header_pos
+            
+            # get competition information
+            if judging_panel:
+                findings, page_dict, _ = read_obj.find_next(self._pdf_values.judging_panel, self._header_pos)
+            else:
+                findings, page_dict, _ = read_obj.find_next(f'{self._pdf_values.segment} 1', self._header_pos)
+            segment['lines'].append(page_dict)
+        segment['end'] = read_obj.state()
         
         print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Process: Entry result')
-        # get competition information
-        if judging_panel:
-            findings, page_dict, _ = read_obj.find_next(self._pdf_values.judging_panel, self._header_pos)
-        else:
-            findings, page_dict, _ = read_obj.find_next(f'{self._pdf_values.segment} 1', self._header_pos)
+        self._step(read_obj)
         self._analyse_result_report(page_dict)
+        self._report_read = True
+        # Objects in the collection after the first stage (the second stage adds its growth at the end). These are the
+        # sizes of the collection, objects which were created and removed again are not counted.
+        report_objects = self._collection.object_counts()
+        self._metrics.update({'collection_objects': report_objects})
+        memory_step('result report', self._collection)
+        # ---- End of the first stage (clubs and sections are known) ----
+        yield True
+        
+        def next_dict(text: str) -> dict:
+            """ Returns the values until the next occurrence of the text (from the pdf or the previous version)
+            :param text: String to be found
+            :return: Values to the match
+            """
+            if old_segment:
+                return old_segment['lines'][len(segment['lines'])]
+            _, result, _ = read_obj.find_next(text, self._header_pos)
+            return result
         
         comp_index = 0
+        # Number of analysed competitions (progress)
+        comp_cnt = 0
         
         # ---- Loop over Document start with Judging panel ----
         for section_no, section in enumerate(self._collection.sections, start=1):
             
+            # Check if the section could be taken from the previous version
+            segment = cache.new_segment(read_obj.state())
+            old_segment = cache.reusable(section_no, previous, segment['start'])
+            if old_segment:
+                self._metrics.add('cache_hits', 1, 'section')
+                print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Unchanged: Section {section_no}')
+            elif previous:
+                self._metrics.add('cache_misses', 1, 'section')
+                reparsed_sections.append(section_no)
+            
             if judging_panel:
                 print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Process: Judging panel - Section {section_no}')
                 # ----- Get Judging panel
-                findings, page_dict, _ = read_obj.find_next(self._pdf_values.competition_sequenz, self._header_pos)
-                self._analyse_judging_panel(page_dict, section)
+                segment['lines'].append(next_dict(self._pdf_values.competition_sequenz))
+                self._analyse_judging_panel(segment['lines'][-1], section)
             else:
-                findings, page_dict, _ = read_obj.find_next(self._pdf_values.competition_sequenz, self._header_pos)
+                segment['lines'].append(next_dict(self._pdf_values.competition_sequenz))
             
             print(
                 fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Process: Competition sequenz - Section {section_no}')
             # ----- Get competition sequenz (find by "heat 1")
-            findings, page_dict, _ = read_obj.find_next(f'{self._pdf_values.heat} 1', self._header_pos)
-            left_over = self._analyse_sequenz(page_dict, section)
+            segment['lines'].append(next_dict(f'{self._pdf_values.heat} 1'))
+            left_over = self._analyse_sequenz(segment['lines'][-1], section)
             
             # ----- Loop over competitions
             # Get competition list without finals
             competitions = [comp for comp in self._collection.competitions if not comp.is_final()][comp_index:]
+            known = comp_index + len(competitions)
             # loop over all without the last one
             for i in range(0, len(competitions) - 1):
+                self._step(read_obj, comp_cnt, known)
                 print(
                     fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Process: Competition {str(competitions[i])}')
                 # Analyse competition
-                findings, page_dict, _ = read_obj.find_next(f'{self._pdf_values.competition} {competitions[i + 1].no}',
-                                                            self._header_pos)
-                self._analyse_competition(page_dict, competitions[i], left_over)
+                segment['lines'].append(next_dict(f'{self._pdf_values.competition} {competitions[i + 1].no}'))
+                self._analyse_competition(segment['lines'][-1], competitions[i], left_over)
+                comp_cnt += 1
                 # Clear left over
                 left_over = None
             # Check for last section (must loop to en of document)
@@ -324,22 +810,64 @@ class PDFOperations:
                 # Set new competition start index
                 comp_index += len(competitions)
             
+            self._step(read_obj, comp_cnt, known)
             print(
                 fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Process: Competition {str(competitions[-1])}')
             # Analyse last completion of section (or document)
-            findings, page_dict, _ = read_obj.find_next(find_str, self._header_pos)
-            self._analyse_competition(page_dict, competitions[-1])
-        
-        return True
+            segment['lines'].append(next_dict(find_str))
+            self._analyse_competition(segment['lines'][-1], competitions[-1])
+            comp_cnt += 1
+            
+            # Store end of section
+            if old_segment:
+                read_obj.restore(old_segment['end'])
+            segment['end'] = read_obj.state()
+            memory_step(fr'section {section_no}', self._collection)
+        
+        self._progress = (len(read_obj.pages), len(read_obj.pages), comp_cnt, comp_cnt)
+        for name, count in self._collection.object_counts().items():
+            if count > report_objects.get(name, 0):
+                self._metrics.add('collection_objects', count - report_objects.get(name, 0), name)
+        self._parse_cache = cache if incremental else None
+        # Compare with previous version
+        if previous and previous.collection is not None:
+            self._diff = RevisionDiff.compare(previous.collection, self._collection, changed_pages, reparsed_sections)
+        elif previous and previous.starts is not None:
+            # Cache loaded from a file
+            self._diff = RevisionDiff.compare(previous.starts, self._collection, changed_pages, reparsed_sections)
+        else:
+            self._diff = None
     
     @staticmethod
-    def highlight_pdf(input_pdf: str, output_pdf: str, occurrences: list[PDFText], color: [list, tuple],
-                      start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1):
+    def _extract_parallel(doc, indexes: list, workers: int) -> dict:
+        """ Extracts the words of pages in parallel processes
+        :param doc: The pymupdf document
+        :param indexes: Indexes of the pages to extract
+        :param workers: Number of processes
+        :return: Dictionary with page index and list of pymupdf word tuples
+        """
+        if not indexes:
+            return {}
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Extract {len(indexes)} pages with {workers} workers')
+        # Use the file if available, otherwise the pdf data is given to the workers
+        source = doc.name if doc.name and os.path.exists(doc.name) else doc.tobytes()
+        # Every worker gets a block of pages
+        size = -(-len(indexes) // workers)
+        chunks = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+        words: dict = {}
+        for result in _extract_pool(len(chunks)).map(_extract_words, [source] * len(chunks), chunks):
+            words.update(result)
+        return words
+    
+    @staticmethod
+    def highlight_pdf(input_pdf, output_pdf, occurrences: list[PDFText], color: [list, tuple],
+                      start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1,
+                      page_nos: [list, None] = None):
         """ Add rects behind the Text to PDF by occurrences list
-        :type input_pdf: str
-        :param input_pdf: Input pdf file
-        :type output_pdf: str
-        :param output_pdf: Output pdf file
+        :type input_pdf: [str, bytes, memoryview, BinaryIO]
+        :param input_pdf: Input pdf file or pdf data
+        :type output_pdf: [str, BinaryIO, None]
+        :param output_pdf: Output pdf file, in case of None the pdf is returned as bytes
         :type occurrences: list[PDFtext]
         :param occurrences: Object list with all the occurrences to highlight
         :type color: list
@@ -350,12 +878,14 @@ class PDFOperations:
         :param end_pos: End (x-pos) of annotation in percent or as float (direct position)
         :type offset_px: int
         :param offset_px: Offset in px to resize annotation
+        :type page_nos: [list, None]
+        :param page_nos: Numbers of the pages which are written (excerpt, see excerpt_pages) [default = None (all)]
+        :return: The pdf as bytes in case no output file is given
         """
         # ---- File checks -----
-        # use full path
-        input_pdf = os.path.abspath(input_pdf)
+        _, doc = PDFOperations._open_pdf(input_pdf)
         # Check if file exist
-        if not os.path.exists(input_pdf):
+        if doc is None:
             return False
         
         # ----- Color check -----
@@ -363,7 +893,6 @@ class PDFOperations:
             color = list(color)
         PDFOperations._color_check(color)
         
-        doc = pymupdf.open(input_pdf)
         pages = list(doc.pages())
         
         width = pages[0].mediabox[2]
@@ -374,22 +903,79 @@ class PDFOperations:
         
         PDFOperations._add_rects(occurrences, pages, color, pos_x1, pos_x2, offset_px, 0.2)
         
-        doc.save(output_pdf)
+        if page_nos is not None:
+            doc = PDFOperations._excerpt(doc, page_nos)
         
-        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Saved highlighted PDF to')
-        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {output_pdf}')
-        pass
+        return PDFOperations._save_pdf(doc, output_pdf)
     
     @staticmethod
-    def highlight_pdf_clubs(input_pdf: str, output_pdf: str, clubs: list[Club], colors: list[tuple],
-                            start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1):
+    def highlight_pdf_clubs(input_pdf, output_pdf, clubs: list[Club], colors: list[tuple],
+                            start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1,
+                            page_nos: [list, None] = None):
         """ Add rects behind the text to PDF by club occurrence
+        :type input_pdf: [str, bytes, memoryview, BinaryIO]
+        :param input_pdf: Input pdf file or pdf data
+        :type output_pdf: [str, BinaryIO, None]
+        :param output_pdf: Output pdf file, in case of None the pdf is returned as bytes
+        :type clubs: list[Club]
+        :param clubs: A list of clubs (or athletes) which should be annotated, later entries are drawn over earlier
+        :type colors: list[tuple]
+        :param colors: A list of colors for the annotation color for every club
+        :type start_pos: int, float
+        :param start_pos: Start (x-pos) of annotation in percent or as float (direct position)
+        :type end_pos: int, float
+        :param end_pos: End (x-pos) of annotation in percent or as float (direct position)
+        :type offset_px: int
+        :param offset_px: Offset in px to resize annotation
+        :type page_nos: [list, None]
+        :param page_nos: Numbers of the pages which are written (excerpt, see excerpt_pages) [default = None (all)]
+        :return: The pdf as bytes in case no output file is given
+        """
+        
+        # ---- File checks -----
+        if len(clubs) != len(colors):
+            raise Exception('clubs and colors must have the same length')
+        
+        _, doc = PDFOperations._open_pdf(input_pdf)
+        # Check if file exist
+        if doc is None:
+            return None
+        
+        pages = list(doc.pages())
+        
+        width = pages[0].mediabox[2]
+        
+        # ----- Calculate and check position -----
+        pos_x1 = PDFOperations._pos_x1_check(start_pos, width)
+        pos_x2 = PDFOperations._pos_x2_check(end_pos, width)
+        
+        for i in range(len(clubs)):
+            color = colors[i]
+            # ----- Color check -----
+            if type(color) is tuple:
+                color = list(color)
+            PDFOperations._color_check(color)
+            
+            PDFOperations._add_rects(clubs[i].occurrence, pages, color, pos_x1, pos_x2, offset_px, 0.2)
+        
+        if page_nos is not None:
+            doc = PDFOperations._excerpt(doc, page_nos)
+        
+        return PDFOperations._save_pdf(doc, output_pdf)
+    
+    @staticmethod
+    def annotate_pdf_clubs(input_pdf: str, output_pdf: str, clubs: list[Club], colors: list[tuple],
+                           start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1) -> bool:
+        """ Marks the clubs with highlight annotations (title = name of the club), which are appended to the output
+        with an incremental save. In case the output does not exist, it is a copy of the input. Otherwise, the
+        annotations of the clubs are replaced (new color) or added, all other objects of the output are not written
+        again
         :type input_pdf: str
-        :param input_pdf: Input pdf file
+        :param input_pdf: Input pdf file (the parsed pdf)
         :type output_pdf: str
-        :param output_pdf: Output pdf file
+        :param output_pdf: Output pdf file (created or updated)
         :type clubs: list[Club]
-        :param clubs: A list of clubs which should be annotated
+        :param clubs: A list of clubs (or athletes) which should be annotated
         :type colors: list[tuple]
         :param colors: A list of colors for the annotation color for every club
         :type start_pos: int, float
@@ -398,20 +984,121 @@ class PDFOperations:
         :param end_pos: End (x-pos) of annotation in percent or as float (direct position)
         :type offset_px: int
         :param offset_px: Offset in px to resize annotation
+        :return: True in case an existing output was updated
         """
         
         # ---- File checks -----
-        # use full path
+        if len(clubs) != len(colors):
+            raise Exception('clubs and colors must have the same length')
+        
         input_pdf = os.path.abspath(input_pdf)
-        # Check if file exist
+        output_pdf = os.path.abspath(output_pdf)
         if not os.path.exists(input_pdf):
-            return None
+            raise FileNotFoundError(fr'File {input_pdf} does not exist')
+        # New output is a byte copy of the input (nothing is rewritten)
+        update = os.path.exists(output_pdf)
+        # Size before the annotations are appended (a new output is counted completely)
+        size = os.path.getsize(output_pdf) if update else 0
+        if not update:
+            shutil.copyfile(input_pdf, output_pdf)
+        
+        with pymupdf.open(output_pdf) as doc:
+            if not doc.can_save_incrementally():
+                raise ValueError(fr'{os.path.basename(output_pdf)} can not be saved incrementally')
+            
+            pages = list(doc.pages())
+            
+            width = pages[0].mediabox[2]
+            
+            # ----- Calculate and check position -----
+            pos_x1 = PDFOperations._pos_x1_check(start_pos, width)
+            pos_x2 = PDFOperations._pos_x2_check(end_pos, width)
+            
+            for i in range(len(clubs)):
+                color = colors[i]
+                # ----- Color check -----
+                if type(color) is tuple:
+                    color = list(color)
+                PDFOperations._color_check(color)
+                
+                # Annotations of a previous run are replaced
+                if update:
+                    PDFOperations._remove_annots(pages, clubs[i].name)
+                PDFOperations._add_annots(clubs[i].occurrence, pages, color, pos_x1, pos_x2, offset_px, clubs[i].name)
+            
+            # Only the new and changed objects are appended
+            doc.saveIncr()
+        metrics.add('output_bytes', os.path.getsize(output_pdf) - size, 'pdf')
+        
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {"Updated" if update else "Saved"} annotated PDF')
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {output_pdf}')
+        return update
+    
+    @staticmethod
+    def excerpt_pages(clubs: list, title_pages: int = 1) -> list:
+        """ Returns the numbers of the pages which are needed for an excerpt of the clubs
+        :param clubs: A list of clubs (or athletes)
+        :param title_pages: Number of pages at the beginning, which are always part of the excerpt
+        :return: Sorted list of page numbers (first page is 1)
+        """
+        page_nos = set(range(1, title_pages + 1))
+        for club in clubs:
+            page_nos.update(obj.page_no for obj in club.occurrence if obj.page_no > 0)
+        return sorted(page_nos)
+    
+    @staticmethod
+    def _excerpt(doc, page_nos: list):
+        """ Creates a new document with some pages of a document (following pages are copied together)
+        :param doc: The pymupdf document
+        :param page_nos: Sorted list of page numbers (first page is 1)
+        :return: The new document
+        """
+        excerpt = pymupdf.open()
+        # Ranges of following pages
+        ranges: list = []
+        for page_no in page_nos:
+            if page_no > doc.page_count:
+                break
+            if ranges and ranges[-1][1] == page_no - 2:
+                ranges[-1][1] = page_no - 1
+            else:
+                ranges.append([page_no - 1, page_no - 1])
+        for from_page, to_page in ranges:
+            excerpt.insert_pdf(doc, from_page=from_page, to_page=to_page)
+        excerpt.set_metadata(doc.metadata)
+        return excerpt
+    
+    @staticmethod
+    def highlight_pdf_layers(input_pdf, output_pdf, clubs: list[Club], colors: list[tuple],
+                             start_pos: [int, float] = int(7), end_pos: [int, float] = int(95), offset_px: int = 1):
+        """ Add rects behind the text to PDF by club occurrence, the rects of every club are on an own layer (optional
+        content group with the name of the club), so the clubs can be switched on and off in the pdf reader
+        :type input_pdf: [str, bytes, memoryview, BinaryIO]
+        :param input_pdf: Input pdf file or pdf data
+        :type output_pdf: [str, BinaryIO, None]
+        :param output_pdf: Output pdf file, in case of None the pdf is returned as bytes
+        :type clubs: list[Club]
+        :param clubs: A list of clubs which should be annotated (clubs without occurrence get no layer)
+        :type colors: list[tuple]
+        :param colors: A list of colors for the annotation color for every club
+        :type start_pos: int, float
+        :param start_pos: Start (x-pos) of annotation in percent or as float (direct position)
+        :type end_pos: int, float
+        :param end_pos: End (x-pos) of annotation in percent or as float (direct position)
+        :type offset_px: int
+        :param offset_px: Offset in px to resize annotation
+        :return: The pdf as bytes in case no output file is given
+        """
         
         # ---- File checks -----
         if len(clubs) != len(colors):
             raise Exception('clubs and colors must have the same length')
         
-        doc = pymupdf.open(input_pdf)
+        _, doc = PDFOperations._open_pdf(input_pdf)
+        # Check if file exist
+        if doc is None:
+            return None
+        
         pages = list(doc.pages())
         
         width = pages[0].mediabox[2]
@@ -421,19 +1108,72 @@ class PDFOperations:
         pos_x2 = PDFOperations._pos_x2_check(end_pos, width)
         
         for i in range(len(clubs)):
+            if not clubs[i].occurrence:
+                continue
             color = colors[i]
             # ----- Color check -----
             if type(color) is tuple:
                 color = list(color)
             PDFOperations._color_check(color)
             
-            PDFOperations._add_rects(clubs[i].occurrence, pages, color, pos_x1, pos_x2, offset_px, 0.2)
+            # Layer of the club (visible by default)
+            oc = doc.add_ocg(clubs[i].name, on=True)
+            PDFOperations._add_layer_rects(clubs[i].occurrence, pages, color, pos_x1, pos_x2, offset_px, 0.2, oc)
+        
+        return PDFOperations._save_pdf(doc, output_pdf)
+    
+    @staticmethod
+    def _open_pdf(source) -> tuple:
+        """ Opens a pdf document from a file or from memory
+        :type source: [str, bytes, memoryview, BinaryIO, pymupdf.Document]
+        :param source: File name, pdf data, a file-like object or an already opened document
+        :return: Name of the source and the pymupdf document (None in case the file didn't exist)
+        """
+        # Document is still open
+        if isinstance(source, pymupdf.Document):
+            return source.name if source.name else '<memory>', source
+        # Data in memory
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data = bytes(source)
+        # File-like object
+        elif hasattr(source, 'read'):
+            data = source.read()
+        else:
+            # use full path
+            source = os.path.abspath(source)
+            # Check if file exist
+            if not os.path.exists(source):
+                return source, None
+            return source, pymupdf.open(source)
+        # Name of data in memory is the hash of the data
+        return fr'<memory:{hashlib.sha1(data).hexdigest()}>', pymupdf.open(stream=data, filetype='pdf')
+    
+    @staticmethod
+    def _save_pdf(doc, output_pdf):
+        """ Saves a pdf document to a file, a file-like object or returns it as bytes
+        :param doc: The pymupdf document
+        :type output_pdf: [str, BinaryIO, None]
+        :param output_pdf: Output pdf file, file-like object or None
+        :return: The pdf as bytes in case output is None
+        """
+        # Return data
+        if output_pdf is None:
+            data = doc.tobytes()
+            metrics.add('output_bytes', len(data), 'pdf')
+            return data
+        # Write to file-like object
+        if hasattr(output_pdf, 'write'):
+            data = doc.tobytes()
+            metrics.add('output_bytes', len(data), 'pdf')
+            output_pdf.write(data)
+            return None
         
         doc.save(output_pdf)
+        metrics.add('output_bytes', os.path.getsize(output_pdf), 'pdf')
         
         print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Saved highlighted PDF to')
         print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {output_pdf}')
-        pass
+        return None
     
     @staticmethod
     def _add_rects(occurrences: list, pages: list, color: list, start_px: float, end_px: float, offset_px: float,
@@ -465,6 +1205,76 @@ class PDFOperations:
             
             page.draw_rect(rect, color=color, fill=color, radius=radius, overlay=False)
     
+    @staticmethod
+    def _add_layer_rects(occurrences: list, pages: list, color: list, start_px: float, end_px: float,
+                         offset_px: float, radius: float, oc: int):
+        """ Add rectangles over the page beyond the Text on a layer (all rects of a page are drawn as one shape, so
+        every page only gets one additional content stream per layer)
+        :param occurrences: List of occurrence where the rect should be drawn
+        :param pages: List of Pages in which the occurrence should be
+        :param color: Color of the rectangles
+        :param start_px: Start position of the rectangles
+        :param end_px: End position of the rectangles
+        :param offset_px: Offset in px, how many px the rect should be bigger than the text
+        :param radius: The radius of the coners of the rectangles
+        :param oc: Xref of the optional content group (layer)
+        """
+        # Rects per page no
+        rects: dict = {}
+        for obj in occurrences:
+            # If no page is set
+            if obj.page_no <= 0:
+                continue
+            _, y0, _, y1 = obj.bbox
+            rects.setdefault(obj.page_no, []).append(
+                pymupdf.Rect(start_px - offset_px, y0 - offset_px, end_px + offset_px, y1 + offset_px))
+        
+        for page_no, page_rects in rects.items():
+            shape = pages[page_no - 1].new_shape()
+            for rect in page_rects:
+                shape.draw_rect(rect, radius=radius)
+            shape.finish(color=color, fill=color, oc=oc)
+            shape.commit(overlay=False)
+    
+    @staticmethod
+    def _add_annots(occurrences: list, pages: list, color: list, start_px: float, end_px: float, offset_px: float,
+                    title: str):
+        """ Add highlight annotations for the occurrences (one annotation per page with a quad for every occurrence)
+        :param occurrences: List of occurrence where the annotation should be added
+        :param pages: List of Pages in which the occurrence should be
+        :param color: Color of the annotations
+        :param start_px: Start position of the annotations
+        :param end_px: End position of the annotations
+        :param offset_px: Offset in px, how many px the annotation should be bigger than the text
+        :param title: Title of the annotations (name of the club to find them again)
+        """
+        # Rects per page no
+        rects: dict = {}
+        for obj in occurrences:
+            # If no page is set or the page does not exist in the output
+            if obj.page_no <= 0 or obj.page_no > len(pages):
+                continue
+            _, y0, _, y1 = obj.bbox
+            rects.setdefault(obj.page_no, []).append(
+                pymupdf.Rect(start_px - offset_px, y0 - offset_px, end_px + offset_px, y1 + offset_px).quad)
+        
+        for page_no, quads in rects.items():
+            annot = pages[page_no - 1].add_highlight_annot(quads)
+            annot.set_colors(stroke=color)
+            annot.set_info(title=title)
+            annot.update()
+    
+    @staticmethod
+    def _remove_annots(pages: list, title: str):
+        """ Removes the highlight annotations with a title
+        :param pages: List of pages
+        :param title: Title of the annotations (name of the club)
+        """
+        for page in pages:
+            for annot in list(page.annots(types=[pymupdf.PDF_ANNOT_HIGHLIGHT])):
+                if annot.info.get('title') == title:
+                    page.delete_annot(annot)
+    
     @staticmethod
     def _color_check(color: list):
         """ CHeck if the color is in correct format
@@ -616,7 +1426,11 @@ class PDFOperations:
             # If last entry is None -> no valid judging panel entry
             if entry[-1] is None:
                 continue
+            # Judges of other clubs are not needed
+            if self._target_clubs is not None and str(entry[2]) not in self._target_clubs:
+                continue
             # Add club
+            self._metrics.add('index_lookups', 1, 'club')
             club = self._collection.club_by_name(str(entry[2]))
             if club is not None:
                 club.add_occurrence(entry[2])
@@ -642,6 +1456,7 @@ class PDFOperations:
             line_text = ' '.join([obj.text for obj in objs])
             competition = Competition.from_string(line_text, section)
             if competition:
+                self._metrics.add('regex_matches', 1, 'competition')
                 if competition.is_final():
                     print(
                         fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Found finale: Competition {competition.no}')
@@ -683,6 +1498,7 @@ class PDFOperations:
                 # otherwise set year to 0
                 year_no = 0
             # Check if year is available in collection
+            self._metrics.add('index_lookups', 1, 'year')
             result_year = self._collection.get_year(year_no)
             if not result_year:
                 # In case year is not available create it
@@ -707,6 +1523,7 @@ class PDFOperations:
             
             # Check if athlete exist
             result_athlete = None
+            self._metrics.add('index_lookups', 1, 'athlete')
             athletes = self._collection.athletes_by_name(a_name)
             if athletes:
                 if len(athletes) > 0:
@@ -751,10 +1568,10 @@ class PDFOperations:
                     # Break loop
                     break
         
-        # create heat_zero
-        heat_zero = Heat(0)
+        # Heat 0 is only created in case there are lanes before the first heat
+        heat_zero = None
         # Still no heat found
-        heat = heat_zero
+        heat = None
         
         last_lane = 10000
         for entry in page_list:
@@ -764,25 +1581,7 @@ class PDFOperations:
             if None in entry:
                 continue
             
-            if entry_year is None:
-                if type(entry[YEAR_INDEX]) is PDFTextCombined:
-                    # Create year
-                    year = extract_year(entry[NAME_INDEX][-1])
-                    if year.year != 0:
-                        entry[NAME_INDEX].pop(-1)
-                else:
-                    year = Year(0)
-            else:
-                # Create year
-                year = extract_year(entry_year)
-            
-            # Create club
-            club = self._generate_club(entry[CLUB_INDEX])
-            # Create athlete
-            athlete = extract_athlete(entry[NAME_INDEX], club, year)
-            # Create time
-            time = datetime.time.fromisoformat(fr'00:{entry[TIME_INDEX].text}')
-            # ----- Create lane -----
+            # ----- Heat of the lane -----
             # Get lane text
             lane_str = entry[LANE_INDEX].text
             # Default: lane is not a list entry
@@ -794,7 +1593,7 @@ class PDFOperations:
                 if lane_no > 0:
                     if lane_no < last_lane:
                         # Create new heat
-                        heat = Heat(heat.no + 1, competition)
+                        heat = Heat(heat.no + 1 if heat else 1, competition)
                     # Store last lange to create new heat
                     last_lane = lane_no
             else:
@@ -803,13 +1602,36 @@ class PDFOperations:
                 # Lane is list entry
                 list_entry = True
             
+            # Rows of other clubs are only needed for the heats
+            if self._target_clubs is not None and entry[CLUB_INDEX].text not in self._target_clubs:
+                continue
+            
+            if entry_year is None:
+                if type(entry[YEAR_INDEX]) is PDFTextCombined:
+                    # Create year
+                    year = extract_year(entry[NAME_INDEX][-1])
+                    if year.year != 0:
+                        entry[NAME_INDEX].pop(-1)
+                else:
+                    year = Year(0)
+            else:
+                # Create year
+                year = extract_year(entry_year)
+            
+            # Create club
+            club = self._generate_club(entry[CLUB_INDEX])
+            # Create athlete
+            athlete = extract_athlete(entry[NAME_INDEX], club, year)
+            # Create time
+            time = datetime.time.fromisoformat(fr'00:{entry[TIME_INDEX].text}')
+            # ----- Create lane -----
+            if heat is None:
+                heat_zero = heat = Heat(0)
             lane = Lane(lane_no, time, athlete, heat, list_entry)
         
-        # Ad heat 0 to competition if it has lanes
-        if len(heat_zero.lanes) > 0:
+        # Add heat 0 to competition if it has lanes
+        if heat_zero is not None:
             heat_zero.competition = competition
-        else:
-            heat_zero.remove()
     
     def _create_table_list(self, page_dict: dict, header: list, stop_cond: str) -> list:
         """ Creates from objects inn the pages a table to be analysed
@@ -912,6 +1734,7 @@ class PDFOperations:
         :return: A club object
         """
         # check if club in list with name and pdf text
+        self._metrics.add('index_lookups', 1, 'club')
         club = next((x for x in self._collection.clubs if x.name == text_obj.text or x.name == name), None)
         if not club:
             # Create club
@@ -924,14 +1747,27 @@ class PDFOperations:
         return club
 
     @staticmethod
-    def add_product_info(pdf_file: str, collection: SpecialCollection):
+    def add_product_info(pdf_file, collection: SpecialCollection, page_nos: [list, None] = None):
+        """ Add a footer with a link to the project to every page (after the result report)
+        :type pdf_file: [str, bytes, memoryview, BinaryIO, pymupdf.Document]
+        :param pdf_file: File which is changed (incremental save) or the pdf data
+        :type collection: SpecialCollection
+        :param collection: The collection of the pdf
+        :type page_nos: [list, None]
+        :param page_nos: Numbers of the pages in the original pdf in case of an excerpt [default = None (all)]
+        :return: The changed pdf as bytes in case the pdf is not a file
+        """
         
         # ---- File checks -----
-        # use full path
-        pdf_file = os.path.abspath(pdf_file)
+        in_file = isinstance(pdf_file, (str, os.PathLike))
+        # Only the added bytes are counted as output (the pdf itself is counted by the highlighting)
+        size = len(pdf_file) if isinstance(pdf_file, (bytes, bytearray)) else 0
+        pdf_file, doc = PDFOperations._open_pdf(pdf_file)
         # Check if file exist
-        if not os.path.exists(pdf_file):
+        if doc is None:
             return None
+        if in_file:
+            size = os.path.getsize(pdf_file)
         
         # Try to get start page (min. 10 entries e.g. only judges are there)
         start_page = 0
@@ -939,15 +1775,23 @@ class PDFOperations:
             if len(c.occurrence) > 10:
                 start_page = c.occurrence[0].page_no
                 break
+        # Only the clubs of a targeted read have occurrences -> first page with a start
+        if start_page <= 0:
+            start_page = min((a.occurrence[0].page_no for a in collection.athletes if a.occurrence), default=1)
 
-        # Open PDF and create a list of valid pages
-        doc = pymupdf.open(pdf_file)
-        pages = list(doc.pages())[start_page-1:]
+        # Create a list of valid pages
+        if page_nos is None:
+            pages = list(doc.pages())[start_page-1:]
+        else:
+            pages = [page for page, page_no in zip(doc.pages(), page_nos) if page_no >= start_page]
+        # Nothing to add (e.g. excerpt with the title page only)
+        if not pages:
+            return None if in_file else doc.tobytes()
         
         # ---- Check for drawing e.g. line before bottom
         draws = []
         # check in first four pages of same drawings
-        for i in range(4):
+        for i in range(min(4, len(pages))):
             draws.append([])
             for drawing in pages[i].get_drawings():
                 if drawing['rect'].y0 > 750.0 and drawing['rect'].y0 == drawing['rect'].y1:
@@ -1022,12 +1866,63 @@ class PDFOperations:
                 page.insert_textbox(text_rect, text, fontsize=font_size, overlay=False, color=[0, 0, 0])
                 page.insert_link(link)
             
-            doc.saveIncr()
+            if in_file:
+                doc.saveIncr()
+                metrics.add('output_bytes', os.path.getsize(pdf_file) - size, 'pdf')
             
             print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Add product info to {os.path.basename(pdf_file)}')
         else:
             print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] FAILED add product info to {os.path.basename(pdf_file)}')
+        
+        if not in_file:
+            data = doc.tobytes()
+            if size:
+                metrics.add('output_bytes', max(0, len(data) - size), 'pdf')
+            return data
         pass
         
         
-        
\ No newline at end of file
+        
+
+
+# Worker processes of PDFOperations._extract_parallel. Starting the processes costs about as much as extracting a few
+# pages, so they are kept for the next read_pdf (e.g. several versions of a pdf or the pdfs of the text interface).
+_pool = None
+_pool_size: int = 0
+_pool_lock = threading.Lock()
+
+
+def _extract_pool(workers: int):
+    """ Returns the worker processes to extract the words of pages, the processes are started on first use and a new
+    pool is only created in case more workers are needed or a process crashed
+    :param workers: Number of needed processes
+    :return: The ProcessPoolExecutor
+    """
+    global _pool, _pool_size
+    # Only loaded with workers (multiprocessing is not needed otherwise)
+    from concurrent.futures import ProcessPoolExecutor
+    with _pool_lock:
+        # A pool with a crashed process does not start a new one (private flag, there is no public one)
+        if _pool is None or _pool_size < workers or getattr(_pool, '_broken', False):
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # The processes are stopped by concurrent.futures at the exit of the program
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_size = workers
+        return _pool
+
+
+def _extract_words(source, indexes: list) -> dict:
+    """ Extracts the words of pages (runs in a worker process of PDFOperations.read_pdf)
+    :type source: [str, bytes]
+    :param source: File name or pdf data
+    :param indexes: Indexes of the pages to extract
+    :return: Dictionary with page index and list of pymupdf word tuples
+    """
+    if isinstance(source, bytes):
+        doc = pymupdf.open(stream=source, filetype='pdf')
+    else:
+        doc = pymupdf.open(source)
+    words = {index: doc[index].get_textpage().extractWORDS() for index in indexes}
+    doc.close()
+    return words
@@ -25,6 +25,10 @@ class PDFText:
     --------
     combine : PDFText
         combines a list of PDFText objects
+    to_json : list
+        Returns the object as json value
+    from_json(values) : PDFText
+        Creates an object from its json value
     """
     
     def __init__(self, value: tuple, page_no: int = -1):
@@ -161,6 +165,31 @@ class PDFText:
                     y2 = obj[3]
         # New PDF object with new data
         return PDFText((x1, y1, x2, y2, text.strip()), page_no)
+    
+    def to_json(self) -> list:
+        """
+        Returns the object as json value (e.g. to store the lines of the parse cache)
+        
+        :return: List with the pymupdf values and the page no
+        """
+        return [list(self._value), self._page_no]
+    
+    @staticmethod
+    def from_json(values):
+        """
+        Creates an object from its json value (see to_json)
+        
+        :type values: [list, dict]
+        :param values: The json value
+        :return: A new PDFText or PDFTextCombined object
+        """
+        if isinstance(values, dict):
+            obj = PDFTextCombined.__new__(PDFTextCombined)
+            PDFText.__init__(obj, tuple(values['value']), values['page_no'])
+            obj.objects = [PDFText.from_json(value) for value in values['objects']]
+            return obj
+        value, page_no = values
+        return PDFText(tuple(value), page_no)
 
 
 class PDFTextCombined(PDFText):
@@ -220,6 +249,15 @@ class PDFTextCombined(PDFText):
     def __getitem__(self, index: int):
         return self.objects[index]
     
+    def to_json(self) -> dict:
+        """
+        Returns the object as json value including the objects it is made from
+        
+        :return: Dictionary with the pymupdf values, the page no and the objects
+        """
+        return {'value': list(self._value), 'page_no': self._page_no,
+                'objects': [obj.to_json() for obj in self.objects]}
+    
     def pop(self, index: int):
         """
         Remove a value from the list which has the index and returns it
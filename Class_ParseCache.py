@@ -0,0 +1,338 @@
+import os
+import json
+import hashlib
+
+from Class_PDFText import PDFText
+from Class_Competition_Objects import Collection
+
+# Version of the stored caches, stored caches of another version are not used
+CACHE_VERSION: int = 2
+
+
+class ParseCache:
+    """
+    Represents the data of a parsed pdf, which is needed to parse a revised version of the same pdf incrementally.
+    The pdf is split into segments (result report and one segment per section). For every segment the state of the
+    reader at its start and end as well as the lines returned by the reader are stored. A segment of the revised
+    version whose pages did not change is taken from here instead of being read from the pdf again.
+
+    Attributes:
+    -----------
+    page_hashes : list
+        Hash of the content of every page
+    panel : dict
+        Page hash and if the judging panel is found on the page
+    header_pos : float
+        Y-Pos of the page header
+    judging_panel : bool
+        If the pdf has a judging panel
+    segments : list
+        The stored segments (see new_segment)
+    collection : Collection
+        The collection created from the pdf
+    starts : [dict, None]
+        The starts of the collection in case the cache is loaded from a file (see RevisionDiff.compare)
+
+    Methods:
+    --------
+    file_name(pdf_file) : str
+        Returns the name of the stored cache of a pdf
+    save(file_name, pdf_file)
+        Stores the cache in a file
+    load(file_name, pdf_file) : [ParseCache, None]
+        Loads a stored cache
+    page_hash(page) : str
+        Returns the hash of the content of a page
+    changed_pages(other) : list
+        Returns the indexes of the pages which differ from an other cache
+    new_segment(state) : dict
+        Creates a new segment
+    reusable(no, other, state) : [dict, None]
+        Returns the segment of an other cache in case it can be used
+    """
+
+    def __init__(self, page_hashes: list):
+        """ Initializes a new ParseCache
+        :param page_hashes: Hash of the content of every page
+        """
+        self.page_hashes: list = page_hashes
+        self.panel: dict = {}
+        self.header_pos: float = 0.0
+        self.judging_panel: bool = False
+        self.segments: list = []
+        self.collection: [Collection, None] = None
+        self.starts: [dict, None] = None
+
+    @staticmethod
+    def file_name(pdf_file: str) -> str:
+        """ Returns the name of the stored cache of a pdf (next to the pdf)
+        :param pdf_file: Name of the pdf
+        :return: Name of the cache file
+        """
+        return os.path.splitext(pdf_file)[0] + '.parsecache'
+
+    @staticmethod
+    def _file_hash(pdf_file: str) -> str:
+        """ Returns the hash of a pdf file (a stored cache is only used for the same file)
+        :param pdf_file: Name of the pdf
+        :return: The hash as hex string
+        """
+        with open(pdf_file, 'rb') as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+
+    @staticmethod
+    def _lines_to_json(lines: dict) -> list:
+        """ Returns lines of the reader (y-position and texts) as json value, the keys are stored as pairs, so they
+        stay numbers
+        :param lines: Dictionary with the y-position and a list of PDFText objects
+        :return: List of pairs
+        """
+        return [[key, [text.to_json() for text in texts]] for key, texts in lines.items()]
+
+    @staticmethod
+    def _lines_from_json(values: list) -> dict:
+        """ Creates lines of the reader from their json value (see _lines_to_json)
+        :param values: List of pairs
+        :return: Dictionary with the y-position and a list of PDFText objects
+        """
+        return {key: [PDFText.from_json(text) for text in texts] for key, texts in values}
+
+    def save(self, file_name: str, pdf_file: str) -> bool:
+        """ Stores the cache as json file, so the pdf does not need to be read again to read its next version. The
+        collection is not stored, only its starts for the comparison with the next version.
+        :param file_name: Name of the cache file
+        :param pdf_file: Name of the pdf the cache belongs to
+        :return: Successfully (True) or not
+        """
+        starts = RevisionDiff._starts(self.collection) if self.collection is not None else self.starts
+        values = {
+            'version': CACHE_VERSION,
+            'file_hash': self._file_hash(pdf_file),
+            'page_hashes': self.page_hashes,
+            'panel': [[key, value] for key, value in self.panel.items()],
+            'header_pos': self.header_pos,
+            'judging_panel': self.judging_panel,
+            'segments': [{'start': [segment['start'][0], self._lines_to_json(segment['start'][1])],
+                          'end': [segment['end'][0], self._lines_to_json(segment['end'][1])],
+                          'lines': [self._lines_to_json(lines) for lines in segment['lines']]}
+                         for segment in self.segments],
+            'starts': [[list(key), list(value)] for key, value in starts.items()] if starts is not None else None,
+        }
+        try:
+            with open(file_name, 'w', encoding='utf-8') as fp:
+                json.dump(values, fp)
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def load(cls, file_name: str, pdf_file: str):
+        """ Loads a stored cache (only data is read, the file is checked against the pdf before the cache is created)
+        :param file_name: Name of the cache file
+        :param pdf_file: Name of the pdf the cache should belong to
+        :return: The ParseCache or None in case there is no valid cache for the pdf (e.g. the pdf was changed)
+        """
+        if not os.path.isfile(file_name):
+            return None
+        try:
+            with open(file_name, 'r', encoding='utf-8') as fp:
+                values = json.load(fp)
+            if values['version'] != CACHE_VERSION or values['file_hash'] != cls._file_hash(pdf_file):
+                return None
+            cache = cls([str(value) for value in values['page_hashes']])
+            cache.panel = {key: bool(value) for key, value in values['panel']}
+            cache.header_pos = float(values['header_pos'])
+            cache.judging_panel = bool(values['judging_panel'])
+            for segment in values['segments']:
+                cache.segments.append({
+                    'start': (int(segment['start'][0]), cls._lines_from_json(segment['start'][1])),
+                    'end': (int(segment['end'][0]), cls._lines_from_json(segment['end'][1])),
+                    'lines': [cls._lines_from_json(lines) for lines in segment['lines']]})
+            if values['starts'] is not None:
+                cache.starts = {tuple(key): tuple(value) for key, value in values['starts']}
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            # No valid cache file (e.g. another format), the pdf is read again
+            return None
+        return cache
+
+    @staticmethod
+    def page_hash(page) -> str:
+        """ Returns the hash of the content of a page (the raw content, so the text must not be extracted)
+        :param page: pymupdf page object
+        :return: The hash as hex string
+        """
+        sha = hashlib.sha1(page.read_contents())
+        sha.update(str(tuple(page.rect)).encode())
+        return sha.hexdigest()
+
+    def changed_pages(self, other) -> list:
+        """ Returns the indexes of the pages which differ from an other cache
+        :param other: The cache of the previous version
+        :return: List of page indexes (of this cache)
+        """
+        if other is None:
+            return list(range(len(self.page_hashes)))
+        return [i for i, value in enumerate(self.page_hashes)
+                if i >= len(other.page_hashes) or other.page_hashes[i] != value]
+
+    def new_segment(self, state: tuple) -> dict:
+        """ Creates a new segment
+        :param state: State of the reader at the start of the segment (index and left over data)
+        :return: The segment with start state, end state and the lines returned by the reader
+        """
+        segment = {'start': state, 'end': state, 'lines': []}
+        self.segments.append(segment)
+        return segment
+
+    def reusable(self, no: int, other, state: tuple) -> [dict, None]:
+        """ Returns the segment of an other cache in case it can be used for this one
+        :param no: Number of the segment
+        :param other: The cache of the previous version
+        :param state: Actual state of the reader
+        :return: The segment or None in case it must be read again
+        """
+        if other is None or no >= len(other.segments):
+            return None
+        if self.header_pos != other.header_pos or self.judging_panel != other.judging_panel:
+            return None
+        segment = other.segments[no]
+        # The reader must be at the same position
+        if segment['start'][0] != state[0] or segment['start'][1].keys() != state[1].keys():
+            return None
+        # All pages of the segment must be the same
+        start = max(segment['start'][0], 0)
+        for i in range(start, segment['end'][0] + 1):
+            if i >= len(self.page_hashes) or i >= len(other.page_hashes) \
+                    or self.page_hashes[i] != other.page_hashes[i]:
+                return None
+        return segment
+
+
+class LaneChange:
+    """
+    Represents the change of a start of an athlete in a competition between two versions of a pdf
+
+    Attributes:
+    -----------
+    athlete : str
+        Name of the athlete
+    year : int
+        Year of the athlete
+    club : str
+        Name of the club
+    competition : int
+        Number of the competition
+    old : [tuple, None]
+        Heat and lane in the previous version (None in case it is a new start)
+    new : [tuple, None]
+        Heat and lane in the revised version (None in case the start was removed)
+    """
+
+    def __init__(self, key: tuple, old: [tuple, None], new: [tuple, None]):
+        """ Initializes a new LaneChange
+        :param key: Athlete name, year, club and competition number
+        :param old: Heat and lane in the previous version
+        :param new: Heat and lane in the revised version
+        """
+        self.athlete, self.year, self.club, self.competition = key
+        self.old: [tuple, None] = old
+        self.new: [tuple, None] = new
+
+    def __str__(self) -> str:
+        result = fr'{self.athlete} ({self.year}, {self.club}) - Competition {self.competition}: '
+        if self.old is None:
+            return result + fr'new in heat {self.new[0]} lane {self.new[1]}'
+        if self.new is None:
+            return result + fr'removed from heat {self.old[0]} lane {self.old[1]}'
+        return result + fr'heat {self.old[0]} lane {self.old[1]} -> heat {self.new[0]} lane {self.new[1]}'
+
+    def __repr__(self):
+        return fr'{self.__class__.__name__}({self.athlete}, {self.competition}, {self.old}, {self.new})'
+
+
+class RevisionDiff:
+    """
+    Represents the differences between two versions of a pdf
+
+    Attributes:
+    -----------
+    added : list
+        New starts (LaneChange)
+    removed : list
+        Removed starts (LaneChange)
+    moved : list
+        Starts with another heat or lane (LaneChange)
+    changed_pages : list
+        Numbers of the changed pages
+    reparsed_sections : list
+        Numbers of the sections which were read again
+
+    Methods:
+    --------
+    compare(old, new, changed_pages, reparsed_sections) : RevisionDiff
+        Compares the starts of two collections
+    is_empty() : bool
+        Returns if there is no difference in the starts
+    """
+
+    def __init__(self):
+        """ Initializes a new (empty) RevisionDiff """
+        self.added: list = []
+        self.removed: list = []
+        self.moved: list = []
+        self.changed_pages: list = []
+        self.reparsed_sections: list = []
+
+    def __str__(self) -> str:
+        lines = [fr'Changed pages: {", ".join(str(no) for no in self.changed_pages) or "-"}',
+                 fr'Sections read again: {", ".join(str(no) for no in self.reparsed_sections) or "-"}']
+        for heading, changes in (('Added', self.added), ('Removed', self.removed), ('Moved', self.moved)):
+            lines.append(fr'{heading}: {len(changes)}')
+            lines += [fr'  {change}' for change in changes]
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _starts(collection: Collection) -> dict:
+        """ Returns all starts of a collection
+        :param collection: The collection
+        :return: A dictionary with athlete name, year, club and competition number as key and heat and lane as value
+        """
+        starts: dict = {}
+        for lane in collection.lanes:
+            athlete = lane.athlete
+            if not lane.heat or not lane.heat.competition:
+                continue
+            key = (athlete.name, athlete.year.year if athlete.year else 0,
+                   athlete.club.name if athlete.club else '', lane.heat.competition.no)
+            starts[key] = (lane.heat.no, lane.no)
+        return starts
+
+    @classmethod
+    def compare(cls, old: [Collection, dict], new: Collection, changed_pages: [list, None] = None,
+                reparsed_sections: [list, None] = None):
+        """ Compares the starts of two collections
+        :param old: Collection of the previous version or its starts (ParseCache.starts of a stored cache)
+        :param new: Collection of the revised version
+        :param changed_pages: Numbers of the changed pages [default = None]
+        :param reparsed_sections: Numbers of the sections which were read again [default = None]
+        :return: The RevisionDiff
+        """
+        diff = cls()
+        diff.changed_pages = changed_pages if changed_pages else []
+        diff.reparsed_sections = reparsed_sections if reparsed_sections else []
+        old_starts = old if isinstance(old, dict) else cls._starts(old)
+        new_starts = cls._starts(new)
+        for key in sorted(new_starts.keys() | old_starts.keys(), key=lambda k: (k[3], k[0], k[1], k[2])):
+            if key not in old_starts:
+                diff.added.append(LaneChange(key, None, new_starts[key]))
+            elif key not in new_starts:
+                diff.removed.append(LaneChange(key, old_starts[key], None))
+            elif old_starts[key] != new_starts[key]:
+                diff.moved.append(LaneChange(key, old_starts[key], new_starts[key]))
+        return diff
+
+    def is_empty(self) -> bool:
+        """ Returns if there is no difference in the starts
+        :return: True in case nothing was added, removed or moved
+        """
+        return not (self.added or self.removed or self.moved)
@@ -0,0 +1,399 @@
+import os
+import sqlite3
+import hashlib
+import datetime
+
+from Class_AthleteIndex import AthleteIndex
+from Class_Competition_Objects import SpecialCollection
+
+# Version of the database layout (stored as user_version)
+SCHEMA_VERSION: int = 2
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS meets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL,
+    imported TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clubs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    dsv_id TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS athletes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    club_id INTEGER NOT NULL,
+    UNIQUE (name, year, club_id)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    meet_id INTEGER NOT NULL REFERENCES meets(id) ON DELETE CASCADE,
+    no INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS competitions (
+    id INTEGER PRIMARY KEY,
+    meet_id INTEGER NOT NULL REFERENCES meets(id) ON DELETE CASCADE,
+    section_id INTEGER REFERENCES sections(id) ON DELETE CASCADE,
+    no INTEGER NOT NULL,
+    discipline TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    repetition INTEGER NOT NULL,
+    sex TEXT NOT NULL,
+    text TEXT NOT NULL,
+    final INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS heats (
+    id INTEGER PRIMARY KEY,
+    competition_id INTEGER NOT NULL REFERENCES competitions(id) ON DELETE CASCADE,
+    no INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lanes (
+    id INTEGER PRIMARY KEY,
+    meet_id INTEGER NOT NULL REFERENCES meets(id) ON DELETE CASCADE,
+    heat_id INTEGER REFERENCES heats(id) ON DELETE CASCADE,
+    athlete_id INTEGER NOT NULL REFERENCES athletes(id),
+    no INTEGER NOT NULL,
+    entry_time REAL NOT NULL,
+    list_entry INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS judges (
+    id INTEGER PRIMARY KEY,
+    meet_id INTEGER NOT NULL REFERENCES meets(id) ON DELETE CASCADE,
+    section_id INTEGER REFERENCES sections(id) ON DELETE CASCADE,
+    club_id INTEGER REFERENCES clubs(id),
+    position TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meets_date ON meets(date);
+CREATE INDEX IF NOT EXISTS idx_meets_source ON meets(source);
+CREATE INDEX IF NOT EXISTS idx_meets_hash ON meets(content_hash);
+CREATE INDEX IF NOT EXISTS idx_athletes_key ON athletes(key);
+CREATE INDEX IF NOT EXISTS idx_athletes_club ON athletes(club_id);
+CREATE INDEX IF NOT EXISTS idx_sections_meet ON sections(meet_id);
+CREATE INDEX IF NOT EXISTS idx_competitions_meet ON competitions(meet_id, no);
+CREATE INDEX IF NOT EXISTS idx_heats_competition ON heats(competition_id);
+CREATE INDEX IF NOT EXISTS idx_lanes_athlete ON lanes(athlete_id);
+CREATE INDEX IF NOT EXISTS idx_lanes_heat ON lanes(heat_id);
+CREATE INDEX IF NOT EXISTS idx_lanes_meet ON lanes(meet_id);
+CREATE INDEX IF NOT EXISTS idx_judges_meet ON judges(meet_id);
+CREATE INDEX IF NOT EXISTS idx_judges_club ON judges(club_id);
+'''
+
+# Select of a start with meet, competition, heat and athlete (used by the queries)
+_STARTS: str = '''
+SELECT meets.date AS date, meets.name AS meet, competitions.no AS competition, competitions.text AS text,
+       competitions.repetition AS repetition, competitions.distance AS distance,
+       competitions.discipline AS discipline, competitions.sex AS sex, heats.no AS heat, lanes.no AS lane,
+       lanes.list_entry AS list_entry, athletes.name AS athlete, athletes.year AS year, clubs.name AS club,
+       lanes.entry_time AS entry_time
+FROM lanes
+JOIN meets ON meets.id = lanes.meet_id
+JOIN athletes ON athletes.id = lanes.athlete_id
+LEFT JOIN clubs ON clubs.id = athletes.club_id
+LEFT JOIN heats ON heats.id = lanes.heat_id
+LEFT JOIN competitions ON competitions.id = heats.competition_id
+'''
+
+
+def time_to_seconds(value: [datetime.time, None]) -> float:
+    """ Converts the entry time of a lane to seconds
+    :param value: Entry time
+    :return: The time in seconds (0.0 in case there is no time)
+    """
+    if value is None:
+        return 0.0
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1000000
+
+
+def seconds_to_str(value: float) -> str:
+    """ Converts seconds to a time string like 00:00,00 (same format as Lane.time_str)
+    :param value: Time in seconds
+    :return: A time string
+    """
+    hundredths = int(round(value * 100))
+    return fr'{hundredths // 6000:02d}:{hundredths // 100 % 60:02d},{hundredths % 100:02d}'
+
+
+class ResultStore:
+    """
+    Represents a local sqlite database, which stores parsed "Meldeergebnisse" of several meets. Clubs and athletes are
+    shared between the meets, so the starts of a club or an athlete can be compared over a whole season without
+    parsing the pdfs again.
+
+    Attributes:
+    -----------
+    file_name : str
+        Name of the database file
+
+    Methods:
+    --------
+    add(collection, name, date, source) : int
+        Stores a collection as meet (an existing meet of the same pdf is replaced)
+    meet_name(meet_id) : str
+        Returns the name of a meet
+    remove(name) : bool
+        Removes a meet
+    meets() : list
+        Returns all stored meets
+    club_starts(club, since, until) : list
+        Returns all starts of a club
+    athlete_starts(name, year, since, until) : list
+        Returns all starts of an athlete
+    athlete_progression(name, year, distance, discipline, since, until) : list
+        Returns the entry times of an athlete per discipline ordered by date
+    close()
+        Closes the database
+    """
+
+    def __init__(self, file_name: str):
+        """ Initializes a new ResultStore (the database is created in case it does not exist)
+        :param file_name: Name of the database file
+        """
+        self.file_name: str = os.path.abspath(os.path.expanduser(file_name))
+        self._db = sqlite3.connect(self.file_name)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA foreign_keys = ON')
+        self._db.execute('PRAGMA journal_mode = WAL')
+        if self._db.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            with self._db:
+                # Version 1 had no content hash (the table exists, so it is not created again by the schema)
+                columns = [row['name'] for row in self._db.execute('PRAGMA table_info(meets)')]
+                if columns and 'content_hash' not in columns:
+                    self._db.execute("ALTER TABLE meets ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+                self._db.executescript(_SCHEMA)
+                self._db.execute(fr'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """ Closes the database """
+        self._db.close()
+
+    def add(self, collection: SpecialCollection, name: str = '', date: [datetime.date, None] = None,
+            source: str = '') -> int:
+        """ Stores a collection as meet, all rows are inserted in one transaction. An existing meet of the same pdf
+        (same file or same content) is replaced, without a source the meet with the same name is replaced. The name is
+        only displayed, in case it is used by another meet (e.g. downloads with the same file name) a number is added.
+        :param collection: The parsed pdf
+        :param name: Name of the meet [default = '' (file name of source or name of the collection)]
+        :param date: Date of the meet [default = None (today)]
+        :param source: The pdf file [default = '']
+        :return: Id of the meet
+        """
+        source = os.path.abspath(source) if source else ''
+        content_hash = ''
+        if source and os.path.isfile(source):
+            with open(source, 'rb') as fp:
+                content_hash = hashlib.sha1(fp.read()).hexdigest()
+        if not name:
+            name = os.path.basename(source) if source else os.path.basename(collection.name)
+        date = date if date else datetime.date.today()
+        db = self._db
+        with db:
+            if source:
+                db.execute("DELETE FROM meets WHERE source = ? OR (content_hash = ? AND content_hash != '')",
+                           (source, content_hash))
+            else:
+                db.execute('DELETE FROM meets WHERE name = ?', (name,))
+            name = self._free_name(name)
+            meet_id = db.execute('INSERT INTO meets (name, source, content_hash, date, imported) '
+                                 'VALUES (?, ?, ?, ?, ?)',
+                                 (name, source, content_hash, date.isoformat(),
+                                  datetime.datetime.now().isoformat(timespec='seconds'))).lastrowid
+
+            # ----- Clubs and athletes (shared between the meets) -----
+            db.executemany('INSERT OR IGNORE INTO clubs (name, dsv_id) VALUES (?, ?)',
+                           [(club.name, str(club.dsv_id)) for club in collection.clubs])
+            club_ids = self._ids('SELECT id, name FROM clubs WHERE name IN ({})',
+                                 [club.name for club in collection.clubs])
+            # Athletes are identified by name, year and club (athletes without club get the club id 0)
+            athlete_keys: dict = {id(athlete): (athlete.name, athlete.year.year if athlete.year else 0,
+                                                club_ids.get(athlete.club.name, 0) if athlete.club else 0)
+                                  for athlete in collection.athletes}
+            db.executemany('INSERT OR IGNORE INTO athletes (name, key, year, club_id) VALUES (?, ?, ?, ?)',
+                           [(name, AthleteIndex.normalise(name), year, club_id)
+                            for name, year, club_id in athlete_keys.values()])
+            athlete_ids: dict = {}
+            for row in self._rows('SELECT id, name, year, club_id FROM athletes WHERE club_id IN ({})',
+                                  list(set(club_ids.values())) + [0]):
+                athlete_ids[(row['name'], row['year'], row['club_id'])] = row['id']
+
+            # ----- Rows of the meet (ids are given here, so no lookup is needed) -----
+            section_ids = self._next_ids('sections', collection.sections)
+            db.executemany('INSERT INTO sections (id, meet_id, no) VALUES (?, ?, ?)',
+                           [(section_ids[id(section)], meet_id, section.no) for section in collection.sections])
+
+            competitions = collection.competitions
+            competition_ids = self._next_ids('competitions', competitions)
+            db.executemany('INSERT INTO competitions (id, meet_id, section_id, no, discipline, distance, repetition, '
+                           'sex, text, final) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                           [(competition_ids[id(competition)], meet_id,
+                             section_ids.get(id(competition.section)) if competition.section else None,
+                             competition.no, competition.discipline, competition.distance, competition.repetition,
+                             competition.sex, competition.name(), int(competition.is_final()))
+                            for competition in competitions])
+
+            heats = [heat for heat in collection.heats if heat.competition]
+            heat_ids = self._next_ids('heats', heats)
+            db.executemany('INSERT INTO heats (id, competition_id, no) VALUES (?, ?, ?)',
+                           [(heat_ids[id(heat)], competition_ids[id(heat.competition)], heat.no) for heat in heats])
+
+            db.executemany('INSERT INTO lanes (meet_id, heat_id, athlete_id, no, entry_time, list_entry) '
+                           'VALUES (?, ?, ?, ?, ?, ?)',
+                           [(meet_id, heat_ids.get(id(lane.heat)) if lane.heat else None,
+                             athlete_ids[athlete_keys[id(lane.athlete)]], lane.no, time_to_seconds(lane.time),
+                             int(lane.list_entry))
+                            for lane in collection.lanes if lane.athlete])
+
+            db.executemany('INSERT INTO judges (meet_id, section_id, club_id, position, name) VALUES (?, ?, ?, ?, ?)',
+                           [(meet_id, section_ids.get(id(judge.section)) if judge.section else None,
+                             club_ids.get(judge.club.name) if judge.club else None, judge.position, judge.name)
+                            for judge in collection.judges])
+        return meet_id
+
+    def meet_name(self, meet_id: int) -> str:
+        """ Returns the name of a meet (could differ from the given name, see add)
+        :param meet_id: Id of the meet
+        :return: The name or '' in case the meet does not exist
+        """
+        row = self._db.execute('SELECT name FROM meets WHERE id = ?', (meet_id,)).fetchone()
+        return row['name'] if row else ''
+
+    def _free_name(self, name: str) -> str:
+        """ Returns a meet name which is not used (a number is added in case it is used)
+        :param name: Wanted name
+        :return: The name
+        """
+        result = name
+        no = 2
+        while self._db.execute('SELECT 1 FROM meets WHERE name = ?', (result,)).fetchone():
+            result = fr'{name} ({no})'
+            no += 1
+        return result
+
+    def remove(self, name: str) -> bool:
+        """ Removes a meet
+        :param name: Name of the meet
+        :return: True in case the meet was removed
+        """
+        with self._db:
+            return self._db.execute('DELETE FROM meets WHERE name = ?', (name,)).rowcount > 0
+
+    def meets(self) -> list:
+        """ Returns all stored meets
+        :return: A list of rows (id, name, source, date, imported) ordered by date
+        """
+        return self._db.execute('SELECT id, name, source, date, imported FROM meets ORDER BY date, name').fetchall()
+
+    def club_starts(self, club: str, since: [datetime.date, None] = None,
+                    until: [datetime.date, None] = None) -> list:
+        """ Returns all starts of a club
+        :param club: Name of the club
+        :param since: Only meets at or after this date [default = None]
+        :param until: Only meets at or before this date [default = None]
+        :return: A list of rows (see _STARTS) ordered by date, competition, heat and lane
+        """
+        query, args = self._date_filter(_STARTS + 'WHERE clubs.name = ?', [club], since, until)
+        return self._db.execute(query + ' ORDER BY meets.date, meets.name, competitions.no, heats.no, lanes.no',
+                                args).fetchall()
+
+    def athlete_starts(self, name: str, year: int = 0, since: [datetime.date, None] = None,
+                       until: [datetime.date, None] = None) -> list:
+        """ Returns all starts of an athlete (the name is compared normalised, see AthleteIndex)
+        :param name: Name of the athlete
+        :param year: Year of the athlete [default = 0 (all years)]
+        :param since: Only meets at or after this date [default = None]
+        :param until: Only meets at or before this date [default = None]
+        :return: A list of rows (see _STARTS) ordered by date and competition
+        """
+        query = _STARTS + 'WHERE athletes.key = ?'
+        args: list = [AthleteIndex.normalise(name)]
+        if year:
+            query += ' AND athletes.year = ?'
+            args.append(year)
+        query, args = self._date_filter(query, args, since, until)
+        return self._db.execute(query + ' ORDER BY meets.date, meets.name, competitions.no', args).fetchall()
+
+    def athlete_progression(self, name: str, year: int = 0, distance: int = 0, discipline: str = '',
+                            since: [datetime.date, None] = None, until: [datetime.date, None] = None) -> list:
+        """ Returns the entry times of an athlete per discipline ordered by date (relays and starts without time are
+        not included)
+        :param name: Name of the athlete
+        :param year: Year of the athlete [default = 0 (all years)]
+        :param distance: Only this distance [default = 0 (all distances)]
+        :param discipline: Only this discipline [default = '' (all disciplines)]
+        :param since: Only meets at or after this date [default = None]
+        :param until: Only meets at or before this date [default = None]
+        :return: A list of rows (see _STARTS) ordered by distance, discipline and date
+        """
+        query = _STARTS + 'WHERE athletes.key = ? AND lanes.entry_time > 0 AND competitions.repetition = 0'
+        args: list = [AthleteIndex.normalise(name)]
+        if year:
+            query += ' AND athletes.year = ?'
+            args.append(year)
+        if distance:
+            query += ' AND competitions.distance = ?'
+            args.append(distance)
+        if discipline:
+            query += ' AND competitions.discipline = ?'
+            args.append(discipline)
+        query, args = self._date_filter(query, args, since, until)
+        return self._db.execute(query + ' ORDER BY competitions.discipline, competitions.distance, meets.date',
+                                args).fetchall()
+
+    @staticmethod
+    def _date_filter(query: str, args: list, since: [datetime.date, None],
+                     until: [datetime.date, None]) -> tuple:
+        """ Adds the date range to a query
+        :param query: The query
+        :param args: Arguments of the query
+        :param since: Only meets at or after this date
+        :param until: Only meets at or before this date
+        :return: Query and arguments
+        """
+        if since:
+            query += ' AND meets.date >= ?'
+            args.append(since.isoformat())
+        if until:
+            query += ' AND meets.date <= ?'
+            args.append(until.isoformat())
+        return query, args
+
+    def _rows(self, query: str, values: list) -> list:
+        """ Runs a query with an IN clause in chunks (sqlite has a limit of variables)
+        :param query: Query with {} for the placeholders
+        :param values: Values of the IN clause
+        :return: A list of rows
+        """
+        rows: list = []
+        for i in range(0, len(values), 500):
+            chunk = values[i:i + 500]
+            rows += self._db.execute(query.format(','.join('?' * len(chunk))), chunk).fetchall()
+        return rows
+
+    def _ids(self, query: str, names: list) -> dict:
+        """ Returns the ids of rows by their names
+        :param query: Query which returns id and name with {} for the placeholders
+        :param names: Names of the rows
+        :return: A dictionary with name as key and id as value
+        """
+        return {row['name']: row['id'] for row in self._rows(query, names)}
+
+    def _next_ids(self, table: str, objects: list) -> dict:
+        """ Reserves the ids for new rows of a table
+        :param table: Name of the table
+        :param objects: Objects which should be inserted
+        :return: A dictionary with the python id of the object as key and the row id as value
+        """
+        start = self._db.execute(fr'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0] + 1
+        return {id(obj): start + i for i, obj in enumerate(objects)}
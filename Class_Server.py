@@ -0,0 +1,469 @@
+import os
+import sys
+import json
+import hashlib
+import pymupdf
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from Class_Config import Config
+from Class_Metrics import Metrics, metrics
+from Class_PDFOperations import PDFOperations
+from CreateFileOutput import FileType, StartListIndex, club_to_string, all_clubs_to_string
+
+# Maximum size of an uploaded pdf (100 MB)
+MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024
+# Seconds a scrape of /metrics waits for the counters of the workers (a worker parsing a big pdf answers later)
+METRICS_TIMEOUT: float = 2.0
+
+# Supported report formats (format -> file type, content type)
+REPORT_FORMATS: dict = {
+    'html': (FileType.HTML, 'text/html; charset=utf-8'),
+    'md': (FileType.MARKDOWN, 'text/markdown; charset=utf-8'),
+    'txt': (FileType.TEXT, 'text/plain; charset=utf-8'),
+}
+
+class UnknownClubError(Exception):
+    """ Is raised by the workers in case a requested club is not part of the document """
+    pass
+
+
+class InvalidPdfError(Exception):
+    """ Is raised by the workers in case the posted data could not be opened or read as "Meldeergebnis" """
+    pass
+
+
+# ----- Worker process -----
+# The values below exist once per worker process. Every worker keeps its own parsed documents, the server sends the
+# same document always to the same worker, so a document is only parsed once.
+_worker_config: [Config, None] = None
+_worker_cache: OrderedDict = OrderedDict()
+_worker_cache_size: int = 4
+
+
+def _worker_init(config_file: str, cache_size: int):
+    """ Initializes a worker process (loads the config once and mutes the console outputs of the parser)
+    :param config_file: Name of the config file
+    :param cache_size: Number of parsed documents kept by the worker
+    """
+    global _worker_config, _worker_cache_size
+    _worker_config = Config.load(config_file)
+    _worker_cache_size = max(1, cache_size)
+    # The parser prints its progress, this is not needed inside the server
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _worker_document(digest: str, data: bytes) -> tuple:
+    """ Returns the parsed document, in case it is not in the cache of the worker, it is parsed
+    :param digest: Hash of the document
+    :param data: Content of the pdf
+    :return: The PDFOperations object of the document and if it was cached
+    """
+    if digest in _worker_cache:
+        _worker_cache.move_to_end(digest)
+        metrics.add('cache_hits', 1, 'document')
+        return _worker_cache[digest], True
+    metrics.add('cache_misses', 1, 'document')
+
+    pdf_obj = PDFOperations(word_search=True, config=_worker_config)
+    try:
+        result = pdf_obj.read_pdf(data)
+    except Exception as error:
+        # Release the objects which were created until the error
+        if pdf_obj.collection is not None:
+            pdf_obj.collection.close()
+        # The data is no pdf (error of the client), every other error is an error of the server
+        if isinstance(error, pymupdf.FileDataError):
+            raise InvalidPdfError(fr'The pdf could not be opened ({error})') from None
+        raise
+    if not result:
+        raise InvalidPdfError('Reading of pdf failed')
+    metrics.update(pdf_obj.metrics)
+
+    _worker_cache[digest] = pdf_obj
+    # Remove the oldest documents
+    while len(_worker_cache) > _worker_cache_size:
+        _, old_obj = _worker_cache.popitem(last=False)
+        old_obj.collection.close()
+    return pdf_obj, False
+
+
+def _worker_club(pdf_obj: PDFOperations, name: str):
+    """ Returns a club of a document
+    :param pdf_obj: Parsed document
+    :param name: Name of the club
+    :return: The club
+    """
+    club = pdf_obj.collection.club_by_name(name)
+    if not club:
+        raise UnknownClubError(name)
+    return club
+
+
+def _task_ping() -> int:
+    """ Used to start the worker processes
+    :return: Process id of the worker
+    """
+    return os.getpid()
+
+
+def _task_metrics() -> dict:
+    """ Returns the counters of the worker
+    :return: Dictionary with the counters
+    """
+    return metrics.to_dict()
+
+
+def _task_clubs(digest: str, data: bytes) -> tuple:
+    """ Returns the clubs of a document
+    :param digest: Hash of the document
+    :param data: Content of the pdf
+    :return: A list with the clubs (dictionary with name, id and number of starts) and if the document was cached
+    """
+    pdf_obj, cached = _worker_document(digest, data)
+    clubs: list = []
+    for club in sorted(pdf_obj.collection.clubs, key=lambda c: c.name):
+        starts = club.starts
+        clubs.append({'name': club.name, 'id': club.dsv_id, 'starts': starts.single, 'relays': starts.relay,
+                      'athletes': len(club.athletes), 'judges': len(club.judges)})
+    return clubs, cached
+
+
+def _task_highlight(digest: str, data: bytes, selection: list, offset: int) -> tuple:
+    """ Highlights clubs in a document
+    :param digest: Hash of the document
+    :param data: Content of the pdf
+    :param selection: A list with tuples of club names and colors (rgb)
+    :param offset: Offset in px to resize the highlighted region
+    :return: The highlighted pdf and if the document was cached
+    """
+    pdf_obj, cached = _worker_document(digest, data)
+    clubs = [_worker_club(pdf_obj, name) for name, _ in selection]
+    colors = [color for _, color in selection]
+    borders = pdf_obj.text_x_range
+    output = PDFOperations.highlight_pdf_clubs(data, None, clubs, colors, borders[0], borders[1], offset)
+    return PDFOperations.add_product_info(output, pdf_obj.collection), cached
+
+
+def _task_report(digest: str, data: bytes, name: str, file_type: FileType) -> tuple:
+    """ Creates the report of a club
+    :param digest: Hash of the document
+    :param data: Content of the pdf
+    :param name: Name of the club
+    :param file_type: Type of the report
+    :return: The report and if the document was cached
+    """
+    pdf_obj, cached = _worker_document(digest, data)
+    return club_to_string(_worker_club(pdf_obj, name), file_type), cached
+
+
+def _task_report_all(digest: str, data: bytes) -> tuple:
+    """ Creates the html report of all clubs
+    :param digest: Hash of the document
+    :param data: Content of the pdf
+    :return: The report and if the document was cached
+    """
+    pdf_obj, cached = _worker_document(digest, data)
+    return all_clubs_to_string(StartListIndex.from_collection(pdf_obj.collection)), cached
+
+
+# ----- Server process -----
+class HighlightServer:
+    """
+    Represents a local http server, which highlights clubs in "Meldeergebnissen". The pdf is parsed by warm worker
+    processes and kept by them, so further requests for the same pdf need no parsing anymore.
+
+    Endpoints:
+    ----------
+    GET /health
+        Returns ok in case the server is running
+    GET /metrics
+        Returns the counters of the server and the workers in the prometheus text format
+    POST /clubs
+        Returns the clubs of the posted pdf as json
+    POST /highlight?club=<name>&color=<color>
+        Returns the posted pdf with the highlighted clubs (club and color can be used several times)
+    POST /report?club=<name>&format=<html|md|txt>
+        Returns the report of a club
+    POST /report?format=all
+        Returns one html report of all clubs
+
+    Attributes:
+    -----------
+    config : Config
+        The config used by the server
+    address : tuple
+        Host and port of the server
+
+    Methods:
+    --------
+    warm_up()
+        Starts all worker processes
+    submit(data, task, *args)
+        Runs a task for a pdf on the worker of the pdf
+    metrics() : Metrics
+        Returns the counters of the server and the workers
+    serve_forever()
+        Handles the requests until shutdown
+    shutdown()
+        Stops the server and the worker processes
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, workers: int = 2, cache_size: int = 4,
+                 config: [Config, None] = None):
+        """ Initializes a new server
+        :param host: Host name or address of the server
+        :param port: Port of the server
+        :param workers: Number of worker processes
+        :param cache_size: Number of parsed documents kept per worker
+        :param config: Config used by the server [default = None (loads the default config)]
+        """
+        self.config: Config = config if config else Config.load()
+        self._cache_size: int = cache_size
+        # Every worker is a single process, so a document is bound to one worker
+        self._workers: list = [self._new_worker() for _ in range(max(1, workers))]
+        # Protects the replacement of broken workers (the requests are handled by several threads)
+        self._workers_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.app = self
+
+    @property
+    def address(self) -> tuple:
+        """ Returns host and port of the server
+        :return: Host and port of the server
+        """
+        return self._httpd.server_address[:2]
+
+    def _new_worker(self) -> ProcessPoolExecutor:
+        """ Creates a new worker process
+        :return: The executor of the worker
+        """
+        return ProcessPoolExecutor(max_workers=1, initializer=_worker_init,
+                                   initargs=(self.config.file_name, self._cache_size))
+
+    def _replace_worker(self, worker: ProcessPoolExecutor):
+        """ Replaces a broken worker (e.g. the process crashed), an executor with a broken process never starts a new
+        one, so all further tasks of its documents would fail
+        :param worker: The broken worker
+        """
+        with self._workers_lock:
+            # Another request could have replaced the worker already
+            if worker in self._workers:
+                self._workers[self._workers.index(worker)] = self._new_worker()
+                print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Worker process was broken and is replaced')
+        worker.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        """ Starts all worker processes """
+        for worker in self._workers:
+            worker.submit(_task_ping).result()
+
+    def submit(self, data: bytes, task, *args) -> tuple:
+        """ Runs a task for a pdf on the worker of the pdf
+        :param data: Content of the pdf
+        :param task: Task which should be run
+        :param args: Additional arguments of the task
+        :return: Result of the task
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        worker = self._workers[int(digest[:8], 16) % len(self._workers)]
+        try:
+            return worker.submit(task, digest, data, *args).result()
+        except BrokenProcessPool:
+            # The request fails, but the next request of the document is handled by a new worker
+            self._replace_worker(worker)
+            raise
+
+    def metrics(self, timeout: float = METRICS_TIMEOUT) -> Metrics:
+        """ Returns the counters of the server and the workers. The task is queued behind the requests of a worker, a
+        worker which does not answer in time (or crashed) is left out and counted in metrics_errors.
+        :param timeout: Seconds to wait for the counters of all workers
+        :return: The summed counters
+        """
+        # Ask all workers at once, so the timeout is for all of them
+        futures: list = []
+        for no, worker in enumerate(list(self._workers)):
+            try:
+                futures.append((no, worker, worker.submit(_task_metrics)))
+            except (BrokenProcessPool, RuntimeError):
+                self._replace_worker(worker)
+                metrics.add('metrics_errors', 1, str(no))
+        end = time.monotonic() + timeout
+        results: list = []
+        for no, worker, future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, end - time.monotonic())))
+            except TimeoutError:
+                # Not sent to the worker yet in case it is busy
+                future.cancel()
+                metrics.add('metrics_errors', 1, str(no))
+            except BrokenProcessPool:
+                self._replace_worker(worker)
+                metrics.add('metrics_errors', 1, str(no))
+        # The errors are counted by the server, so they are part of the next scrapes as well
+        values = Metrics(metrics)
+        for result in results:
+            values.update(result)
+        return values
+
+    def serve_forever(self):
+        """ Handles the requests until shutdown """
+        self._httpd.serve_forever()
+
+    def shutdown(self):
+        """ Stops the server and the worker processes """
+        self._httpd.server_close()
+        for worker in self._workers:
+            worker.shutdown(cancel_futures=True)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    Represents the handler of a single request to the HighlightServer
+    """
+    server_version = 'highlightClub'
+
+    def do_GET(self):
+        """ Handles a get request """
+        path = urlparse(self.path).path
+        if path == '/health':
+            metrics.add('requests', 1, path)
+            self._send(200, 'text/plain; charset=utf-8', b'ok')
+        elif path == '/metrics':
+            metrics.add('requests', 1, path)
+            app: HighlightServer = self.server.app
+            try:
+                body = app.metrics().to_prometheus().encode('utf-8')
+            except Exception as error:
+                self._send_error(500, fr'{type(error).__name__}: {error}')
+                return
+            self._send(200, 'text/plain; version=0.0.4; charset=utf-8', body)
+        else:
+            self._send_error(404, 'Unknown path')
+
+    def do_POST(self):
+        """ Handles a post request """
+        app: HighlightServer = self.server.app
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path not in ['/clubs', '/highlight', '/report']:
+            self._send_error(404, 'Unknown path')
+            return
+        metrics.add('requests', 1, url.path)
+
+        data = self._read_body()
+        if data is None:
+            return
+
+        try:
+            if url.path == '/clubs':
+                clubs, cached = app.submit(data, _task_clubs)
+                self._send(200, 'application/json', json.dumps(clubs, ensure_ascii=False).encode('utf-8'), cached)
+
+            elif url.path == '/highlight':
+                selection = self._selection(app.config, query)
+                if selection is None:
+                    return
+                output, cached = app.submit(data, _task_highlight, selection,
+                                            int(app.config.default.get('offset', '1')))
+                self._send(200, 'application/pdf', output, cached)
+
+            else:
+                names = query.get('club', [])
+                report_format = query.get('format', ['html'])[0]
+                if report_format == 'all':
+                    report, cached = app.submit(data, _task_report_all)
+                    self._send(200, 'text/html; charset=utf-8', report.encode('utf-8'), cached)
+                    return
+                if len(names) != 1:
+                    self._send_error(400, 'Exactly one club is needed')
+                    return
+                if report_format not in REPORT_FORMATS.keys():
+                    self._send_error(400, fr'Unknown format "{report_format}"')
+                    return
+                file_type, content_type = REPORT_FORMATS[report_format]
+                report, cached = app.submit(data, _task_report, names[0], file_type)
+                self._send(200, content_type, report.encode('utf-8'), cached)
+
+        except UnknownClubError as error:
+            self._send_error(404, fr'Club "{error.args[0]}" not found')
+        except InvalidPdfError as error:
+            self._send_error(422, str(error))
+        except Exception as error:
+            self._send_error(500, fr'{type(error).__name__}: {error}')
+
+    def _read_body(self) -> [bytes, None]:
+        """ Reads the posted pdf
+        :return: The content of the pdf or None in case of an error (error is already send)
+        """
+        length = int(self.headers.get('Content-Length', 0))
+        if length <= 0:
+            self._send_error(411, 'A pdf is needed as body')
+            return None
+        if length > MAX_UPLOAD_SIZE:
+            self._send_error(413, 'The pdf is to big')
+            return None
+        return self.rfile.read(length)
+
+    def _selection(self, config: Config, query: dict) -> [list, None]:
+        """ Returns the clubs and colors of a highlight request
+        :param config: Config of the server
+        :param query: Parsed query of the request
+        :return: A list with tuples of club name and color or None in case of an error (error is already send)
+        """
+        names = query.get('club', [])
+        colors = query.get('color', [])
+        if len(names) == 0:
+            self._send_error(400, 'At least one club is needed')
+            return None
+
+        selection: list = []
+        for i, name in enumerate(names):
+            # Missing colors are filled up by the last color or by the default color
+            if i < len(colors):
+                value = colors[i]
+            elif len(colors) > 0:
+                value = colors[-1]
+            else:
+                value = config.default.get('color', 'yellow')
+            color = config.colors.get_rgb(value)
+            if color is None:
+                self._send_error(400, fr'Invalid color "{value}"')
+                return None
+            selection.append((name, color))
+        return selection
+
+    def _send(self, code: int, content_type: str, body: bytes, cached: [bool, None] = None):
+        """ Sends a response
+        :param code: Http status code
+        :param content_type: Content type of the body
+        :param body: Body of the response
+        :param cached: If the document was already parsed by the worker
+        """
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cached is not None:
+            self.send_header('X-Parse-Cache', 'hit' if cached else 'miss')
+        self.end_headers()
+        self.wfile.write(body)
+        metrics.add('output_bytes', len(body), 'response')
+
+    def _send_error(self, code: int, message: str):
+        """ Sends an error as json
+        :param code: Http status code
+        :param message: Error message
+        """
+        self._send(code, 'application/json', json.dumps({'error': message}, ensure_ascii=False).encode('utf-8'))
+
+    def log_message(self, format, *args):
+        """ Prints a request to the console """
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {self.address_string()} - {format % args}')
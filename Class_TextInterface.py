@@ -2,13 +2,18 @@ import os
 import sys
 import glob
 import curses
+import bisect
+import threading
+import collections
 
 from enum import Enum
 
 from Class_Config import Config
 from Class_Competition_Objects import Collection
 from Class_PDFOperations import PDFOperations
-from CreateFileOutput import club_to_file, FileType
+from Class_PDFIndex import PDFIndex
+from Class_MemoryProfile import memory_step
+from CreateFileOutput import club_to_file, club_to_files, output_file_name, FileType, StartListIndex, all_clubs_to_file
 
 MENU_DEBUG: bool = False
 
@@ -21,7 +26,9 @@ class MenuStep(Enum):
     SELECT_COLOR = 5
     ENTER_COLOR = 6
     SUMMARY = 7
-    EXIT = 8
+    ENTER_ATHLETE = 8
+    SELECT_ATHLETE = 9
+    EXIT = 10
 
 class MenuStdout:
     """
@@ -97,6 +104,50 @@ class MenuStdout:
         """ Clear write buffer """
         self._buffer = []
         
+class MenuLog:
+    """
+    Represents a stdout object which stores the last written lines, so the output of a background thread can be
+    drawn by the menu (the screen is only accessed by the menu thread)
+
+    Attributes:
+    -----------
+    lines: list
+        The last written lines
+
+    Methods:
+    --------
+    write
+        Stores the text
+    flush
+        Nothing to do, the lines are drawn by the menu
+    """
+    def __init__(self, max_lines: int):
+        """ Initializes a new MenuLog object
+        :param max_lines: No of stored lines
+        """
+        self._lines = collections.deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+
+    @property
+    def lines(self) -> list:
+        """ Returns the last written lines
+        :return: List of lines (oldest first)
+        """
+        with self._lock:
+            return list(self._lines)
+
+    def write(self, text: str):
+        """ Stores the text
+        :param text: Text to write
+        """
+        with self._lock:
+            # Only the non-empty lines are stored
+            self._lines.extend(part for part in text.split('\n') if part)
+
+    def flush(self):
+        """ Nothing to do, the lines are drawn by the menu """
+        pass
+
 class Key:
     """ Represents a Key class """
     KEY_CTRL: int = 96          # ctrl
@@ -113,6 +164,7 @@ class KeyLists(Key):
     LIST_PREV_PAGE: list = [ord('p') - Key.KEY_CTRL, ord('P') - Key.KEY_CTRL, curses.KEY_PPAGE, curses.KEY_PREVIOUS]
     LIST_NEXT_PAGE: list = [ord('n') - Key.KEY_CTRL, ord('N') - Key.KEY_CTRL, curses.KEY_NPAGE, curses.KEY_NEXT]
     LIST_OKAY: list = [curses.KEY_ENTER, Key.KEY_RETURN]
+    LIST_SORT: list = [ord('t') - Key.KEY_CTRL, ord('T') - Key.KEY_CTRL]
 
 class MenuEntry:
     """ Represents a Menu entry object """
@@ -140,6 +192,7 @@ class BottomMenu:
     CHG_COLOR: MenuEntry = MenuEntry(2, 'Add color', '^O', KeyLists.LIST_CHG_COLOR)
     PREV_PAGE: MenuEntry = MenuEntry(3, 'Prev page', '^P', KeyLists.LIST_PREV_PAGE)
     NEXT_PAGE: MenuEntry = MenuEntry(4, 'Next page', '^N', KeyLists.LIST_NEXT_PAGE)
+    SORT: MenuEntry = MenuEntry(5, 'Sort', '^T', KeyLists.LIST_SORT)
 
 class HasScreen:
     """
@@ -241,6 +294,78 @@ class DrawBase(HasScreen):
         self.stdscr.addstr(3, 0, strings[2])
   
 
+class PrefixIndex:
+    """
+    Represents a sorted index over the words of a list of strings. A string is found if one of its words starts with
+    the filter text (case is ignored), so "georg" finds "SV Georgsmarienhütte". Every added character only searches
+    within the range found for the previous text (binary search), the ranges are stored for going back.
+
+    Attributes:
+    -----------
+    text : str
+        The actual filter text
+
+    Methods:
+    --------
+    push(char)
+        Adds a character to the filter text
+    pop()
+        Removes the last character of the filter text
+    matches() : list
+        Returns the positions of the strings which match the filter text
+    """
+    # Character which is sorted behind all others (end of a prefix range)
+    __END: str = '\U0010ffff'
+
+    def __init__(self, values: list):
+        """ Initializes a new PrefixIndex
+        :param values: The strings to index
+        """
+        entries: list = []
+        for pos, value in enumerate(values):
+            words = value.casefold().split()
+            # The string starting at every word
+            for i in range(len(words)):
+                entries.append((' '.join(words[i:]), pos))
+        entries.sort()
+        self._keys: list = [key for key, _ in entries]
+        self._pos: list = [pos for _, pos in entries]
+        # Filter texts and the found ranges in the keys
+        self._texts: list = ['']
+        self._ranges: list = [(0, len(self._keys))]
+
+    @property
+    def text(self) -> str:
+        """ Returns the actual filter text
+        :return: The filter text
+        """
+        return self._texts[-1]
+
+    def push(self, char: str):
+        """ Adds a character to the filter text
+        :param char: The character
+        """
+        text = self.text + char.casefold()
+        lo, hi = self._ranges[-1]
+        lo = bisect.bisect_left(self._keys, text, lo, hi)
+        hi = bisect.bisect_left(self._keys, text + self.__END, lo, hi)
+        self._texts.append(text)
+        self._ranges.append((lo, hi))
+
+    def pop(self):
+        """ Removes the last character of the filter text """
+        if len(self._texts) > 1:
+            self._texts.pop()
+            self._ranges.pop()
+
+    def matches(self) -> list:
+        """ Returns the positions of the strings which match the filter text
+        :return: Sorted list of positions
+        """
+        lo, hi = self._ranges[-1]
+        return sorted(set(self._pos[lo:hi]))
+
+
 class TwoColumnList(DrawBase):
     """
     Represents a two colum Menu class
@@ -279,11 +404,13 @@ class TwoColumnList(DrawBase):
         The list of values to be displayed
     default_end : str
         In case a value exceeds site, the default ending
+    filter_text : str
+        The text the values are filtered with
     
     Methods:
     --------
     draw: int
-        Draws the two columns
+        Draws the two columns (or only the changed entries)
     draw_next: int
         Draws the next page
     draw_previous: int
@@ -292,6 +419,8 @@ class TwoColumnList(DrawBase):
         Update the drawing area
     eval_arrows_keys : int
         Evaluate if an arrow key is pressed
+    eval_filter_key : bool
+        Evaluate if a key changes the filter text
     """
     
     def __init__(self, stdscr, values, start_row: int=0, end_row: int = 0, default_end: str = ''):
@@ -315,6 +444,9 @@ class TwoColumnList(DrawBase):
         self._selected_idx: int = 0
         
         self._drawn = False
+        # All values and the index to filter them (created with the first filter key)
+        self._all_values: list = values
+        self._index: [PrefixIndex, None] = None
         # Init with parameters
         self.values = values
         self.default_end = default_end
@@ -331,9 +463,9 @@ class TwoColumnList(DrawBase):
         # Check if it was drawn
         if self.is_drawn:
             # Check if something is selected
-            if self.selected_idx < len(self.values[self._entry_start:]):
+            if self._entry_start + self.selected_idx < len(self.values):
                 # Return value
-                return self.values[self._entry_start:][self.selected_idx]
+                return self.values[self._entry_start + self.selected_idx]
         return ''
         
     @property
@@ -371,6 +503,13 @@ class TwoColumnList(DrawBase):
         """
         return self._entry_end - self._entry_start + 1
         
+    @property
+    def filter_text(self) -> str:
+        """ Returns the text the values are filtered with
+        :return: The filter text ('' in case all values are displayed)
+        """
+        return self._index.text if self._index else ''
+    
     @property
     def entry_max(self) -> int:
         """ Returns the max entries which could be displayed
@@ -426,10 +565,11 @@ class TwoColumnList(DrawBase):
             
         raise ValueError
         
-    def draw(self, selected_idx: int=0, entry_idx = 0) -> int:
+    def draw(self, selected_idx: int=0, entry_idx = 0, changed_only: bool = False) -> int:
         """ Draws the two column list
         :param selected_idx: Index which is selected
         :param entry_idx: Start index of page
+        :param changed_only: Only the entries which differ from the last drawing are drawn (screen is not cleared)
         :return: The new selected index
         """
         # update screen data
@@ -452,8 +592,12 @@ class TwoColumnList(DrawBase):
         col_end = [int(self.x_max / 2) - 1, int(self.x_max / 2) * 2 - 1]
         col_len = col_end[0] - col_start[0]
         
+        # Store the last drawing
+        old_elements = self._elements if changed_only else []
+        old_selected = self._selected_idx
+        
         # Check that index is not out of bound
-        if selected_idx > len(self.values[entry_idx:])-1:
+        if selected_idx > len(self.values) - entry_idx - 1:
             # Store selected_idx
             self._selected_idx = 0
         else:
@@ -469,16 +613,15 @@ class TwoColumnList(DrawBase):
             # Store start entry
             self._entry_start = entry_idx
             # loop over every index
-            for value in self.values[entry_idx:]:
+            for value_idx in range(entry_idx, len(self.values)):
                 # increase index
                 idx += 1
                 # Calculate position left (0) or right (1)
                 pos: int = idx % 2
                 # trim value if necessary
+                value = self.values[value_idx]
                 if len(value) > col_len:
                     value = value[0:col_len - len(end_string)] + end_string
-                # draw value check if selected
-                self.draw_sel_str(self._last_row, col_start[pos], value, idx == self._selected_idx)
                 self._elements.append([self._last_row, col_start[pos], value])
                 # if position is right
                 if pos == 1:
@@ -497,11 +640,51 @@ class TwoColumnList(DrawBase):
             
             self._drawn = True
         else:
+            # Nothing to select
+            self._entry_start = entry_idx
+            self._entry_end = entry_idx - 1
             # Add error message
-            self.stdscr.addstr(self._last_row, col_start[0], 'Nothing found')
             self._elements.append([self._last_row, col_start[0], 'Nothing found'])
+        
+        # draw entries (only the changed ones or the old and new selected one)
+        selected = self._selected_idx if self.values else -1
+        for i in range(max(len(self._elements), len(old_elements))):
+            old = old_elements[i] if i < len(old_elements) else None
+            new = self._elements[i] if i < len(self._elements) else None
+            if old == new and i != old_selected and i != selected:
+                continue
+            # clear old entry
+            if old is not None and old != new:
+                self.stdscr.addstr(old[0], old[1], ' ' * len(old[2]))
+            # draw value check if selected
+            if new is not None:
+                self.draw_sel_str(new[0], new[1], new[2], i == selected)
         return idx
     
+    def eval_filter_key(self, key: int) -> bool:
+        """ Evaluate if a key changes the filter text (printable characters and backspace)
+        :param key: Pressed key
+        :return: True in case the values changed (must be drawn again)
+        """
+        if key in (curses.KEY_BACKSPACE, 127, 8):
+            if not self.filter_text:
+                return False
+            self._index.pop()
+        # printable characters (getch returns umlauts as several bytes, so only ascii)
+        elif 32 <= key < 127:
+            # Create the index with the first character
+            if self._index is None:
+                self._index = PrefixIndex(self._all_values)
+            self._index.push(chr(key))
+        else:
+            return False
+        # Values which match the filter text
+        if self.filter_text:
+            self.values = [self._all_values[pos] for pos in self._index.matches()]
+        else:
+            self.values = self._all_values
+        return True
+    
     @property
     def next_page(self) -> bool:
         """ Returns if next page is available
@@ -554,7 +737,7 @@ class TwoColumnList(DrawBase):
         :param selected_idx: New selected index
         """
         self.update()
-        if self.is_drawn:
+        if self.is_drawn and self.values:
             if self._selected_idx != selected_idx:
                 # Old index not highlighted
                 self.draw_sel_str(self._elements[self._selected_idx][0], self._elements[self._selected_idx][1], self._elements[self._selected_idx][2], False)
@@ -571,8 +754,8 @@ class TwoColumnList(DrawBase):
         """
         new_idx = self.selected_idx
         
-        # only one entry
-        if (self.entry_cnt-1) == 0:
+        # only one entry (or nothing)
+        if (self.entry_cnt-1) <= 0:
             return new_idx
         
         # Min 2. entries
@@ -642,6 +825,13 @@ class TextInterface:
     """
     __OKAY : str = '<< Okay >>'
     __ENTRY_ALL: str = '* All *'
+    __ADD_CLUB: str = 'Add club for selection'
+    __ADD_ATHLETE: str = 'Add athlete for selection'
+    __LAYERS_ON: str = 'Switch to one pdf with a layer per club'
+    __LAYERS_OFF: str = 'Switch to one pdf per club'
+    # Max number of athletes which are shown in the athlete dialog and list
+    __ATHLETE_PREVIEW: int = 5
+    __ATHLETE_MATCHES: int = 50
     
     def __init__(self):
         self.stdscr = None
@@ -651,6 +841,9 @@ class TextInterface:
         # path variables
         self._pdf_file = ''
         self._default_path = ''
+        # metadata of the pdf files (file picker)
+        self._pdf_index: [PDFIndex, None] = None
+        self._pdf_sort_date: bool = False
         # output of pdf read
         self._collection : [Collection, None] = None
         self._borders : list = []
@@ -658,6 +851,19 @@ class TextInterface:
         self._sel_no: int = 0
         self._clubs: list = []
         self._colors: list = []
+        # selected athletes (additionally highlighted)
+        self._athletes: list = []
+        self._athlete_colors: list = []
+        self._athlete_query: str = ''
+        self._athlete_sel = None
+        # "* All *" creates one pdf with a layer per club instead of one pdf per club
+        self._layers: bool = False
+        # reading of the pdf in the background
+        self._parse_obj: [PDFOperations, None] = None
+        self._parse_thread: [threading.Thread, None] = None
+        self._parse_log: [MenuLog, None] = None
+        self._parse_file: str = ''
+        self._parse_result: bool = False
         # Initialize the steps as an ordered list of methods
         self._steps = {
             MenuStep.SELECT_PDF:   self._menu_select_pdf,
@@ -666,7 +872,9 @@ class TextInterface:
             MenuStep.SELECT_CLUB:  self._menu_select_club,
             MenuStep.SELECT_COLOR: self._menu_select_color,
             MenuStep.ENTER_COLOR:  self._menu_enter_color,
-            MenuStep.SUMMARY:      self._menu_summery
+            MenuStep.SUMMARY:      self._menu_summery,
+            MenuStep.ENTER_ATHLETE:  self._menu_enter_athlete,
+            MenuStep.SELECT_ATHLETE: self._menu_select_athlete
         }
 
     
@@ -680,7 +888,11 @@ class TextInterface:
             self.config = config
         else:
             # Create new config
-            self.config = Config()
+            self.config = Config.load()
+        # Metadata of the pdf files is stored next to the config
+        self._pdf_index = PDFIndex(os.path.join(os.path.dirname(os.path.abspath(self.config.file_name)),
+                                                '.result_pdf_index.json'), self.config.pdf_values.entry_cnt)
+        self._layers = self.config.default.get('layers', '0') == '1'
         # Set default path
         self._default_path = os.path.expanduser('~/Downloads/')
         if not os.path.isdir(self._default_path):
@@ -699,6 +911,8 @@ class TextInterface:
         while current_step != MenuStep.EXIT:
             # call step function
             current_step = self._steps[current_step]()
+        # Stop a reading which is still running
+        self._cancel_parse()
     
     def _menu_enter_path(self) -> MenuStep:
         """ Menu to change the search path
@@ -730,41 +944,177 @@ class TextInterface:
             # Next menu choose color
             return MenuStep.SELECT_COLOR
     
+    def _menu_enter_athlete(self) -> MenuStep:
+        """ Menu to enter the name of an athlete
+        :return: The next menu step which should be displayed
+        """
+        # The athletes are known after the reading is finished
+        next_step = self._wait_parse()
+        if next_step:
+            return next_step
+        # Display athlete dialog on screen
+        key = self._display_athlete_dialog()
+        # ----- evaluate keys -----
+        # Exit keys
+        if key in BottomMenu.EXIT.keys:
+            # End Menu
+            return MenuStep.EXIT
+        # Back keys
+        elif key in BottomMenu.BACK.keys:
+            # Back to summery
+            return MenuStep.SUMMARY
+        else:
+            # Next menu select athlete
+            return MenuStep.SELECT_ATHLETE
+    
+    def _menu_select_athlete(self) -> MenuStep:
+        """ Menu to select an athlete found by the entered name
+        :return: The next menu step which should be displayed
+        """
+        # Generate a list with the found athletes (without the already selected ones)
+        athletes = {self._athlete_str(athlete): athlete for athlete in self._match_athletes(self._athlete_query)
+                    if athlete not in self._athletes}
+        # Create header
+        if athletes:
+            header = ["Found following athletes:", f"({self._athlete_query})", '']
+        else:
+            header = ["No athlete found", f"({self._athlete_query})", 'Esc to go back and enter an other name']
+        # Create menu class
+        two_column_athlete = TwoColumnList(self.stdscr, list(athletes.keys()), 3, -2, '')
+        # Display menu
+        key = self._display_two_columns(two_column_athlete, header, True, True, False, False)
+        # ----- evaluate keys -----
+        # Back key
+        if key in BottomMenu.BACK.keys:
+            # Next menu enter name again
+            return MenuStep.ENTER_ATHLETE
+        # Enter keys
+        elif key in KeyLists.LIST_OKAY:
+            # Store athlete until the color is selected
+            self._athlete_sel = athletes[two_column_athlete.act_value]
+            # Next menu select color
+            return MenuStep.SELECT_COLOR
+        else:
+            # End menu
+            return MenuStep.EXIT
+    
     def _menu_analyse_file(self) -> MenuStep:
-        """ Menu displays only that the file is analysed
+        """ Menu displays the progress while the file is analysed (the clubs can be browsed before it is finished)
         :return: The next menu step which should be displayed
         """
         # in case there is still data
-        if self._collection:
+        if self._collection and self._parse_thread is None:
             # and the data is from the same file
             if self._collection.name == self._pdf_file:
                 # go direct to choose club
                 return MenuStep.SELECT_CLUB
-        # Shorten actual file if necessary
-        act_file = self._shorten_file(self._pdf_file, self._base.x_max - 4)
-        # Clear screen
-        self.stdscr.clear()
-        # Draw heading of screen
-        self._base.draw_head(["Reading PDF file", f"({act_file})", "Please wait"])
-        # Generate stdout for menu
-        local_out = MenuStdout(self.stdscr, 5, 15)
-        # Override stdout
-        sys.stdout = local_out
-        # Read pdf-file
-        pdf_obj = PDFOperations()
-        # Read pdf
-        read_result = pdf_obj.read_pdf(self._pdf_file)
+        # Reading of another file is stopped
+        if self._parse_thread is not None and self._parse_file != self._pdf_file:
+            self._cancel_parse()
+        # Start reading in the background
+        if self._parse_thread is None:
+            self._start_parse()
+        # Wait until the reading is finished or the clubs should be browsed
+        next_step = self._wait_parse(browse=True)
+        # Next menu select club (if reading is finished or clubs are browsed)
+        return next_step if next_step else MenuStep.SELECT_CLUB
+    
+    def _start_parse(self):
+        """ Starts the reading of the pdf file in a background thread """
+        # MuPDF is not thread safe, the file info of the pdf menu must not be read at the same time
+        if self._pdf_index is not None:
+            self._pdf_index.stop()
+        # Outputs of the reading are stored and drawn by the menu
+        self._parse_log = MenuLog(self._base.y_max)
+        sys.stdout = self._parse_log
+        self._parse_obj = PDFOperations()
+        self._parse_file = self._pdf_file
+        self._parse_result = False
+        self._collection = None
+        self._parse_thread = threading.Thread(target=self._parse_worker, args=(self._parse_obj, self._pdf_file),
+                                              daemon=True)
+        self._parse_thread.start()
+    
+    def _parse_worker(self, pdf_obj: PDFOperations, pdf_file: str):
+        """ Reads the pdf file (runs in the background thread)
+        :param pdf_obj: Object to read the pdf
+        :param pdf_file: The pdf file
+        """
+        try:
+            # The clubs can be browsed after the first stage
+            self._parse_result = pdf_obj.read_pdf(pdf_file, lazy=True) and pdf_obj.finish()
+        except Exception as e:
+            print(f'[Exception] {e}')
+            self._parse_result = False
+    
+    def _finish_parse(self) -> bool:
+        """ Ends the finished background thread and stores the read data
+        :return: Reading was successful (True) or not
+        """
+        self._parse_thread.join()
         # Reset stdout
         sys.stdout = sys.__stdout__
-        # Check result
-        if not read_result:
-            # Clear screen again
-            self.stdscr.clear()
-            # No valid data found
-            self._base.draw_head(
-                ["Reading PDF file", f"({self._pdf_file})", "Reading failed, Esc to go back and select other file"])
-            # Draw bottom menu
-            self._draw_menu(end=True, back=True)
+        result = self._parse_result
+        if result:
+            # Store collection and the borders
+            self._collection = self._parse_obj.collection
+            self._border = self._parse_obj.text_x_range
+        else:
+            self._collection = None
+        self._parse_thread = None
+        self._parse_obj = None
+        return result
+    
+    def _cancel_parse(self):
+        """ Cancels a running reading of the pdf file and releases the data read so far """
+        if self._parse_thread is None:
+            return
+        self._parse_obj.cancel()
+        self._parse_thread.join()
+        # Reset stdout
+        sys.stdout = sys.__stdout__
+        # In case the reading finished before it was cancelled
+        if self._parse_obj.collection is not None:
+            self._parse_obj.collection.close()
+        self._collection = None
+        self._parse_thread = None
+        self._parse_obj = None
+    
+    def _wait_parse(self, browse: bool = False) -> [MenuStep, None]:
+        """ Displays the progress until the reading in the background is finished
+        :param browse: The clubs could be browsed before the reading is finished
+        :return: None in case all data is read, otherwise the next menu step which should be displayed
+        """
+        # Nothing to wait for
+        if self._parse_thread is None:
+            return None
+        key = self._display_parse_progress(browse)
+        # ----- evaluate keys -----
+        # Back key (cancel reading)
+        if key in BottomMenu.BACK.keys:
+            self._cancel_parse()
+            # Next menu choose pdf
+            return MenuStep.SELECT_PDF
+        # Exit keys
+        elif key in BottomMenu.EXIT.keys:
+            self._cancel_parse()
+            # End Menu
+            return MenuStep.EXIT
+        # Enter keys (browse the clubs found so far)
+        elif key in KeyLists.LIST_OKAY:
+            self._collection = self._parse_obj.collection
+            return MenuStep.SELECT_CLUB
+        # Reading finished
+        if self._finish_parse():
+            return None
+        # Clear screen again
+        self.stdscr.clear()
+        # No valid data found
+        self._base.draw_head(
+            ["Reading PDF file", f"({self._pdf_file})", "Reading failed, Esc to go back and select other file"])
+        # Draw bottom menu
+        self._draw_menu(end=True, back=True)
+        while True:
             # Wait for key
             key = self.stdscr.getch()
             # ----- evaluate keys -----
@@ -776,13 +1126,7 @@ class TextInterface:
             elif key in BottomMenu.EXIT.keys:
                 # End Menu
                 return MenuStep.EXIT
-        else:
-            # Store collection and the borders
-            self._collection = pdf_obj.collection
-            self._border = pdf_obj.text_x_range
-        # Next menu select club
-        return MenuStep.SELECT_CLUB
-            
+    
     def _menu_select_pdf(self) -> MenuStep:
         """ Menu to choose a pdf file
         :return: The next menu step which should be displayed
@@ -802,17 +1146,46 @@ class TextInterface:
             
         # search pdf files
         pdf_files = glob.glob(fr'{act_path}/*{filetype}')
-        # Create list of files (basename)
-        if pdf_files:
-            pdf_files = list(map(os.path.basename, pdf_files))
-            pdf_files.sort() # sort files
+        # Read the metadata of new or changed files in the background
+        self._pdf_index.scan(pdf_files)
+        scanning = self._pdf_index.scanning
+        # Create list of entries (basename and metadata if known)
+        entries: dict = {}
+        infos: dict = {}
+        for pdf_file in pdf_files:
+            info = self._pdf_index.get(pdf_file)
+            entry = os.path.basename(pdf_file)
+            if info:
+                entry += fr' ({info})'
+            entries[entry] = os.path.basename(pdf_file)
+            infos[entry] = info
+        # Sort entries by name or by date (newest first, files without date at the end)
+        pdf_list = sorted(entries.keys(), key=lambda x: entries[x])
+        if self._pdf_sort_date:
+            pdf_list.sort(key=lambda x: infos[x].date if infos[x] and infos[x].date else '', reverse=True)
         # Create header
-        header = ["Choose your PDF file:", f"({act_path})", '']
+        state = 'sorted by date' if self._pdf_sort_date else 'sorted by name'
+        if scanning:
+            state += ', reading file info'
+        header = ["Choose your PDF file:", f"({act_path}) - {state}", '']
         # Create menu class
-        two_column_pdf = TwoColumnList(self.stdscr, pdf_files, 3, -2, filetype)
-        # Display menu
-        key = self._display_two_columns(two_column_pdf, header, True, False, True, False)
+        two_column_pdf = TwoColumnList(self.stdscr, pdf_list, 3, -2, '')
+        # Select the last file again
+        for entry, name in entries.items():
+            if name == os.path.basename(self._pdf_file):
+                two_column_pdf.default_string = entry
+        # Display menu (displayed again when the file info is read)
+        key = self._display_two_columns(two_column_pdf, header, True, False, True, False, sort_menu=True,
+                                        poll=(lambda: not self._pdf_index.scanning) if scanning else None)
         #----- evaluate keys -----
+        # File info was read or sort key
+        if key == -1 or key in BottomMenu.SORT.keys:
+            if key in BottomMenu.SORT.keys:
+                self._pdf_sort_date = not self._pdf_sort_date
+            # Keep the selected file
+            if two_column_pdf.act_value:
+                self._pdf_file = os.path.join(act_path, entries[two_column_pdf.act_value])
+            return MenuStep.SELECT_PDF
         # Change dir key
         if key in BottomMenu.CHG_DIR.keys:
             # store act path
@@ -822,7 +1195,7 @@ class TextInterface:
         # Enter key
         elif key in KeyLists.LIST_OKAY:
             # Create pdf file (full path)
-            self._pdf_file = os.path.abspath(act_path + '/' + two_column_pdf.act_value)
+            self._pdf_file = os.path.abspath(act_path + '/' + entries[two_column_pdf.act_value])
             # Next menu analyse pdf file
             return MenuStep.ANALYSE_FILE
         else:
@@ -850,7 +1223,11 @@ class TextInterface:
                     # remove it from list
                     club_names.remove(club)
         # Create header
-        header = ["Found following Clubs:", f"({act_file})", '']
+        if self._parse_thread is not None:
+            # Reading is not finished
+            header = ["Found following Clubs (still reading PDF file):", f"({act_file})", '']
+        else:
+            header = ["Found following Clubs:", f"({act_file})", '']
         # Create menu class
         two_column_club = TwoColumnList(self.stdscr, club_names,3,-2, '')
         # Create entry for config file
@@ -902,7 +1279,10 @@ class TextInterface:
         index: int = -1
         default_str: str = ''
         # Create entry for config file
-        if self._sel_no == 0:
+        if self._athlete_sel is not None:
+            # In case an athlete is selected default is 'athlete_color'
+            entry = 'athlete_color'
+        elif self._sel_no == 0:
             # In case it is the first one default is 'color'
             entry = 'color'
         else:
@@ -926,12 +1306,19 @@ class TextInterface:
         # Set default string (if exits)
         two_column_color.default_string = default_str
         # Create header
-        header = [f'Select your color for marking', f'({self._clubs[self._sel_no]})', '']
+        if self._athlete_sel is not None:
+            header = [f'Select your color for marking', f'({self._athlete_str(self._athlete_sel)})', '']
+        else:
+            header = [f'Select your color for marking', f'({self._clubs[self._sel_no]})', '']
         # Display menu
         key = self._display_two_columns(two_column_color, header, True, True, False, True)
         # ----- evaluate keys -----
         # Back key
         if key in BottomMenu.BACK.keys:
+            if self._athlete_sel is not None:
+                # Next menu is select athlete
+                self._athlete_sel = None
+                return MenuStep.SELECT_ATHLETE
             # Next menu is select club
             return MenuStep.SELECT_CLUB
         # Change color key
@@ -942,8 +1329,13 @@ class TextInterface:
         elif key in KeyLists.LIST_OKAY:
             # Get color form selected value
             color = two_column_color.act_value.split(']')[1].strip()
+            # Store athlete and color
+            if self._athlete_sel is not None:
+                self._athletes.append(self._athlete_sel)
+                self._athlete_colors.append(color)
+                self._athlete_sel = None
             # Store color
-            if len(self._colors) <= self._sel_no:
+            elif len(self._colors) <= self._sel_no:
                 self._colors.append(color)
             else:
                 self._colors[self._sel_no] = color
@@ -963,9 +1355,12 @@ class TextInterface:
             if self._clubs[0] != self.__ENTRY_ALL:
                 # Generate output file with name of club
                 output_file = fr'Output: {act_file[:-4]}_{self._clubs[0]}.pdf'
+            elif self._layers:
+                # One pdf with a layer per club
+                output_file = fr'Output: {act_file[:-4]}_all_clubs.pdf, {os.path.basename(act_file)[:-4]}_all_clubs.html'
             else:
                 # Generate output file with placeholder
-                output_file = fr'Output: {act_file[:-4]}_<club_name>>.pdf'
+                output_file = fr'Output: {act_file[:-4]}_<club_name>>.pdf, {os.path.basename(act_file)[:-4]}_all_clubs.html'
         else:
             # Set to marked with the number of clubs
             output_file = fr'Output: {act_file}_marked_{self._sel_no+1:02d}.pdf'
@@ -973,15 +1368,21 @@ class TextInterface:
         club_list: list = []
         for i in range(self._sel_no+1):
             club_list.append(fr' {self._clubs[i]} ({self._colors[i]})')
+        # Add the selected athletes to the list
+        for athlete, color in zip(self._athletes, self._athlete_colors):
+            club_list.append(fr' {self._athlete_str(athlete)} ({color})')
         # Create menu points
-        if self._sel_no + 1 >= 10 or self._clubs[0] == self.__ENTRY_ALL:
-            # Only okay
-            menus = [self.__OKAY]
-        else:
-            # Okay and new selection
-            menus = [self.__OKAY, 'Add club for selection']
+        menus = [self.__OKAY]
+        # New selection (up to 10 clubs and athletes)
+        if self._clubs[0] != self.__ENTRY_ALL and len(club_list) < 10:
+            if self._sel_no + 1 < 10:
+                menus.append(self.__ADD_CLUB)
+            menus.append(self.__ADD_ATHLETE)
+        # Switch between one pdf per club and one pdf with layers
+        if self._clubs[0] == self.__ENTRY_ALL:
+            menus.append(self.__LAYERS_OFF if self._layers else self.__LAYERS_ON)
         # Create header
-        if self._sel_no == 0:
+        if len(club_list) == 1:
             # Single club
             header = ['Summery', output_file, '\n' + club_list[0]]
         else:
@@ -1000,6 +1401,10 @@ class TextInterface:
         elif key in KeyLists.LIST_OKAY:
             # In case okay is selected
             if two_column_summery.act_value == self.__OKAY:
+                # All data of the pdf is needed
+                next_step = self._wait_parse()
+                if next_step:
+                    return next_step
                 # Create stdout for screen
                 local_out = MenuStdout(self.stdscr, 17, 4)
                 # Override stdout
@@ -1010,6 +1415,13 @@ class TextInterface:
                 sys.stdout = sys.__stdout__
                 # End Menu
                 return MenuStep.EXIT
+            elif two_column_summery.act_value == self.__ADD_ATHLETE:
+                # Next menu enter athlete
+                return MenuStep.ENTER_ATHLETE
+            elif two_column_summery.act_value in [self.__LAYERS_ON, self.__LAYERS_OFF]:
+                # Show summary again with the other output
+                self._layers = not self._layers
+                return MenuStep.SUMMARY
             else:
                 # Increment counter
                 self._sel_no += 1
@@ -1030,6 +1442,11 @@ class TextInterface:
         if 'mark_end' in list(self.config.default.keys()):
             # set end value
             self._border[1] = self.config.default['mark_end']
+        # Start lists of all clubs (created once for all outputs)
+        index = StartListIndex.from_collection(self._collection)
+        # Only the pages with the clubs (and the title page) are written
+        excerpt = self.config.default.get('excerpt', '0') == '1'
+        page_nos = None
         # Check if all clubs should be created
         if self._clubs[0] == self.__ENTRY_ALL:
             # Get color
@@ -1039,13 +1456,31 @@ class TextInterface:
                 # Create output file name
                 output_file = self._gen_output_file(os.path.dirname(self._pdf_file),
                                                     os.path.basename(self._pdf_file)[:-4] + '_' + club.name)
-                # Highlight pdf
-                PDFOperations.highlight_pdf(self._pdf_file, output_file, club.occurrence, color,
-                                            self._border[0], self._border[1], int(self.config.default['offset']))
-                PDFOperations.add_product_info(output_file, self._collection)
+                # Highlight pdf (in case of layers all clubs are written to one pdf afterward)
+                if not self._layers:
+                    if excerpt:
+                        page_nos = PDFOperations.excerpt_pages([club])
+                    PDFOperations.highlight_pdf(self._pdf_file, output_file, club.occurrence, color,
+                                                self._border[0], self._border[1], int(self.config.default['offset']),
+                                                page_nos)
+                    PDFOperations.add_product_info(output_file, self._collection, page_nos)
                 # Create other output
-                club_to_file(output_file[:-4] + '.md', club, FileType.MARKDOWN)
-                club_to_file(output_file[:-4] + '.html', club, FileType.HTML)
+                club_to_file(output_file[:-4] + '.md', club, FileType.MARKDOWN, index)
+            # One pdf with a layer per club (can be switched on and off in the pdf reader)
+            if self._layers:
+                output_file = self._gen_output_file(os.path.dirname(self._pdf_file),
+                                                    os.path.basename(self._pdf_file)[:-4] + '_all_clubs')
+                clubs = self._collection.clubs
+                PDFOperations.highlight_pdf_layers(self._pdf_file, output_file, clubs, [color] * len(clubs),
+                                                   self._border[0], self._border[1], int(self.config.default['offset']))
+                PDFOperations.add_product_info(output_file, self._collection)
+            memory_step('highlight pdf', self._collection)
+            self.config.default['layers'] = '1' if self._layers else '0'
+            # One html file for all clubs (can be filtered in the browser)
+            output_file = self._gen_output_file(os.path.dirname(self._pdf_file),
+                                                os.path.basename(self._pdf_file)[:-4] + '_all_clubs')
+            all_clubs_to_file(output_file[:-4] + '.html', index, fr'Meldungen {os.path.basename(self._pdf_file)[:-4]}')
+            memory_step('outputs', self._collection)
         # Only one or up to 10 should be created
         else:
             # Init lists
@@ -1067,16 +1502,26 @@ class TextInterface:
                 output_file = self._gen_output_file(os.path.dirname(self._pdf_file),
                                                     os.path.basename(self._pdf_file)[:-4] + '_' + clubs[i].name)
                 # Create other output
-                club_to_file(output_file[:-4] + '.md', clubs[i], FileType.MARKDOWN)
-                club_to_file(output_file[:-4] + '.html', clubs[i], FileType.HTML)
+                club_to_files([output_file[:-4] + '.md', output_file[:-4] + '.html'], clubs[i],
+                              [FileType.MARKDOWN, FileType.HTML], index)
+            memory_step('outputs', self._collection)
+            # Add the athletes (drawn over the clubs)
+            for athlete, color in zip(self._athletes, self._athlete_colors):
+                clubs.append(athlete)
+                colors.append(self.config.colors.rgb[color])
+                self.config.default['athlete_color'] = color
             # In case of single club
             if self._sel_no != 0:
                 # Create output file name
                 output_file = self._gen_output_file(os.path.dirname(self._pdf_file), os.path.basename(self._pdf_file)[:-4] + '_' + fr'_marked_{self._sel_no + 1:02d}')
             # Highlight pdf
+            if excerpt:
+                page_nos = PDFOperations.excerpt_pages(clubs)
             PDFOperations.highlight_pdf_clubs(self._pdf_file, output_file, clubs, colors,
-                                              self._border[0], self._border[1], int(self.config.default['offset']))
-            PDFOperations.add_product_info(output_file, self._collection)
+                                              self._border[0], self._border[1], int(self.config.default['offset']),
+                                              page_nos)
+            PDFOperations.add_product_info(output_file, self._collection, page_nos)
+            memory_step('highlight pdf', self._collection)
         # Store path in config
         if self._default_path != os.path.dirname(self._pdf_file):
             self.config.default['search_path'] = os.path.dirname(self._pdf_file)
@@ -1090,22 +1535,7 @@ class TextInterface:
         :param file_name: Name of the file
         :return: Full file name
         """
-        if file_name.endswith('.pdf'):
-            # remove pdf from file name
-            file_name = file_name[:-4]
-            
-        # ----- Replace unwanted characters -----
-        file_name = file_name.replace('/', ' ') # remove '/
-        file_name = file_name.replace('.', ' ') # remove '.'
-        file_name = ' '.join(file_name.split()) # remove more than one ' ' (blanc)
-        
-        # Check if ending is correct
-        if not file_name.endswith('.pdf'):
-            # Otherwise add it
-            file_name += '.pdf'
-        
-        # Return full path
-        return os.path.abspath(path +'/'+ file_name)
+        return output_file_name(path, file_name)
     
     @staticmethod
     def _shorten_file(file_name: str, max_length: int) -> str:
@@ -1125,13 +1555,42 @@ class TextInterface:
         return act_file
     
     @staticmethod
-    def _active_key_list(exit_entry: bool, back_entry: bool, chg_dir_entry: bool, chg_color_entry: bool, enter_keys: bool) -> list:
+    def _athlete_str(athlete) -> str:
+        """ Generates the string of an athlete which is displayed
+        :param athlete: The athlete
+        :return: Name, year and club of the athlete
+        """
+        year = fr' ({athlete.year.year})' if athlete.year else ''
+        club = fr' - {athlete.club.name}' if athlete.club else ''
+        return fr'{athlete.name}{year}{club}'
+    
+    def _match_athletes(self, text: str, limit: int = 0) -> list:
+        """ Returns the athletes found by a (part of a) name
+        :param text: Entered name
+        :param limit: Max number of athletes [default = 0 (__ATHLETE_MATCHES)]
+        :return: A list of athletes (same name, beginning of the name and similar names)
+        """
+        limit = limit if limit > 0 else self.__ATHLETE_MATCHES
+        index = self._collection.athlete_index()
+        # Same name first, then the names which begin with the text and at least similar names
+        athletes = index.exact(text) + index.prefix(text, limit)
+        athletes += [athlete for _, athlete in index.similar(text, limit)]
+        # Remove the duplicates
+        result: list = []
+        for athlete in athletes:
+            if athlete not in result:
+                result.append(athlete)
+        return result[:limit]
+    
+    @staticmethod
+    def _active_key_list(exit_entry: bool, back_entry: bool, chg_dir_entry: bool, chg_color_entry: bool, enter_keys: bool, sort_entry: bool = False) -> list:
         """ Generates a key list to check
         :param exit_entry: If exit keys should be checked
         :param back_entry: If back keys should be checked
         :param chg_dir_entry: If change dir keys should be checked
         :param chg_color_entry: If change color keys should be checked
         :param enter_keys: If enter keys should be checked
+        :param sort_entry: If sort keys should be checked
         :return: A list of keys
         """
         # Init key list
@@ -1151,9 +1610,12 @@ class TextInterface:
         # Check if enter keys should be added
         if enter_keys:
             keys.extend(KeyLists.LIST_OKAY)
+        # Check if sort keys should be added
+        if sort_entry:
+            keys.extend(BottomMenu.SORT.keys)
         return keys
     
-    def _display_two_columns(self, two_column_list: TwoColumnList, header_list: list, exit_menu: bool = True, back_menu: bool = False, chg_dir_menu: bool = False, chg_color_menu: bool = False) -> int:
+    def _display_two_columns(self, two_column_list: TwoColumnList, header_list: list, exit_menu: bool = True, back_menu: bool = False, chg_dir_menu: bool = False, chg_color_menu: bool = False, sort_menu: bool = False, poll=None) -> int:
         """ Display a two column select screen
         :param two_column_list: Object which handles the data
         :param header_list: Header to be displayed
@@ -1161,8 +1623,20 @@ class TextInterface:
         :param back_menu: If back menu entry should be shown
         :param chg_dir_menu: I change dir menu entry should be shown
         :param chg_color_menu: If change color menu entry should be displayed
-        :return: valid pressed key as int
+        :param sort_menu: If sort menu entry should be displayed
+        :param poll: Function which is called while waiting for keys, returns True if the list must be created again
+        :return: valid pressed key as int or -1 in case poll returned True
         """
+        # Wait only a short time for keys in case of poll
+        if poll is not None:
+            self.stdscr.timeout(500)
+        try:
+            return self._display_two_columns_loop(two_column_list, header_list, exit_menu, back_menu, chg_dir_menu, chg_color_menu, sort_menu, poll)
+        finally:
+            self.stdscr.timeout(-1)
+    
+    def _display_two_columns_loop(self, two_column_list: TwoColumnList, header_list: list, exit_menu: bool, back_menu: bool, chg_dir_menu: bool, chg_color_menu: bool, sort_menu: bool, poll) -> int:
+        """ Main loop of _display_two_columns (see there) """
         # function variables
         key: int = 0
         selected_idx: int = 0
@@ -1186,13 +1660,35 @@ class TextInterface:
                     self._base.draw_head(header_list)
                 # draw list
                 draw_fcn(selected_idx)
+                # draw filter text
+                self._draw_filter(two_column_list)
                 # draw menu
-                self._draw_menu(next_page=two_column_list.next_page, prev_page=two_column_list.prev_page, end=exit_menu, back=back_menu, chg_dir=chg_dir_menu, chg_color=chg_color_menu)
+                self._draw_menu(next_page=two_column_list.next_page, prev_page=two_column_list.prev_page, end=exit_menu, back=back_menu, chg_dir=chg_dir_menu, chg_color=chg_color_menu, sort=sort_menu)
                 # Hide cursor
                 curses.curs_set(0)
             
             # do keys
             key = self.stdscr.getch()
+            # no key pressed (poll)
+            if key == -1 and poll is not None:
+                if poll():
+                    return -1
+                draw_fcn = two_column_list.refresh
+                continue
+            # eval filter keys (typed text narrows the list)
+            if two_column_list.eval_filter_key(key):
+                # draw only the changed entries of the first page
+                selected_idx = 0
+                two_column_list.draw(selected_idx, 0, True)
+                self._draw_filter(two_column_list)
+                # draw menu again (pages could be changed)
+                last_row = self.stdscr.getmaxyx()[0] - 1
+                self.stdscr.move(last_row, 0)
+                self.stdscr.clrtoeol()
+                self._draw_menu(next_page=two_column_list.next_page, prev_page=two_column_list.prev_page, end=exit_menu, back=back_menu, chg_dir=chg_dir_menu, chg_color=chg_color_menu, sort=sort_menu)
+                self.stdscr.refresh()
+                draw_fcn = two_column_list.refresh
+                continue
             # eval arrow keys
             selected_idx=two_column_list.eval_arrows_keys(key)
             # eval prev and next page
@@ -1203,12 +1699,25 @@ class TextInterface:
             else:
                 draw_fcn = two_column_list.refresh
             # Get key list
-            keys = self._active_key_list(exit_menu, back_menu, chg_dir_menu, chg_color_menu, two_column_list.is_drawn)
+            keys = self._active_key_list(exit_menu, back_menu, chg_dir_menu, chg_color_menu, two_column_list.is_drawn and bool(two_column_list.values), sort_menu)
             # In case key is valid
             if key in keys:
                 # return it
                 return key
          
+    def _draw_filter(self, two_column_list: TwoColumnList):
+        """ Draws the filter text of a list in the row below the list
+        :param two_column_list: The list
+        """
+        # Only if there is a free row above the menu
+        if two_column_list.row_end >= self._base.y_max - 1:
+            return
+        self.stdscr.move(two_column_list.row_end, 0)
+        self.stdscr.clrtoeol()
+        if two_column_list.filter_text:
+            text = fr'Filter: {two_column_list.filter_text} ({len(two_column_list.values)})'
+            self.stdscr.addstr(two_column_list.row_end, 1, text[:self._base.x_max - 2], curses.A_ITALIC)
+    
     def _display_path_dialog(self) -> int:
         """ Display a path dialog screen
         :return: Valid key number
@@ -1373,7 +1882,122 @@ class TextInterface:
             self.stdscr.refresh()
         # return key
         return key
+    
+    def _display_athlete_dialog(self) -> int:
+        """ Display a dialog to enter the name of an athlete, the found athletes are shown while typing
+        :return: Valid key number
+        """
+        # Clear screen
+        self.stdscr.clear()
+        # Display all characters
+        curses.echo()
+        # Create header
+        self._base.draw_head(["Enter name of the athlete: ", "(e.g. Mustermann, Max or a part of it)", ''])
+        # Draw bottom menu
+        self._draw_menu(end=True, back=True)
+        # Add line to where to add
+        self.stdscr.addstr(5, 0, "> ")
+        # Set curser and made it visible
+        curses.setsyx(5, 2)
+        curses.curs_set(1)
+        # Generate valid keys to leave menu
+        keys = self._active_key_list(True, True, False, False, False)
+        # Menu loop
+        name = self._athlete_query
+        self.stdscr.addstr(5, 2, name)
+        while True:
+            # wait for key pressed
+            key = self.stdscr.getch()
+            # Check if key is valid
+            if key in keys:
+                # Stop display all characters and disable curser
+                curses.noecho()
+                curses.curs_set(0)
+                break
+            # In case key is enter and a name was entered
+            elif key in KeyLists.LIST_OKAY:
+                if name.strip():
+                    # Store name
+                    self._athlete_query = name.strip()
+                    # Stop display all characters and disable curser
+                    curses.noecho()
+                    curses.curs_set(0)
+                    break
+            # Key Backspace
+            elif key == curses.KEY_BACKSPACE:
+                # Remove last character
+                name = name[:-1]
+            else:
+                # Add the typed character to the string
+                name += chr(key)
+            # Draw the found athletes
+            matches = self._match_athletes(name, self.__ATHLETE_PREVIEW) if name.strip() else []
+            for i in range(self.__ATHLETE_PREVIEW):
+                self.stdscr.addstr(7 + i, 2, ' ' * int(self.stdscr.getmaxyx()[1] - 3))
+                if i < len(matches):
+                    self.stdscr.addstr(7 + i, 2, self._athlete_str(matches[i])[:self._base.x_max - 3], curses.A_ITALIC)
+            # Redraw the input with the updated string
+            self.stdscr.addstr(5, 2, ' ' * int(self.stdscr.getmaxyx()[1] - 3))
+            self.stdscr.addstr(5, 2, name)
+            # Update screen
+            self.stdscr.refresh()
+        # Return the key value
+        return key
         
+    def _display_parse_progress(self, browse: bool) -> int:
+        """ Display the progress of the reading in the background
+        :param browse: If the clubs could be browsed (enter key) as soon as they are read
+        :return: valid pressed key as int or -1 in case the reading is finished
+        """
+        # Shorten actual file if necessary
+        act_file = self._shorten_file(self._pdf_file, self._base.x_max - 4)
+        # Clear screen
+        self.stdscr.clear()
+        # Hide cursor
+        curses.curs_set(0)
+        # Draw heading of screen
+        self._base.draw_head(["Reading PDF file", f"({act_file})", "Please wait, Esc to cancel"])
+        # Draw bottom menu
+        self._draw_menu(end=True, back=True)
+        # Width of the progress bar
+        width = max(10, self._base.x_max - 10)
+        # Wait only a short time for keys, so the progress is updated
+        self.stdscr.timeout(100)
+        try:
+            while self._parse_thread.is_alive():
+                pages, page_cnt, competitions, competition_cnt = self._parse_obj.progress
+                # Progress bar by the read pages
+                done = int(width * pages / page_cnt) if page_cnt else 0
+                self.stdscr.addstr(5, 0, '[' + '#' * done + '.' * (width - done) + ']')
+                self.stdscr.addstr(5, width + 3, f'{100 * pages // page_cnt if page_cnt else 0:3d}%')
+                self.stdscr.move(6, 0)
+                self.stdscr.clrtoeol()
+                self.stdscr.addstr(6, 0, f'Page {pages}/{page_cnt}, Competition {competitions}/{competition_cnt}'
+                                   [:self._base.x_max - 1])
+                # Clubs are known
+                clubs_read = browse and self._parse_obj.report_read
+                if clubs_read:
+                    self.stdscr.addstr(3, 0, "Enter to browse the found clubs, Esc to cancel"[:self._base.x_max - 1])
+                    self.stdscr.clrtoeol()
+                # Last outputs of the reading
+                lines = self._parse_log.lines[-max(0, self._base.y_max - 10):]
+                for row, line in enumerate(lines, start=8):
+                    self.stdscr.move(row, 0)
+                    self.stdscr.clrtoeol()
+                    self.stdscr.addstr(row, 0, line[:self._base.x_max - 1])
+                self.stdscr.refresh()
+                # Wait for key
+                key = self.stdscr.getch()
+                # ----- evaluate keys -----
+                if key in BottomMenu.BACK.keys or key in BottomMenu.EXIT.keys:
+                    return key
+                elif clubs_read and key in KeyLists.LIST_OKAY:
+                    return key
+        finally:
+            # Wait for keys again
+            self.stdscr.timeout(-1)
+        return -1
+    
     def _draw_menu_entry(self, row, pos, shortcut, text):
         """ Draw a single menu entry
         :param row: On the Row to draw
@@ -1386,7 +2010,7 @@ class TextInterface:
         # Draw text
         self._base.draw_sel_str(row, pos*15 + len(shortcut) + 1, text, False)
     
-    def _draw_menu(self, *, end: bool = True, back: bool = True, next_page: bool = False, prev_page: bool = False, chg_dir: bool = False, chg_color: bool = False):
+    def _draw_menu(self, *, end: bool = True, back: bool = True, next_page: bool = False, prev_page: bool = False, chg_dir: bool = False, chg_color: bool = False, sort: bool = False):
         """ Draws a menu with valid entries
         :param end: Exit menu displayed?
         :param back: Back menu displayed?
@@ -1394,13 +2018,14 @@ class TextInterface:
         :param prev_page: Previous page displayed?
         :param chg_dir: Change dir displayed?
         :param chg_color: Change color displayed?
+        :param sort: Sort displayed?
         """
         # get last row
         last_row = self.stdscr.getmaxyx()[0] -1
         # create list of menus to draw
-        menus = [end, back, next_page, prev_page, chg_dir, chg_color]
+        menus = [end, back, next_page, prev_page, chg_dir, chg_color, sort]
         # create menu list
-        entries = [BottomMenu.EXIT, BottomMenu.BACK, BottomMenu.NEXT_PAGE, BottomMenu.PREV_PAGE, BottomMenu.CHG_DIR, BottomMenu.CHG_COLOR]
+        entries = [BottomMenu.EXIT, BottomMenu.BACK, BottomMenu.NEXT_PAGE, BottomMenu.PREV_PAGE, BottomMenu.CHG_DIR, BottomMenu.CHG_COLOR, BottomMenu.SORT]
         # loop over menu to draw
         for i in range(len(entries)):
             if menus[i]:
@@ -0,0 +1,100 @@
+import sys
+import time
+import builtins
+
+
+class StartupTiming:
+    """
+    Represents a measurement of the import time of the modules and the duration of the steps of the program
+    (highlightClub.py --timing). The imports are measured by wrapping the import function, so only modules which are
+    not loaded yet are counted. The time of a module includes the time of the modules it imports.
+
+    Attributes:
+    -----------
+    total : float
+        Time since the start of the measurement in ms
+
+    Methods:
+    --------
+    start()
+        Starts measuring the imports
+    stop()
+        Stops measuring the imports
+    step(name)
+        Stores the duration since the last step
+    report(file)
+        Prints the import times and the steps
+    """
+
+    def __init__(self, depth: int = 2, threshold: float = 1.0):
+        """ Initializes a new StartupTiming
+        :param depth: Max depth of the nested imports in the report
+        :param threshold: Imports faster than this time in ms are not shown
+        """
+        self._depth: int = depth
+        self._threshold: float = threshold
+        self._start: float = time.perf_counter()
+        self._last: float = self._start
+        self._import = None
+        # Current depth of nested imports
+        self._level: int = 0
+        # Imports in the order they were started, entries are [level, name, time in ms]
+        self._modules: list = []
+        # Steps, entries are (name, time in ms)
+        self._steps: list = []
+
+    @property
+    def total(self) -> float:
+        """ Returns the time since the start of the measurement
+        :return: Time in ms
+        """
+        return (time.perf_counter() - self._start) * 1000.0
+
+    def start(self):
+        """ Starts measuring the imports """
+        if self._import is None:
+            self._import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def stop(self):
+        """ Stops measuring the imports """
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def step(self, name: str):
+        """ Stores the duration since the last step (or the start)
+        :param name: Name of the step
+        """
+        now = time.perf_counter()
+        self._steps.append((name, (now - self._last) * 1000.0))
+        self._last = now
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """ Replaces the import function and measures the time of modules which are loaded the first time """
+        # Relative or already loaded modules are part of the time of the importing module
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        entry = [self._level, name, 0.0]
+        self._modules.append(entry)
+        self._level += 1
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            entry[2] = (time.perf_counter() - start) * 1000.0
+            self._level -= 1
+
+    def report(self, file=None):
+        """ Prints the import times and the steps (by default to stderr, so the outputs of the program are unchanged)
+        :param file: Stream for the report [default = None (stderr)]
+        """
+        file = file if file else sys.stderr
+        self.stop()
+        imports = sum(entry[2] for entry in self._modules if entry[0] == 0)
+        print(fr'Timing (imports {imports:.1f} ms, total {self.total:.1f} ms)', file=file)
+        for level, name, duration in self._modules:
+            if level < self._depth and duration >= self._threshold:
+                print(fr'  {"  " * level}{name:<{40 - 2 * level}} {duration:8.1f} ms', file=file)
+        for name, duration in self._steps:
+            print(fr'  step {name:<35} {duration:8.1f} ms', file=file)
@@ -0,0 +1,397 @@
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import datetime
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Class_Config import Config
+from Class_Metrics import Metrics
+
+# Maximum number of additional clubs in the config (club_02 ... club_10)
+MAX_CLUBS: int = 10
+# Name of the file with the counters in the prometheus text format (in the output directory)
+METRICS_FILE: str = 'highlightClub.prom'
+
+
+def _print(text: str):
+    """ Prints a text with time stamp
+    :param text: Text to print
+    """
+    print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] {text}', flush=True)
+
+
+class _Inotify:
+    """
+    Represents a minimal inotify watch of one directory (linux only, accessed via ctypes)
+
+    Methods:
+    --------
+    read(timeout) : list
+        Returns the names of the files which were written or moved into the directory
+    close()
+        Closes the watch
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0x00000800
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, path: str):
+        """ Initializes a new inotify watch
+        :param path: Directory to watch
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd: int = libc.inotify_init1(self.IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self._fd, os.fsencode(path), self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), fr'inotify_add_watch failed for {path}')
+
+    def read(self, timeout: float) -> list:
+        """ Returns the names of the files which were written or moved into the directory
+        :param timeout: Max time to wait for an event in seconds
+        :return: A list with file names
+        """
+        names: list = []
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return names
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        pos = 0
+        while pos + self._EVENT_HEADER.size <= len(data):
+            _, _, _, length = self._EVENT_HEADER.unpack_from(data, pos)
+            pos += self._EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b'\0')
+            pos += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        """ Closes the watch """
+        os.close(self._fd)
+
+
+# Config of the worker process
+_worker_config: [Config, None] = None
+
+
+def _worker_init(config_file: str):
+    """ Initializes a worker process (loads the config once and mutes the console outputs of the parser)
+    :param config_file: Name of the config file
+    """
+    global _worker_config
+    _worker_config = Config.load(config_file)
+    sys.stdout = open(os.devnull, 'w')
+    # The parser is only loaded by the workers (the daemon only watches the folder)
+    import Class_PDFOperations
+    import CreateFileOutput
+
+
+def _process_file(pdf_file: str, output_path: str, selection: list, borders: list, offset: int,
+                  excerpt: bool = False) -> tuple:
+    """ Parses a pdf and generates the outputs for the configured clubs (runs in a worker process)
+    :param pdf_file: The pdf to process
+    :param output_path: Directory for the output files
+    :param selection: A list with tuples of club name and color (rgb)
+    :param borders: Start and end of the highlighted region, None entries are taken from the pdf
+    :param offset: Offset in px to resize the highlighted region
+    :param excerpt: Only the title page and the pages with the clubs are written
+    :return: A list with the created files and the counters of the file
+    """
+    from Class_Metrics import metrics
+    from Class_PDFOperations import PDFOperations
+    from CreateFileOutput import FileType, StartListIndex, club_to_files, output_file_name
+    # The counters of the worker only contain the outputs of this file
+    metrics.reset()
+    pdf_obj = PDFOperations(word_search=True, config=_worker_config)
+    try:
+        # Only the starts of the configured clubs are needed
+        if not pdf_obj.read_pdf(pdf_file, clubs=[name for name, _ in selection]):
+            raise ValueError('Reading of pdf failed')
+        metrics.update(pdf_obj.metrics)
+        collection = pdf_obj.collection
+
+        # Only the configured clubs which start in this pdf
+        clubs: list = []
+        colors: list = []
+        for name, color in selection:
+            club = collection.club_by_name(name)
+            if club:
+                clubs.append(club)
+                colors.append(color)
+        if not clubs:
+            return [], metrics.to_dict()
+
+        start = borders[0] if borders[0] is not None else pdf_obj.text_x_range[0]
+        end = borders[1] if borders[1] is not None else pdf_obj.text_x_range[1]
+        base_name = os.path.basename(pdf_file)[:-4]
+        os.makedirs(output_path, exist_ok=True)
+
+        created: list = []
+        index = StartListIndex.from_collection(collection)
+        for club in clubs:
+            output_file = output_file_name(output_path, base_name + '_' + club.name)
+            club_to_files([output_file[:-4] + '.md', output_file[:-4] + '.html'], club,
+                          [FileType.MARKDOWN, FileType.HTML], index)
+            created += [output_file[:-4] + '.md', output_file[:-4] + '.html']
+        # One highlighted pdf with all clubs
+        if len(clubs) > 1:
+            output_file = output_file_name(output_path, base_name + '_marked')
+        page_nos = PDFOperations.excerpt_pages(clubs) if excerpt else None
+        PDFOperations.highlight_pdf_clubs(pdf_file, output_file, clubs, colors, start, end, offset, page_nos)
+        PDFOperations.add_product_info(output_file, collection, page_nos)
+        created.append(output_file)
+        return created, metrics.to_dict()
+    finally:
+        # Release the parsed objects, the worker is reused for the next file
+        if pdf_obj.collection is not None:
+            pdf_obj.collection.close()
+
+
+class WatchFolder:
+    """
+    Represents a daemon, which watches a folder for new "Meldeergebnisse" and generates the outputs for the clubs
+    configured in the default section (club/club_NN and color/color_NN). New files are taken as soon as their size
+    and modification time did not change for some time (so partial downloads are not processed).
+
+    Attributes:
+    -----------
+    path : str
+        The watched directory
+    output_path : str
+        Directory for the output files
+
+    Methods:
+    --------
+    selection() : list
+        Returns the configured clubs with their colors
+    metrics : Metrics
+        Counters of the processed files (written to highlightClub.prom in the output directory)
+    run()
+        Watches the folder until stop is called
+    stop()
+        Stops the daemon
+    """
+
+    def __init__(self, path: str = '', output_path: str = '', workers: int = 2, queue_size: int = 4,
+                 settle: float = 2.0, poll: float = 1.0, config: [Config, None] = None):
+        """ Initializes a new watch folder daemon
+        :param path: Directory to watch [default = '' (search_path of config)]
+        :param output_path: Directory for the outputs [default = '' (subdirectory "highlighted" of path)]
+        :param workers: Number of worker processes
+        :param queue_size: Number of files which can wait for a worker
+        :param settle: Time in seconds a file must be unchanged before it is processed
+        :param poll: Interval in seconds to check the folder or the pending files
+        :param config: Config used by the daemon [default = None (loads the default config)]
+        """
+        self.config: Config = config if config else Config.load()
+        if not path:
+            path = self.config.default.get('search_path', '~/Downloads')
+        self.path: str = os.path.abspath(os.path.expanduser(path))
+        if not output_path:
+            output_path = os.path.join(self.path, 'highlighted')
+        self.output_path: str = os.path.abspath(os.path.expanduser(output_path))
+        self._settle: float = settle
+        self._poll: float = poll
+        self._workers: int = max(1, workers)
+        # Limits the files given to the pool (running and waiting)
+        self._slots = threading.BoundedSemaphore(self._workers + max(0, queue_size))
+        self._stop = threading.Event()
+        # Files waiting to be stable (name -> (size, mtime, time of last change))
+        self._pending: dict = {}
+        # Files given to the workers
+        self._active: set = set()
+        # Already processed files (name -> (size, mtime))
+        self._done: dict = {}
+        self.metrics: Metrics = Metrics()
+
+    def selection(self) -> list:
+        """ Returns the configured clubs with their colors
+        :return: A list with tuples of club name and color (rgb)
+        """
+        default = self.config.default
+        default_color = default.get('color', 'yellow')
+        keys: list = [('club', 'color')] + [(fr'club_{i:02d}', fr'color_{i:02d}') for i in range(2, MAX_CLUBS + 1)]
+        selection: list = []
+        for club_key, color_key in keys:
+            if not default.get(club_key, ''):
+                continue
+            color = self.config.colors.get_rgb(default.get(color_key, default_color))
+            if color is None:
+                color = self.config.colors.get_rgb('yellow')
+            selection.append((default[club_key], color))
+        return selection
+
+    def run(self):
+        """ Watches the folder until stop is called """
+        if not os.path.isdir(self.path):
+            raise FileNotFoundError(fr'Directory {self.path} does not exist')
+
+        selection = self.selection()
+        if not selection:
+            _print('No club configured (club/club_NN in Default section), only parsing the files')
+        borders = [self._border_value('mark_start'), self._border_value('mark_end')]
+        offset = int(self.config.default.get('offset', '1'))
+        excerpt = self.config.default.get('excerpt', '0') == '1'
+
+        # Files which already exist are not processed
+        for name, stat in self._scan().items():
+            self._done[name] = stat
+
+        try:
+            watch = _Inotify(self.path)
+            _print(fr'Watching {self.path} (inotify)')
+        except (OSError, AttributeError):
+            watch = None
+            _print(fr'Watching {self.path} (polling every {self._poll}s)')
+
+        pool = self._new_pool()
+        try:
+            while not self._stop.is_set():
+                if watch:
+                    for name in watch.read(self._poll):
+                        # Same check as by polling, the processed files are checked in _stable_files
+                        if name.lower().endswith('.pdf') and name not in self._active:
+                            self._pending.setdefault(name, (-1, -1.0, time.monotonic()))
+                else:
+                    self._stop.wait(self._poll)
+                    for name, stat in self._scan().items():
+                        if name not in self._active and self._done.get(name) != stat:
+                            self._pending.setdefault(name, (-1, -1.0, time.monotonic()))
+
+                for name in self._stable_files():
+                    # In case all workers are busy and the queue is full, the file is taken next time
+                    if not self._slots.acquire(blocking=False):
+                        break
+                    del self._pending[name]
+                    self._active.add(name)
+                    pdf_file = os.path.join(self.path, name)
+                    try:
+                        future = pool.submit(_process_file, pdf_file, self.output_path, selection, borders, offset,
+                                             excerpt)
+                    except BrokenProcessPool:
+                        # A worker crashed (e.g. killed because of missing memory), the pool does not start a new one.
+                        # The files of the crashed pool are skipped (by _finished), this file is taken again.
+                        self._active.discard(name)
+                        self._slots.release()
+                        self._pending[name] = (-1, -1.0, time.monotonic())
+                        _print('Worker process was broken and is replaced')
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._new_pool()
+                        break
+                    _print(fr'Processing {name}')
+                    future.add_done_callback(lambda f, n=name: self._finished(n, f))
+        finally:
+            if watch:
+                watch.close()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        """ Creates the worker processes
+        :return: The executor of the workers
+        """
+        return ProcessPoolExecutor(max_workers=self._workers, initializer=_worker_init,
+                                   initargs=(self.config.file_name,))
+
+    def stop(self):
+        """ Stops the daemon """
+        self._stop.set()
+
+    def _scan(self) -> dict:
+        """ Returns all pdf files of the folder
+        :return: A dictionary with the file name and its size and modification time
+        """
+        files: dict = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def _stable_files(self) -> list:
+        """ Updates the pending files and returns the files which did not change for the settle time
+        :return: A list with file names
+        """
+        stable: list = []
+        now = time.monotonic()
+        for name, (size, mtime, changed) in list(self._pending.items()):
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                # File was removed or renamed (e.g. temporary download file)
+                del self._pending[name]
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self._pending[name] = (stat.st_size, stat.st_mtime, now)
+            elif self._done.get(name) == (stat.st_size, stat.st_mtime):
+                # Already processed and unchanged (e.g. an output written into the watched folder)
+                del self._pending[name]
+            elif stat.st_size > 0 and now - changed >= self._settle:
+                stable.append(name)
+        return stable
+
+    def _finished(self, name: str, future):
+        """ Is called when a file is processed
+        :param name: Name of the file
+        :param future: Future of the worker
+        """
+        try:
+            stat = os.stat(os.path.join(self.path, name))
+            self._done[name] = (stat.st_size, stat.st_mtime)
+        except FileNotFoundError:
+            pass
+        self._active.discard(name)
+        self._slots.release()
+        try:
+            created, values = future.result()
+        except Exception as error:
+            self.metrics.add('files_failed')
+            self._write_metrics()
+            _print(fr'Skipped {name}: {error}')
+            return
+        self.metrics.add('files_processed')
+        self.metrics.update(values)
+        self._write_metrics()
+        # Outputs inside the watched folder are not processed again
+        for file in created:
+            if os.path.dirname(file) == self.path and file.lower().endswith('.pdf'):
+                stat = os.stat(file)
+                self._done[os.path.basename(file)] = (stat.st_size, stat.st_mtime)
+        if created:
+            _print(fr'Finished {name}: ' + ', '.join(os.path.basename(file) for file in created))
+        else:
+            _print(fr'Finished {name}: no configured club found')
+
+    def _write_metrics(self):
+        """ Writes the counters in the prometheus text format (e.g. for the textfile collector of the node exporter),
+        the file is replaced at once, so a partial file is never read """
+        file_name = os.path.join(self.output_path, METRICS_FILE)
+        try:
+            os.makedirs(self.output_path, exist_ok=True)
+            with open(file_name + '.tmp', 'w', encoding='utf-8') as fp:
+                fp.write(self.metrics.to_prometheus())
+            os.replace(file_name + '.tmp', file_name)
+        except OSError as error:
+            _print(fr'Metrics not written ({error})')
+
+    def _border_value(self, key: str) -> [int, None]:
+        """ Returns a border value of the config
+        :param key: Key of the value
+        :return: The value or None in case it is not set
+        """
+        value = self.config.default.get(key, '')
+        try:
+            return int(value)
+        except ValueError:
+            return None
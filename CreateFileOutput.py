@@ -1,5 +1,14 @@
+import io
+import os
+import html
+import json
 from enum import Enum
+from contextlib import ExitStack
 from Class_Competition_Objects import Club
+from Class_Metrics import metrics
+
+# Buffer size of the output files
+WRITE_BUFFER: int = 64 * 1024
 
 
 class FileType(Enum):
@@ -247,66 +256,359 @@ def _starts_end(file_type: FileType) -> str:
     return result
 
 
-def club_to_file(file_name: str, club: Club, file_type: FileType = FileType.NONE):
+class ClubStartList:
+    """
+    Represents the precomputed start list of one club
+
+    Attributes:
+    -----------
+    name : str
+        Name of the club
+    judges : list
+        Tuples of section number and the judges of the section ("position: name"), sorted by section
+    athletes : list
+        Tuples of the athlete heading ("name (year)") and the starts of the athlete, sorted by name. A start is a
+        tuple of section, competition, heat and lane number, competition string and time string (the numbers are 0
+        in case the lane has no heat or competition).
+    """
+
+    def __init__(self, name: str):
+        """ Initializes a new ClubStartList
+        :param name: Name of the club
+        """
+        self.name: str = name
+        self.judges: list = []
+        self.athletes: list = []
+
+
+class StartListIndex:
+    """
+    Represents the start lists of all clubs. The lanes are walked once and grouped by club and athlete, the writers
+    read only from here, so the collection is not changed and the competition of every lane is resolved once.
+
+    Methods:
+    --------
+    from_collection(collection) : StartListIndex
+        Creates the index for all clubs of a collection
+    from_club(club) : StartListIndex
+        Creates the index for a single club
+    club(name) : [ClubStartList, None]
+        Returns the start list of a club
+    names : list
+        Returns the names of all clubs
+    """
+
+    def __init__(self, lanes: list, athletes: list, judges: list):
+        """ Initializes a new StartListIndex
+        :param lanes: All lanes
+        :param athletes: All athletes (athletes without start are listed as well)
+        :param judges: All judges
+        """
+        # club name -> athlete -> starts
+        starts: dict = {}
+        for athlete in athletes:
+            if athlete.club:
+                starts.setdefault(athlete.club.name, {}).setdefault(athlete, [])
+        for lane in lanes:
+            athlete = lane.athlete
+            if not athlete or not athlete.club:
+                continue
+            heat = lane.heat
+            competition = heat.competition if heat else None
+            # Create competition string
+            if competition is None:
+                # Start without heat or competition (e.g. the pdf could not be read completely), it is kept with
+                # number 0, so the athlete does not lose the start
+                com_str = fr'{"?":>5} {"".ljust(len("Schmetterling"))}'
+            elif competition.is_relay():
+                com_str = fr' {competition.repetition}x{competition.distance:3d}m {competition.discipline.ljust(len("Schmetterling"))}'
+            else:
+                com_str = fr'{competition.distance:4d}m {competition.discipline.ljust(len("Schmetterling"))}'
+            section_no = competition.section.no if competition and competition.section else 0
+            starts.setdefault(athlete.club.name, {}).setdefault(athlete, []).append(
+                (section_no, competition.no if competition else 0, heat.no if heat else 0, lane.no, com_str,
+                 lane.time_str))
+        # club name -> section -> judges
+        judge_dict: dict = {}
+        for judge in judges:
+            if judge.club:
+                judge_dict.setdefault(judge.club.name, {}).setdefault(judge.section.no, []).append(
+                    fr'{judge.position}: {judge.name}')
+
+        self._clubs: dict = {}
+        for name in starts.keys() | judge_dict.keys():
+            club = ClubStartList(name)
+            club.judges = sorted(judge_dict.get(name, {}).items())
+            club.athletes = [(fr'{athlete.name} ({athlete.year})', sorted(values, key=lambda x: x[:4]))
+                             for athlete, values in sorted(starts.get(name, {}).items(), key=lambda x: x[0].name)]
+            self._clubs[name] = club
+
+    @classmethod
+    def from_collection(cls, collection):
+        """ Creates the index for all clubs of a collection
+        :param collection: The collection
+        :return: The StartListIndex
+        """
+        return cls(collection.lanes, collection.athletes, collection.judges)
+
+    @classmethod
+    def from_club(cls, club: Club):
+        """ Creates the index for a single club
+        :param club: The club
+        :return: The StartListIndex
+        """
+        return cls([lane for athlete in club.athletes for lane in athlete.lanes], club.athletes, club.judges)
+
+    @property
+    def names(self) -> list:
+        """ Returns the names of all clubs
+        :return: A sorted list of club names
+        """
+        return sorted(self._clubs.keys())
+
+    def club(self, name: str) -> [ClubStartList, None]:
+        """ Returns the start list of a club
+        :param name: Name of the club
+        :return: The ClubStartList or None in case the club has no athletes and no judges
+        """
+        return self._clubs.get(name)
+
+
+def output_file_name(path: str, file_name: str) -> str:
+    """ Generates the full name of a pdf output file with path and name (replace unwanted characters)
+    :param path: Path of the file
+    :param file_name: Name of the file
+    :return: Full file name
+    """
+    if file_name.endswith('.pdf'):
+        # remove pdf from file name
+        file_name = file_name[:-4]
+    
+    # ----- Replace unwanted characters -----
+    file_name = file_name.replace('/', ' ')  # remove '/
+    file_name = file_name.replace('.', ' ')  # remove '.'
+    file_name = ' '.join(file_name.split())  # remove more than one ' ' (blanc)
+    
+    # Return full path
+    return os.path.abspath(path + '/' + file_name + '.pdf')
+
+
+def file_type_by_name(file_name: str) -> FileType:
+    """ Determines the file type by the ending of the file name
+    :param file_name: Name of the output file
+    :return: Type of file
+    """
+    if file_name.endswith('.html') or file_name.endswith('.htm') or file_name.endswith('.php'):
+        return FileType.HTML
+    elif file_name.endswith('.md') or file_name.endswith('.markdown'):
+        return FileType.MARKDOWN
+    else:
+        return FileType.TEXT
+
+
+def club_to_file(file_name: str, club: Club, file_type: FileType = FileType.NONE,
+                 index: [StartListIndex, None] = None):
     """ Generates a file with the club data
     :param file_name: Name of the output file
     :type club: Club
     :param club: Class with all the club data
     :param file_type: Type of file
+    :param index: Start lists of all clubs [default = None (created for the club)]
     """
-    if file_type == FileType.NONE:
-        # Check file name to determine file type
-        if file_name.endswith('.html') or file_name.endswith('.htm') or file_name.endswith('.php'):
-            file_type = FileType.HTML
-        elif file_name.endswith('.md') or file_name.endswith('.markdown'):
-            file_type = FileType.MARKDOWN
-        else:
-            file_type = FileType.TEXT
+    club_to_files([file_name], club, [file_type], index)
+
+
+def club_to_files(file_names: list, club: Club, file_types: [list, None] = None,
+                  index: [StartListIndex, None] = None):
+    """ Generates several files with the club data at once (the club data is only walked once)
+    :param file_names: Names of the output files
+    :type club: Club
+    :param club: Class with all the club data
+    :param file_types: Type of every file [default = None (determined by the file names)]
+    :param index: Start lists of all clubs [default = None (created for the club)]
+    """
+    if file_types is None:
+        file_types = [FileType.NONE] * len(file_names)
+    if len(file_names) != len(file_types):
+        raise ValueError('file_names and file_types must have the same length')
+    
+    with ExitStack() as stack:
+        streams: list = []
+        for file_name, file_type in zip(file_names, file_types):
+            if file_type == FileType.NONE:
+                # Check file name to determine file type
+                file_type = file_type_by_name(file_name)
+            streams.append((file_type, stack.enter_context(open(file_name, 'w', buffering=WRITE_BUFFER))))
+        club_to_streams(club, streams, index)
+    for file_name, (file_type, _) in zip(file_names, streams):
+        metrics.add('output_bytes', os.path.getsize(file_name), file_type.name.lower())
+
+
+def club_to_string(club: Club, file_type: FileType, index: [StartListIndex, None] = None) -> str:
+    """ Generates the output with the club data
+    :type club: Club
+    :param club: Class with all the club data
+    :param file_type: Type of file
+    :param index: Start lists of all clubs [default = None (created for the club)]
+    :return: The content of the file
+    """
+    stream = io.StringIO()
+    club_to_streams(club, [(file_type, stream)], index)
+    return stream.getvalue()
+
+
+def club_to_streams(club: Club, streams: list, index: [StartListIndex, None] = None):
+    """ Writes the club data to several outputs, the start list is walked only once and every part is written to all
+    outputs
+    :type club: Club
+    :param club: Class with all the club data
+    :param streams: A list of tuples with the file type and a writable text object (file, io.StringIO, ...)
+    :param index: Start lists of all clubs [default = None (created for the club)]
+    """
+    
+    def write(part):
+        """ Writes a part to all outputs
+        :param part: Function which returns the part for a file type
+        """
+        for file_type, stream in streams:
+            stream.write(part(file_type))
+    
+    if index is None:
+        index = StartListIndex.from_club(club)
+    start_list = index.club(club.name)
+    if start_list is None:
+        start_list = ClubStartList(club.name)
+    
     # Create headings
-    output: str = ''
-    output += _file_header(file_type, fr'Meldungen {club.name}')
-    output += _file_heading(club.name, 1, file_type, )
+    write(lambda t: _file_header(t, fr'Meldungen {club.name}') + _file_heading(club.name, 1, t))
     
-    # Generate judges
-    output += _file_heading('Kampfgericht', 2, file_type, )
-    # loop over judges to create a dict with section
-    judge_dict: dict = {}
-    for judge in club.judges:
-        judge_dict.setdefault(judge.section.no, []).append(fr'{judge.position}: {judge.name}')
-    # Create key list for all sections
-    key_list = sorted(list(judge_dict.keys()))
-    output += _judges_begin(file_type)
-    # For evey section crete entry
-    for key in key_list:
-        output += _judges_list(fr'Abschnit {key}', judge_dict[key], file_type)
-    output += _judges_end(file_type)
+    # Generate judges, for evey section crete entry
+    write(lambda t: _file_heading('Kampfgericht', 2, t) + _judges_begin(t))
+    for section_no, judges in start_list.judges:
+        write(lambda t: _judges_list(fr'Abschnit {section_no}', judges, t))
+    write(lambda t: _judges_end(t) + _file_heading('Starts', 2, t))
     
-    # Generate starts
-    output += _file_heading('Starts', 2, file_type, )
-    # Get athletes
-    athletes = club.athletes
-    athletes.sort(key=lambda x: x.name)
     # Loop over every athlete
-    for athlete in athletes:
-        # Athlete as heading
-        output += _file_heading(fr'{athlete.name} ({athlete.year})', 3, file_type)
-        # Header of start
-        output += _starts_begin(file_type)
-        # loop over every competition of the athlete starts
-        for no, lane in enumerate(athlete.lanes, start=1):
-            competition = lane.heat.competition
-            # Create competition string
-            if competition.is_relay():
-                com_str = fr' {competition.repetition}x{competition.distance:3d}m {competition.discipline.ljust(len("Schmetterling"))}'
-            else:
-                com_str = fr'{competition.distance:4d}m {competition.discipline.ljust(len("Schmetterling"))}'
-            # Generate output
-            output += _starts_entry(competition.section.no, competition.no, lane.heat.no, lane.no,
-                                    com_str, lane.time_str, file_type, no)
+    for heading, starts in start_list.athletes:
+        # Athlete as heading and header of start
+        write(lambda t: _file_heading(heading, 3, t) + _starts_begin(t))
+        # loop over every start of the athlete
+        for no, values in enumerate(starts, start=1):
+            write(lambda t: _starts_entry(*values, t, no))
         # Footer of start
-        output += _starts_end(file_type)
+        write(_starts_end)
     # Write to output
-    output += _file_footer(file_type)
-    
-    with open(file_name, 'w') as fp:
-        fp.write(output)
+    write(_file_footer)
+
+
+# Self-contained page of the all clubs report (no external resources), %TITLE% and %DATA% are replaced
+_ALL_CLUBS_HTML: str = '''<!DOCTYPE html>
+<html lang="de">
+  <head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>%TITLE%</title>
+    <style>
+      body { font-family: system-ui, -apple-system, "Segoe UI", Roboto, Arial, sans-serif; margin: 0; color: #212529; }
+      main { max-width: 960px; margin: 0 auto; padding: 1.5rem 1rem 4rem; }
+      h1 { text-align: center; }
+      h2 { background: #0dcaf0; color: #fff; padding: .4rem .8rem; border-radius: .3rem; }
+      h3 { margin-bottom: .3rem; }
+      .filter { display: flex; flex-wrap: wrap; gap: .5rem; margin-bottom: 1rem; position: sticky; top: 0;
+                background: #fff; padding: .5rem 0; }
+      .filter select, .filter input { font-size: 1rem; padding: .3rem; flex: 1 1 12rem; }
+      .judges { display: flex; flex-wrap: wrap; gap: 1rem; }
+      .judges div { flex: 1 1 14rem; }
+      table { border-collapse: collapse; width: 100%; margin-bottom: 1rem; }
+      th, td { border: 1px solid #dee2e6; padding: .25rem .5rem; text-align: center; }
+      td.d { text-align: left; white-space: pre; }
+      tbody tr:nth-child(odd) { background: #f2f2f2; }
+      footer { text-align: center; color: #6c757d; padding: 1rem; }
+    </style>
+  </head>
+  <body>
+    <main>
+      <h1>%TITLE%</h1>
+      <div class="filter">
+        <select id="club"><option value="">Alle Vereine</option></select>
+        <input id="athlete" type="search" placeholder="Schwimmer">
+        <select id="section"><option value="">Alle Abschnitte</option></select>
+      </div>
+      <div id="out"></div>
+    </main>
+    <footer>Erstellt mit <a target="_blank" rel="noopener noreferrer" href="https://github.com/derturtle/MeldeergebnissMarkieren">highlightClub</a></footer>
+    <script type="application/json" id="data">%DATA%</script>
+    <script>
+      // data: [[club, [[section, [judges]]], [[athlete, [[section, competition, heat, lane, discipline, time]]]]]]
+      const data = JSON.parse(document.getElementById('data').textContent);
+      const club = document.getElementById('club'), athlete = document.getElementById('athlete'),
+            section = document.getElementById('section'), out = document.getElementById('out');
+      const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+      const sections = new Set();
+      data.forEach(c => {
+        club.add(new Option(c[0], c[0]));
+        c[1].forEach(j => sections.add(j[0]));
+        c[2].forEach(a => a[1].forEach(s => sections.add(s[0])));
+      });
+      [...sections].sort((a, b) => a - b).forEach(s => section.add(new Option('Abschnitt ' + s, s)));
+      const head = '<tr><th>Nr.</th><th>WK</th><th>L</th><th>B</th><th>Disziplin</th><th>Meldezeit</th><th>Abschnitt</th></tr>';
+      function render() {
+        const c = club.value, a = athlete.value.toLowerCase().split(/[\\s,]+/).filter(w => w),
+              s = section.value === '' ? null : +section.value;
+        const html = [];
+        data.forEach(entry => {
+          if (c && entry[0] !== c) return;
+          const parts = [];
+          if (!a.length) {
+            const judges = entry[1].filter(j => s === null || j[0] === s).map(j =>
+              '<div><h3>Abschnitt ' + j[0] + '</h3><ol>' + j[1].map(n => '<li>' + esc(n) + '</li>').join('') + '</ol></div>');
+            if (judges.length) parts.push('<h3>Kampfgericht</h3><div class="judges">' + judges.join('') + '</div>');
+          }
+          entry[2].forEach(ath => {
+            const name = ath[0].toLowerCase();
+            if (!a.every(w => name.includes(w))) return;
+            const starts = ath[1].filter(st => s === null || st[0] === s);
+            if (s !== null && !starts.length) return;
+            parts.push('<h3>' + esc(ath[0]) + '</h3><table><thead>' + head + '</thead><tbody>' + starts.map((st, i) =>
+              '<tr><td>' + (i + 1) + '</td><td>' + st[1] + '</td><td>' + st[2] + '</td><td>' + st[3] + '</td><td class="d">' +
+              esc(st[4]) + '</td><td>' + esc(st[5]) + '</td><td>' + st[0] + '</td></tr>').join('') + '</tbody></table>');
+          });
+          if (parts.length) html.push('<h2>' + esc(entry[0]) + '</h2>' + parts.join(''));
+        });
+        out.innerHTML = html.join('') || '<p>Keine Einträge gefunden</p>';
+      }
+      [club, section].forEach(e => e.addEventListener('change', render));
+      athlete.addEventListener('input', render);
+      render();
+    </script>
+  </body>
+</html>
+'''
+
+
+def all_clubs_to_string(index: StartListIndex, title: str = 'Meldungen') -> str:
+    """ Generates a single self-contained html page with the judges and starts of all clubs. The data is embedded as
+    json and can be filtered by club, athlete and section in the browser (no network needed)
+    :param index: Start lists of all clubs
+    :param title: Title of the page
+    :return: The content of the file
+    """
+    data: list = []
+    for name in index.names:
+        club = index.club(name)
+        data.append([club.name, [[no, judges] for no, judges in club.judges],
+                     [[heading, [list(start) for start in starts]] for heading, starts in club.athletes]])
+    # "</" must not end the script tag
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return _ALL_CLUBS_HTML.replace('%TITLE%', html.escape(title)).replace('%DATA%', text)
+
+
+def all_clubs_to_file(file_name: str, index: StartListIndex, title: str = 'Meldungen'):
+    """ Generates a single self-contained html file with the judges and starts of all clubs
+    :param file_name: Name of the output file
+    :param index: Start lists of all clubs
+    :param title: Title of the page
+    """
+    with open(file_name, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as fp:
+        fp.write(all_clubs_to_string(index, title))
+    metrics.add('output_bytes', os.path.getsize(file_name), FileType.HTML.name.lower())
@@ -1,15 +1,45 @@
 import os
 import sys
 import argparse
+import datetime
 
-from Class_Config import Config
-from Class_PDFOperations import PDFOperations
-from CreateFileOutput import FileType, club_to_file
-from Class_TextInterface import TextInterface
+# The modules of the program are imported when they are needed, so the help or an invalid argument is shown without
+# loading pymupdf or the text interface
 
 MAIN_DEBUG: bool = False
 
+# Measurement of the imports and steps (--timing)
+timing = None
+# Measurement of the memory per step (--memprofile)
+memory = None
+
+def _step(name: str, collection=None):
+    """ Stores the duration and the memory of a step in case they are measured
+    :param name: Name of the step
+    :param collection: Collection whose objects are counted by the memory profile [default = None]
+    """
+    if timing is not None:
+        timing.step(name)
+    if memory is not None:
+        memory.step(name, collection)
+
+def _add_measure_arguments(parser: argparse.ArgumentParser):
+    """ Adds the arguments of the measurements to a parser (the measurements itself are started before the arguments
+    are parsed)
+    :param parser: The parser
+    """
+    parser.add_argument('--timing', action='store_true',
+                        help='Prints the import time of the modules and the duration of the steps to stderr')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='Prints the peak and retained memory of every step with the top allocation sites and the number of parsed objects to stderr')
+    parser.add_argument('--memprofile-json', metavar='FILE', default=None,
+                        help='Writes the memory profile additionally as json file (implies --memprofile)')
+
 def debug_func():
+    from Class_Config import Config
+    from Class_PDFOperations import PDFOperations
+    from CreateFileOutput import FileType, club_to_files
+    
     tst_path: str = './TestFiles/in'
     tests: dict = {
         "2024_HF":  [f'{tst_path}/2024_HF.pdf', 89, None],
@@ -40,9 +70,8 @@ def debug_func():
         
         print(f'[DEBUG] {key} has {value[1]} pages')
         # Create outputs
-        club_to_file(out[:-4]+'.md', coll.club_by_name('SV Georgsmarienhütte'), FileType.MARKDOWN)
-        club_to_file(out[:-4]+'.html', coll.club_by_name('SV Georgsmarienhütte'), FileType.HTML)
-        club_to_file(out[:-4]+'.txt', coll.club_by_name('SV Georgsmarienhütte'), FileType.TEXT)
+        club_to_files([out[:-4]+'.md', out[:-4]+'.html', out[:-4]+'.txt'], coll.club_by_name('SV Georgsmarienhütte'),
+                      [FileType.MARKDOWN, FileType.HTML, FileType.TEXT])
         
         # PDFOperations.highlight_pdf(value[0], out[:-4] + '_marked.pdf',
         #                             coll.club_by_name('SV Georgsmarienhütte').occurrence,
@@ -60,7 +89,7 @@ def debug_func():
         tests[key][2] = pdf_obj.collection
         
     # Check config
-    config = Config()
+    config = Config.load()
     color = config.colors.valid_color('255,0,0')
     if color:
         config.colors.add('red', color)
@@ -68,16 +97,23 @@ def debug_func():
     
 def run_parser():
     parser = argparse.ArgumentParser(  # prog='ProgramName',
-        description='This program marks clubs like "SV Georgsmarienhütte" in so called "Meldeergebnissen". In future, it should is also possible to mark Person like "Max Mustermann"',
+        description='This program marks clubs like "SV Georgsmarienhütte" in so called "Meldeergebnissen". With -a it is also possible to mark persons like "Max Mustermann"',
         epilog='Created by Florian Grafe from SV Georgsmarienhütte')
     # usage="The string describing the program usage (default: generated from arguments added to parser)")
     parser.add_argument('file', help='The "Meldeergbniss" to mark clubs in')
-    parser.add_argument('club',
-                        help='The Name of the club which should be marked like "SV Georgsmarienhütte"')
+    parser.add_argument('club', nargs='?', default=None,
+                        help='The Name of the club which should be marked like "SV Georgsmarienhütte" (further clubs with --club)')
     # parser.add_argument('-h', '--help', help='Display this help')
     parser.add_argument('-c', '--color',
                         help='Color of the highlight, e.g. "yellow", "cyan",... or use rgb code like 255,255,0',
                         default='yellow')
+    parser.add_argument('--club', dest='clubs', action='append', metavar='NAME[:COLOR]',
+                        help='Additionally marks a club like "TSG Bramsche:cyan" in the same pdf, can be used several times [Default color: --color]',
+                        default=[])
+    parser.add_argument('--all-clubs', action='store_true',
+                        help='Marks every club in an own pdf (<output>_<club>.pdf) in the color of --color')
+    parser.add_argument('--per-club', action='store_true',
+                        help='Additionally creates an own pdf for every club (<output>_<club>.pdf)')
     parser.add_argument('-o', '--output', help='Alternative output file', default=None)
     parser.add_argument('-ro', '--offset', type=int,
                         help='This makes the highlighted region bigger or smaller depending on the value [Default 1]',
@@ -88,10 +124,49 @@ def run_parser():
     parser.add_argument('-re', '--end', type=int,
                         help='This defines in percent of the page where the rect end [Default: 95 (calculates value from pdf)]',
                         default=-1)
+    parser.add_argument('-p', '--previous',
+                        help='Previous version of the "Meldeergebniss", only changed sections are read again and the changed starts are printed',
+                        default=None)
+    parser.add_argument('-w', '--workers', type=int,
+                        help='Number of processes to extract the text of the pdf [Default: 0 (no extra process)]',
+                        default=0)
+    parser.add_argument('-a', '--athlete', action='append', metavar='NAME[:COLOR]',
+                        help='Additionally marks an athlete like "Mustermann, Max:orange", can be used several times. Small typos are found as well [Default color: athlete_color of the config or orange]',
+                        default=[])
+    parser.add_argument('-r', '--report-all', action='store_true',
+                        help='Additionally creates one html file with the starts of all clubs (<output>_all_clubs.html), which can be filtered in the browser')
+    parser.add_argument('-l', '--layers', action='store_true',
+                        help='Additionally creates one pdf with all clubs (<output>_all_clubs.pdf), every club is on an own layer which can be switched on and off in the pdf reader')
+    parser.add_argument('-e', '--excerpt', action='store_true',
+                        help='The output pdf only contains the title page and the pages where the club or the athletes are found')
+    parser.add_argument('-n', '--annotate', action='store_true',
+                        help='Marks with highlight annotations, which are appended to the output (incremental save). An existing output is updated, e.g. to change the color of a club or to add a club')
+    parser.add_argument('-s', '--store',
+                        help='Stores the parsed "Meldeergebniss" in this sqlite database (date = modification date of the pdf), see "highlightClub.py store -h"',
+                        default=None)
+    parser.add_argument('--date', type=datetime.date.fromisoformat,
+                        help='Date of the meet stored by -s (YYYY-MM-DD) [Default: first date on the first page of the pdf, otherwise the modification date of the pdf]',
+                        default=None)
+    parser.add_argument('--stats', action='store_true',
+                        help='Prints the counters of the reading and the outputs (pages, words, lines, searches, objects, lookups, bytes written) to stderr')
+    _add_measure_arguments(parser)
     args = parser.parse_args()
+    if args.annotate and args.excerpt:
+        parser.error('argument -e/--excerpt: not allowed with argument -n/--annotate')
+    if not args.club and not args.clubs and not args.all_clubs:
+        parser.error('the following arguments are required: club (or --club, --all-clubs)')
+    _step('arguments')
+    
+    # Check files (before the parser is loaded)
+    pdf_file = os.path.abspath(os.path.expanduser(args.file))
+    for value in [args.file] + ([args.previous] if args.previous else []):
+        if not os.path.isfile(os.path.expanduser(value)):
+            print("\nerror: File \"" + value + "\" does not exist")
+            exit(1)
     
     # Check colors
-    config = Config()
+    from Class_Config import Config
+    config = Config.load()
     valid_color = config.colors.valid_color(args.color)
     if args.color in config.colors.rgb.keys():
         color = config.colors.rgb[args.color]
@@ -106,39 +181,275 @@ def run_parser():
             error_color) + '\n')
         exit(3)
     
-    # Reading pdf
+    # Clubs with their colors (the colon is part of the name in case the rest is no color)
+    selection: list = []
+    for value in ([args.club] if args.club else []) + args.clubs:
+        name, _, color_name = value.rpartition(':')
+        club_color = config.colors.get_rgb(color_name) if name else None
+        if club_color is None:
+            name, club_color = value, color
+        selection.append((name, club_color))
+    _step('config')
+    
+    from Class_PDFOperations import PDFOperations
+    from Class_AthleteIndex import AthleteIndex
+    from CreateFileOutput import StartListIndex, club_to_file, all_clubs_to_file, output_file_name
+    from Class_ParseCache import ParseCache
+    _step('import parser')
+    
+    # Reading previous version (only in case there is no stored cache of it)
+    previous = None
+    if args.previous:
+        previous_file = os.path.abspath(os.path.expanduser(args.previous))
+        previous = ParseCache.load(ParseCache.file_name(previous_file), previous_file)
+        if previous is None:
+            previous_obj = PDFOperations(incremental=True)
+            if not previous_obj.read_pdf(previous_file):
+                print("\nerror: Reading of previous pdf failed")
+                exit(1)
+            previous = previous_obj.parse_cache
+            previous.save(ParseCache.file_name(previous_file), previous_file)
+    
+    # Reading pdf (completely, the outputs need the lanes and the borders of the competitions)
     obj_pdf = PDFOperations()
-    pdf_file = os.path.abspath(os.path.expanduser(args.file))
-    if not obj_pdf.read_pdf(pdf_file):
+    # Only the starts of the clubs are needed (athletes, report of all clubs, store and the comparison with the previous
+    # version need all clubs)
+    targets = None if args.athlete or args.report_all or args.layers or args.store or args.all_clubs \
+        or args.previous else [name for name, _ in selection]
+    if not obj_pdf.read_pdf(pdf_file, previous, args.workers, clubs=targets):
         print("\nerror: Reading of pdf failed")
         exit(1)
         
     # Check if reading was okay
     collection = obj_pdf.collection
-    borders = obj_pdf.text_x_range
 
-    # Check if club exist
-    club = collection.club_by_name(args.club)
-    if not club:
-        print("\nerror: Club \"" + args.club + "\" didn't exist in " + args.file)
-        exit(2)
+    # Check if clubs exist
+    clubs: list = []
+    colors: list = []
+    if args.all_clubs:
+        clubs = list(collection.clubs)
+        colors = [color] * len(clubs)
+    for name, club_color in selection:
+        club = collection.club_by_name(name)
+        if not club:
+            print("\nerror: Club \"" + name + "\" didn't exist in " + args.file)
+            exit(2)
+        if club not in clubs:
+            clubs.append(club)
+            colors.append(club_color)
+    # Differences to the previous version
+    if args.previous:
+        if obj_pdf.diff:
+            print(obj_pdf.diff)
+        # Stored for the next version, so this version is not read again
+        obj_pdf.parse_cache.save(ParseCache.file_name(pdf_file), pdf_file)
+    borders = obj_pdf.text_x_range
+    _step('read pdf', collection)
     
-    # Check output
+    # Check athletes
+    athletes: list = []
+    athlete_colors: list = []
+    for value in args.athlete:
+        name, _, color_name = value.partition(':')
+        color_name = color_name if color_name else config.default.get('athlete_color', 'orange')
+        athlete_color = config.colors.get_rgb(color_name)
+        if athlete_color is None:
+            print("\nerror: Invalid color \"" + color_name + "\" for athlete \"" + name + "\"")
+            exit(3)
+        found = collection.find_athletes(name)
+        if not found:
+            print("\nerror: Athlete \"" + name + "\" didn't exist in " + args.file)
+            exit(2)
+        for athlete in found:
+            if AthleteIndex.normalise(athlete.name) != AthleteIndex.normalise(name):
+                print(fr'Athlete "{name}" not found, using "{athlete.name}"' +
+                      (fr' ({athlete.club.name})' if athlete.club else ''))
+        athletes += found
+        athlete_colors += [athlete_color] * len(found)
+    
+    # Check output (with --all-clubs only the base of the names of the outputs per club)
     if args.output:
         if not os.path.exists(os.path.dirname(args.output)):
             os.mkdir(os.path.dirname(args.output))
         output = args.output
+    elif args.all_clubs:
+        output = args.file
+    elif len(clubs) == 1:
+        output = args.file[:-4] + fr'_{clubs[0].name}.pdf'
     else:
-        output = args.file[:-4] + fr'_{args.club}.pdf'
+        output = args.file[:-4] + '_marked.pdf'
+    single = len(clubs) == 1 and not args.all_clubs
+    
+    def club_output(value) -> str:
+        """ Returns the name of the output of a club
+        :param value: The club
+        :return: Name of the pdf
+        """
+        return output_file_name(os.path.dirname(os.path.abspath(output)), os.path.basename(output)[:-4] + '_' + value.name)
+    
+    def mark(source, output_pdf: str, marked: list, marked_colors: list):
+        """ Creates a marked pdf
+        :param source: The pdf (file or data)
+        :param output_pdf: Name of the output
+        :param marked: Clubs and athletes to mark
+        :param marked_colors: Colors of the clubs and athletes
+        """
+        if args.annotate:
+            # Only the annotations are appended, the footer exists in case the output is updated
+            if not PDFOperations.annotate_pdf_clubs(pdf_file, output_pdf, marked, marked_colors, borders[0],
+                                                    borders[1], args.offset):
+                PDFOperations.add_product_info(output_pdf, collection)
+        else:
+            # Pages of the excerpt (None = all pages)
+            page_nos = PDFOperations.excerpt_pages(marked) if args.excerpt else None
+            PDFOperations.highlight_pdf_clubs(source, output_pdf, marked, marked_colors, borders[0], borders[1],
+                                              args.offset, page_nos)
+            PDFOperations.add_product_info(output_pdf, collection, page_nos)
     
     if args.start > 0:
         borders[0] = args.start
     if args.end > 0:
         borders[1] = args.end
     
-    PDFOperations.highlight_pdf(pdf_file, output, club.occurrence, color, borders[0], borders[1], args.offset)
-    PDFOperations.add_product_info(output, collection)
-    club_to_file(output[:-4] + '.html', club)
+    # One pdf with all clubs
+    if not args.all_clubs:
+        mark(pdf_file, output, clubs + athletes, colors + athlete_colors)
+    # One pdf per club (the pdf is only read once, every output is created from the data in memory)
+    if args.all_clubs or (args.per_club and not single):
+        with open(pdf_file, 'rb') as fp:
+            data = fp.read()
+        for club, club_color in zip(clubs, colors):
+            mark(data, club_output(club), [club] + athletes, [club_color] + athlete_colors)
+    _step('highlight pdf', collection)
+    if single:
+        club_to_file(output[:-4] + '.html', clubs[0])
+    else:
+        index = StartListIndex.from_collection(collection)
+        for club in clubs:
+            club_to_file(club_output(club)[:-4] + '.html', club, index=index)
+    if args.report_all:
+        all_clubs_to_file(output[:-4] + '_all_clubs.html', StartListIndex.from_collection(collection),
+                          fr'Meldungen {os.path.basename(pdf_file)[:-4]}')
+    if args.layers:
+        PDFOperations.highlight_pdf_layers(pdf_file, output[:-4] + '_all_clubs.pdf', collection.clubs,
+                                           [color] * len(collection.clubs), borders[0], borders[1], args.offset)
+        PDFOperations.add_product_info(output[:-4] + '_all_clubs.pdf', collection)
+    _step('outputs', collection)
+    
+    # Store parsed data
+    if args.store:
+        from Class_ResultStore import ResultStore
+        from Class_PDFIndex import PDFIndex
+        # Date of the meet (the modification date of the file is mostly the date of the download)
+        meet_date = args.date if args.date else PDFIndex.read_date(pdf_file)
+        if meet_date is None:
+            meet_date = datetime.date.fromtimestamp(os.path.getmtime(pdf_file))
+            print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] No date found in {os.path.basename(pdf_file)}, using the modification date {meet_date} (see --date)')
+        with ResultStore(args.store) as store:
+            meet_id = store.add(collection, date=meet_date, source=pdf_file)
+            meet_name = store.meet_name(meet_id)
+        print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Stored {os.path.basename(pdf_file)} in {args.store} as "{meet_name}"')
+        _step('store', collection)
+    
+    # Counters of the reading and the outputs
+    if args.stats:
+        from Class_Metrics import Metrics, metrics
+        stats = Metrics(obj_pdf.metrics)
+        stats.update(metrics)
+        stats.report()
+
+def run_server(argv: list):
+    parser = argparse.ArgumentParser(prog='highlightClub.py serve',
+        description='Runs a local http server which marks clubs in "Meldeergebnissen". The pdf is parsed once by a warm worker process and kept for further requests',
+        epilog='Created by Florian Grafe from SV Georgsmarienhütte')
+    parser.add_argument('--host', help='Host name or address of the server [Default: 127.0.0.1]', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='Port of the server [Default: 8080]', default=8080)
+    parser.add_argument('--workers', type=int, help='Number of worker processes [Default: 2]', default=2)
+    parser.add_argument('--cache', type=int, help='Number of parsed pdfs kept per worker [Default: 4]', default=4)
+    _add_measure_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    from Class_Server import HighlightServer
+    _step('import server')
+    server = HighlightServer(args.host, args.port, args.workers, args.cache)
+    server.warm_up()
+    _step('warm up')
+    host, port = server.address
+    print(fr'[{datetime.datetime.now().strftime("%H:%M:%S,%f")}] Serving on http://{host}:{port} with {args.workers} worker(s)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+def run_watch(argv: list):
+    parser = argparse.ArgumentParser(prog='highlightClub.py watch',
+        description='Watches a folder for new "Meldeergebnisse" and marks the clubs of the Default section of the config (club/club_NN with color/color_NN)',
+        epilog='Created by Florian Grafe from SV Georgsmarienhütte')
+    parser.add_argument('path', nargs='?', help='Folder to watch [Default: search_path of the config]', default='')
+    parser.add_argument('-o', '--output', help='Folder for the outputs [Default: <path>/highlighted]', default='')
+    parser.add_argument('--workers', type=int, help='Number of worker processes [Default: 2]', default=2)
+    parser.add_argument('--queue', type=int, help='Number of files which can wait for a worker [Default: 4]', default=4)
+    parser.add_argument('--settle', type=float,
+                        help='Time in seconds a new file must be unchanged before it is processed [Default: 2]',
+                        default=2.0)
+    parser.add_argument('--poll', type=float, help='Check interval in seconds [Default: 1]', default=1.0)
+    _add_measure_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    from Class_WatchFolder import WatchFolder
+    _step('import watch folder')
+    watch = WatchFolder(args.path, args.output, args.workers, args.queue, args.settle, args.poll)
+    try:
+        watch.run()
+    except FileNotFoundError as error:
+        print(f'\nerror: {error}')
+        exit(1)
+    except KeyboardInterrupt:
+        pass
+
+def run_store(argv: list):
+    parser = argparse.ArgumentParser(prog='highlightClub.py store',
+        description='Shows the starts stored by "highlightClub.py <file> <club> -s <database>" over several meets',
+        epilog='Created by Florian Grafe from SV Georgsmarienhütte')
+    parser.add_argument('database', help='The sqlite database')
+    parser.add_argument('-c', '--club', help='Shows all starts of the club', default=None)
+    parser.add_argument('-a', '--athlete', help='Shows the entry times of the athlete per discipline', default=None)
+    parser.add_argument('-y', '--year', type=int, help='Year of the athlete [Default: all]', default=0)
+    parser.add_argument('--since', type=datetime.date.fromisoformat, help='Only meets since this date (YYYY-MM-DD)',
+                        default=None)
+    parser.add_argument('--until', type=datetime.date.fromisoformat, help='Only meets until this date (YYYY-MM-DD)',
+                        default=None)
+    parser.add_argument('--remove', help='Removes the meet with this name', default=None)
+    _add_measure_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    from Class_ResultStore import ResultStore, seconds_to_str
+    _step('import store')
+    if not os.path.isfile(args.database):
+        print(f'\nerror: Database {args.database} does not exist')
+        exit(1)
+    with ResultStore(args.database) as store:
+        if args.remove:
+            if not store.remove(args.remove):
+                print(f'\nerror: Meet "{args.remove}" does not exist')
+                exit(2)
+        elif args.club:
+            for row in store.club_starts(args.club, args.since, args.until):
+                print(fr'{row["date"]} {row["meet"]} - {row["text"]} - {row["heat"]}/{row["lane"]} - '
+                      fr'{row["athlete"]} ({row["year"]}) - {seconds_to_str(row["entry_time"])}')
+        elif args.athlete:
+            discipline = None
+            for row in store.athlete_progression(args.athlete, args.year, since=args.since, until=args.until):
+                if discipline != (row['distance'], row['discipline']):
+                    discipline = (row['distance'], row['discipline'])
+                    print(fr'{row["distance"]}m {row["discipline"]}')
+                print(fr'  {row["date"]} {seconds_to_str(row["entry_time"])} - {row["meet"]} '
+                      fr'({row["athlete"]}, {row["year"]}, {row["club"]})')
+        else:
+            for row in store.meets():
+                print(fr'{row["date"]} {row["name"]} ({row["source"]})')
 
 # Press the green button in the gutter to run the script.
 if __name__ == '__main__':
@@ -146,9 +457,40 @@ if __name__ == '__main__':
         debug_func()
         exit(0)
     
-    if len(sys.argv) > 1:
+    # Measurement has to start before the modules are imported, the report is printed at exit (also on errors). The
+    # arguments of the measurements are parsed once here (both forms "--memprofile-json FILE" and
+    # "--memprofile-json=FILE"), the parsers of the commands accept them again.
+    measure_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    _add_measure_arguments(measure_parser)
+    measure_args, other_args = measure_parser.parse_known_args()
+    if measure_args.timing:
+        import atexit
+        from Class_Timing import StartupTiming
+        timing = StartupTiming()
+        timing.start()
+        atexit.register(timing.report)
+    if measure_args.memprofile or measure_args.memprofile_json:
+        import atexit
+        from Class_MemoryProfile import MemoryProfile
+        memory = MemoryProfile()
+        memory.start()
+        atexit.register(memory.report, json_file=measure_args.memprofile_json or '')
+    # The text interface is also started in case only measurements are given
+    measure_only = not other_args
+    
+    # The command is taken after the measurements, so they can also be given before the command
+    # (e.g. "highlightClub.py --timing serve")
+    command = other_args[0] if other_args else ''
+    if command == 'serve':
+        run_server(other_args[1:])
+    elif command == 'watch':
+        run_watch(other_args[1:])
+    elif command == 'store':
+        run_store(other_args[1:])
+    elif not measure_only:
         run_parser()
     else:
+        from Class_TextInterface import TextInterface
         TextInterface.run()
 
 